@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark AsyncOllamaClient throughput at different concurrency levels
+
+Sends the same batch of /api/generate requests to a local mock Ollama
+server (with simulated generation latency) or a real one via --host, with
+1, 4 and 16 requests in flight, and reports throughput.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add core directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from commit_by_lee.async_ollama_client import AsyncOllamaClient
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+
+
+async def run(host: str, requests_count: int, concurrency: int):
+    """Send requests_count requests with at most `concurrency` in flight"""
+    prompt = "Generate a commit message for: + print('hello')"
+
+    async with AsyncOllamaClient(host=host, pool_size=concurrency) as client:
+        # Warm up the pool so connection setup is not part of the measurement
+        await asyncio.gather(*(client.list_models() for _ in range(concurrency)))
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(client.generate(prompt, max_tokens=16) for _ in range(requests_count))
+        )
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Simulated generation time of the mock server in seconds",
+    )
+    parser.add_argument("--host", help="Benchmark a real Ollama server instead of the mock")
+    args = parser.parse_args()
+
+    server = None
+    if not args.host:
+        server = MockOllamaServer(latency=args.latency).start()
+    host = args.host or server.url
+
+    try:
+        print(f"{args.requests} requests per level")
+        baseline = None
+        for concurrency in args.concurrency:
+            elapsed = asyncio.run(run(host, args.requests, concurrency))
+            throughput = args.requests / elapsed
+            baseline = baseline or throughput
+            print(
+                f"concurrency {concurrency:>3}  {elapsed:7.2f} s  {throughput:8.1f} req/s  "
+                f"({throughput / baseline:.1f}x)"
+            )
+    finally:
+        if server:
+            server.stop()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch generation over a range of commits
+
+Creates a temporary repository with N commits, then compares reading the
+patches with one git log -p stream against one git show per commit, and
+generating messages serially against with bounded concurrency (against a
+local mock Ollama server with simulated generation latency).
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add core directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from commit_by_lee.batch import generate_for_commits
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.diff_analyzer import DiffAnalyzer
+from commit_by_lee.llm_generator import CommitMessageGenerator
+from commit_by_lee.models.schemas import Language
+from commit_by_lee.ollama_client import OllamaClient
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def create_repo(repo: Path, commits: int):
+    """Create a repo with `commits` commits, each changing a few files"""
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.email", "bench@example.com")
+    _git(repo, "config", "user.name", "bench")
+
+    for index in range(commits):
+        for offset in range(3):
+            path = repo / f"pkg_{(index + offset) % 10}" / f"module_{(index * 3 + offset) % 40}.py"
+            path.parent.mkdir(exist_ok=True)
+            with open(path, "a") as f:
+                f.write("".join(f"value_{index}_{line} = {line}\n" for line in range(20)))
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", f"wip {index}")
+
+
+def read_per_commit(analyzer: DiffAnalyzer, repo: Path):
+    """One git show per commit, the approach iter_commits replaces"""
+    shas = _git(repo, "rev-list", "--no-merges", "HEAD").split()
+    return [analyzer._analyze_diff(_git(repo, "show", "--format=", sha)) for sha in shas]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--commits", type=int, default=200, help="Commits in the range")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 8], help="Concurrency levels")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Simulated generation time of the mock server in seconds",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        print(f"Creating repository with {args.commits} commits...")
+        create_repo(repo, args.commits)
+        analyzer = DiffAnalyzer(str(repo))
+
+        start = time.perf_counter()
+        per_commit = read_per_commit(analyzer, repo)
+        per_commit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        streamed = list(analyzer.iter_commits("HEAD"))
+        stream_time = time.perf_counter() - start
+
+        assert [c.analysis.stats.insertions for c in streamed] == [
+            a.stats.insertions for a in per_commit
+        ]
+        print(
+            f"read: git show per commit {per_commit_time:7.2f} s"
+            f"   git log -p stream {stream_time:7.2f} s"
+            f"   ({per_commit_time / stream_time:.1f}x)"
+        )
+
+        with MockOllamaServer(latency=args.latency) as server:
+            for jobs in args.jobs:
+                client = OllamaClient(host=server.url, pool_size=jobs)
+                generator = CommitMessageGenerator(client, Language.ENGLISH, summary_concurrency=1)
+
+                start = time.perf_counter()
+                count = sum(1 for _ in generate_for_commits(generator, iter(streamed), jobs=jobs))
+                elapsed = time.perf_counter() - start
+                client.close()
+
+                print(
+                    f"generate: {jobs:>3} concurrent  {elapsed:7.2f} s"
+                    f"  {count / elapsed:7.1f} commits/s"
+                )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
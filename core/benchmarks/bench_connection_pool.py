@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request latency with and without connection pooling
+
+Runs the same /api/generate request against a local mock Ollama server
+(or a real one via --host), once with a fresh client per request and once
+with a single pooled client, and reports latency percentiles.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add core directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.ollama_client import OllamaClient
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(label, samples):
+    print(
+        f"{label:<12} mean {statistics.mean(samples) * 1000:8.2f} ms  "
+        f"p50 {_percentile(samples, 50) * 1000:8.2f} ms  "
+        f"p95 {_percentile(samples, 95) * 1000:8.2f} ms"
+    )
+
+
+def run(host, requests_count):
+    """Run both modes and return (unpooled, pooled) latency samples"""
+    prompt = "Generate a commit message for: + print('hello')"
+
+    unpooled = []
+    for _ in range(requests_count):
+        start = time.perf_counter()
+        with OllamaClient(host=host) as client:
+            client.generate(prompt, max_tokens=16)
+        unpooled.append(time.perf_counter() - start)
+
+    pooled = []
+    with OllamaClient(host=host) as client:
+        for _ in range(requests_count):
+            start = time.perf_counter()
+            client.generate(prompt, max_tokens=16)
+            pooled.append(time.perf_counter() - start)
+
+    return unpooled, pooled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per mode")
+    parser.add_argument("--host", help="Benchmark a real Ollama server instead of the mock")
+    args = parser.parse_args()
+
+    if args.host:
+        unpooled, pooled = run(args.host, args.requests)
+        connections = None
+    else:
+        with MockOllamaServer() as server:
+            unpooled, pooled = run(server.url, args.requests)
+            connections = server.connections
+
+    print(f"{args.requests} requests per mode")
+    _report("unpooled", unpooled)
+    _report("pooled", pooled)
+    if connections is not None:
+        print(f"TCP connections accepted: {connections} ({args.requests} unpooled + pooled)")
+    print(f"Speedup (mean): {statistics.mean(unpooled) / statistics.mean(pooled):.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark DiffAnalyzer.analyze_diff on large synthetic diffs
+
+Generates diffs of the requested sizes and reports analysis time,
+throughput and peak traced memory allocated during the analysis.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add core directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from commit_by_lee.bench.synthetic_diff import generate_diff
+from commit_by_lee.diff_analyzer import DiffAnalyzer
+
+MB = 1024 * 1024
+
+
+def bench(size_mb: float, repeat: int, memory: bool):
+    """Benchmark one diff size and print a result line"""
+    diff = generate_diff(int(size_mb * MB))
+    analyzer = DiffAnalyzer()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        analysis = analyzer.analyze_diff(diff)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    line = (
+        f"{size_mb:>7.0f} MB  {analysis.stats.files_changed:>7} files  "
+        f"best {best:8.3f} s  {len(diff) / MB / best:8.1f} MB/s"
+    )
+
+    if memory:
+        tracemalloc.start()
+        analyzer.analyze_diff(diff)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += f"  peak {peak / MB:8.1f} MB"
+
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=float, nargs="+", default=[1, 10, 100], help="Diff sizes in MB"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size")
+    parser.add_argument(
+        "--memory", action="store_true", help="Also measure peak allocations (slow)"
+    )
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        bench(size, args.repeat, args.memory)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
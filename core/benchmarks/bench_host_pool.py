@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark routing across several Ollama hosts
+
+Runs concurrent requests against local mock servers and prints how many
+each server served:
+
+- balance: two fast servers and a slow one, compared with the first fast
+  server alone; the slow one should get few requests. Each server
+  generates --parallel requests at a time, like Ollama, so extra servers
+  add capacity
+- failover: one server is down from the start and another starts failing
+  halfway through; every request should still succeed, and the failing
+  server should be taken out of rotation after a few failures
+"""
+
+import argparse
+import logging
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add core directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.ollama_client import OllamaClient
+
+
+def unused_url() -> str:
+    """URL of a local port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def run(client: OllamaClient, requests: int, jobs: int, on_request=None):
+    """Send requests concurrently; returns (seconds, failures)"""
+
+    def send(index: int) -> bool:
+        if on_request:
+            on_request(index)
+        try:
+            client.generate(f"prompt {index}", max_tokens=20)
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(send, range(requests)))
+    return time.perf_counter() - start, results.count(False)
+
+
+def report(label: str, servers, elapsed: float, failures: int, requests: int):
+    counts = "  ".join(f"{name} {server.requests:>4}" for name, server in servers)
+    print(f"{label:<22} {requests / elapsed:8.1f} req/s  failed {failures:>3}   served: {counts}")
+
+
+def balance(args):
+    print(
+        f"balance: {args.requests} requests, {args.jobs} concurrent, "
+        f"latency {args.latency * 1000:.0f} ms (slow server x{args.slow_factor:g})"
+    )
+    fast = [MockOllamaServer(latency=args.latency, parallel=args.parallel) for _ in range(2)]
+    slow = MockOllamaServer(
+        latency=args.latency * args.slow_factor, parallel=args.parallel, loaded=False
+    )
+    for server in fast + [slow]:
+        server.start()
+
+    try:
+        with OllamaClient(host=fast[0].url, pool_size=args.jobs) as client:
+            elapsed, failures = run(client, args.requests, args.jobs)
+        report("single host", [("fast1", fast[0])], elapsed, failures, args.requests)
+        fast[0].httpd.requests = 0
+
+        hosts = [server.url for server in fast + [slow]]
+        with OllamaClient(hosts=hosts, pool_size=args.jobs) as client:
+            elapsed, failures = run(client, args.requests, args.jobs)
+        report(
+            "3 hosts",
+            [("fast1", fast[0]), ("fast2", fast[1]), ("slow", slow)],
+            elapsed,
+            failures,
+            args.requests,
+        )
+    finally:
+        for server in fast + [slow]:
+            server.stop()
+
+
+def failover(args):
+    print(
+        f"failover: {args.requests} requests, one server down,"
+        f" one failing from request {args.requests // 2}"
+    )
+    healthy = MockOllamaServer(latency=args.latency, parallel=args.parallel).start()
+    flaky = MockOllamaServer(latency=args.latency, parallel=args.parallel).start()
+
+    def break_flaky(index: int):
+        if index == args.requests // 2:
+            flaky.httpd.error_status = 503
+
+    try:
+        hosts = [unused_url(), flaky.url, healthy.url]
+        with OllamaClient(hosts=hosts, pool_size=args.jobs, circuit_reset=60) as client:
+            elapsed, failures = run(client, args.requests, args.jobs, on_request=break_flaky)
+            states = {state["host"]: state["state"] for state in client.pool.snapshot()}
+        report(
+            "down + flaky + ok",
+            [("flaky", flaky), ("ok", healthy)],
+            elapsed,
+            failures,
+            args.requests,
+        )
+        print(
+            f"{'':<22} circuits: down {states[hosts[0]]}, flaky {states[flaky.url]},"
+            f" ok {states[healthy.url]}"
+        )
+    finally:
+        healthy.stop()
+        flaky.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per run")
+    parser.add_argument("--jobs", type=int, default=8, help="Concurrent requests")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Seconds per request on a fast server"
+    )
+    parser.add_argument(
+        "--parallel", type=int, default=2, help="Requests each server generates at a time"
+    )
+    parser.add_argument(
+        "--slow-factor", type=float, default=5.0, help="How much slower the slow server is"
+    )
+    args = parser.parse_args()
+    # Failover warnings would drown the results
+    logging.disable(logging.WARNING)
+
+    balance(args)
+    print()
+    failover(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
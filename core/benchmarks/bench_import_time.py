@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark import time of the package and the CLI entry point
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters,
+reports the best cumulative import time of each module and the slowest
+modules it pulled in, and fails (exit status 1) when an import exceeds its
+threshold or loads a dependency that must stay deferred. Run it in CI or
+before touching imports in commit_by_lee/__init__.py or cli.py.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+CORE_DIR = Path(__file__).parent.parent
+
+# Module -> default threshold in milliseconds
+DEFAULT_THRESHOLDS = {
+    "commit_by_lee": 30.0,
+    "commit_by_lee.cli": 150.0,
+}
+
+# Heavy dependencies that must not be imported just to start the CLI
+DEFERRED_MODULES = ("requests", "pydantic", "yaml", "httpx", "rich.live", "rich.syntax")
+
+_LINE_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(module: str):
+    """
+    Import module in a fresh interpreter
+
+    Returns:
+        (cumulative microseconds of module,
+         {module imported by it: cumulative microseconds})
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=CORE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE_PATTERN.match(line)
+        if match:
+            entries.append((len(match.group(3)), match.group(4), int(match.group(2))))
+
+    # Children are printed before their parent with deeper indentation, so
+    # the module's imports are the deeper entries right above its own line
+    for index in range(len(entries) - 1, -1, -1):
+        depth, name, cumulative = entries[index]
+        if name == module:
+            imported = {}
+            for child_depth, child, child_cumulative in reversed(entries[:index]):
+                if child_depth <= depth:
+                    break
+                imported.setdefault(child, child_cumulative)
+            return cumulative, imported
+
+    return 0, {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imported modules to show")
+    parser.add_argument(
+        "--threshold",
+        action="append",
+        default=[],
+        metavar="MODULE=MS",
+        help="Override a threshold, e.g. commit_by_lee.cli=200",
+    )
+    args = parser.parse_args()
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for override in args.threshold:
+        module, _, limit = override.partition("=")
+        thresholds[module] = float(limit)
+
+    failures = []
+    for module, limit in thresholds.items():
+        runs = [measure(module) for _ in range(args.repeat)]
+        best, imported = min(runs, key=lambda run: run[0])
+        best_ms = best / 1000
+
+        status = "OK" if best_ms <= limit else "FAIL"
+        print(f"{module:<24} {best_ms:8.1f} ms  (threshold {limit:.0f} ms)  {status}")
+
+        for name, us in sorted(imported.items(), key=lambda item: -item[1])[: args.top]:
+            print(f"    {name:<40} {us / 1000:8.1f} ms")
+
+        if best_ms > limit:
+            failures.append(f"{module} took {best_ms:.1f} ms (threshold {limit:.0f} ms)")
+
+        loaded = [name for name in DEFERRED_MODULES if name in imported]
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)} at start-up")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel extraction of a large staged patch
+
+Creates a temporary repository with thousands of staged modified files,
+then analyzes the whole staged patch (as a str and spilled to a mapped
+file) with one git diff call and with concurrent calls over batches of
+files, checking that the results are identical. Speedups need several
+CPUs; worker counts above the CPU count show the overhead on smaller
+machines.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add core directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from commit_by_lee.diff_analyzer import DiffAnalyzer
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def create_repo(repo: Path, files: int, seed: int = 0):
+    """Commit `files` modules, then modify and stage all of them"""
+    rng = random.Random(seed)
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.email", "bench@example.com")
+    _git(repo, "config", "user.name", "bench")
+
+    paths = [repo / f"pkg_{index // 50}" / f"module_{index % 50}.py" for index in range(files)]
+    for path in paths:
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(
+            "".join(
+                f"def fn_{line}(x):\n    return x * {rng.randint(0, 999)}\n"
+                for line in range(rng.randint(5, 120))
+            )
+        )
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "init")
+
+    for path in paths:
+        text = path.read_text().replace("return x *", "return x +", rng.randint(1, 8))
+        path.write_text(text + "\n# changed\n")
+    _git(repo, "add", "-A")
+
+
+def signature(analysis):
+    """Everything about an analysis that must not depend on the worker count"""
+    return (
+        str(analysis.raw_diff),
+        [
+            (f.path, f.insertions, f.deletions, f.start, f.end, [(h.start, h.end) for h in f.hunks])
+            for f in analysis.files
+        ],
+        analysis.truncated,
+        analysis.suggested_type,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=3000, help="Staged files")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per measurement (best is reported)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        print(f"Creating repository with {args.files} staged files ({os.cpu_count()} CPUs)...")
+        create_repo(repo, args.files)
+
+        for label, options in (("str", {"max_chars": 10**10}), ("spill", {"spill": True})):
+            baseline = None
+            for workers in args.workers:
+                analyzer = DiffAnalyzer(str(repo), workers=workers)
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    analysis = analyzer.analyze_staged(**options)
+                    best = min(best, time.perf_counter() - start)
+                result = signature(analysis)
+                baseline = baseline or (best, result)
+                assert result == baseline[1], f"{workers} workers changed the result"
+                print(
+                    f"{label:<6} workers {workers:2d}  {best:7.3f} s  ({baseline[0] / best:.2f}x)"
+                    f"  {len(analysis.files)} files, {len(analysis.raw_diff) / 1024 / 1024:.1f} MB"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark server-side prompt prefix reuse
+
+Generates messages for a series of different diffs, then regenerates the
+last one, and prints the prompt tokens the server actually evaluated
+(prompt_eval_count) next to the estimated size of the full prompt. With the
+instructions in a stable system prompt and the model kept loaded, only the
+first request should evaluate them; the regenerate request continues the
+previous one through its context and evaluates just the follow-up.
+
+Runs against a local mock server (which simulates prefix reuse) unless
+--host points at a real Ollama server.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add core directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.diff_analyzer import DiffAnalyzer
+from commit_by_lee.llm_generator import CommitMessageGenerator
+from commit_by_lee.models.schemas import Language
+from commit_by_lee.ollama_client import OllamaClient
+from commit_by_lee.utils import estimate_tokens
+
+
+def make_diff(index: int) -> str:
+    """Small single-file diff that differs per index"""
+    lines = "".join(f"+    value_{index}_{line} = compute({line})\n" for line in range(12))
+    return (
+        f"diff --git a/src/module_{index}.py b/src/module_{index}.py\n"
+        f"--- a/src/module_{index}.py\n"
+        f"+++ b/src/module_{index}.py\n"
+        f"@@ -1,2 +1,14 @@\n"
+        f" def handler_{index}():\n"
+        f"{lines}"
+        f"     return None\n"
+    )
+
+
+def report(label: str, prompt_tokens: int, message):
+    stats = message.stats
+    if stats is None or stats.prompt_eval_count is None:
+        print(f"{label:<14} {prompt_tokens:>8}   (no stats reported)")
+        return
+    duration = (
+        f"{stats.prompt_eval_duration / 1e6:8.1f} ms" if stats.prompt_eval_duration else "       ?"
+    )
+    print(f"{label:<14} {prompt_tokens:>8} {stats.prompt_eval_count:>10}   {duration}")
+
+
+def run(client: OllamaClient, commits: int):
+    generator = CommitMessageGenerator(client, Language.ENGLISH)
+    analyzer = DiffAnalyzer()
+    system_tokens = estimate_tokens(generator._system_prompt())
+
+    print(f"{'request':<14} {'prompt':>8} {'evaluated':>10}   prompt eval time")
+    for index in range(commits):
+        diff = make_diff(index)
+        analysis = analyzer._analyze_diff(diff)
+        message = generator.generate(diff, analysis)
+        report(
+            f"commit {index + 1}",
+            system_tokens + estimate_tokens(generator._build_prompt(diff, analysis)),
+            message,
+        )
+
+    instruction = "Mention the handler."
+    refined = generator.refine(message, diff, analysis, instruction=instruction)
+    report("regenerate", estimate_tokens(generator._build_refine_prompt(instruction)), refined)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--commits", type=int, default=5, help="Different diffs to generate for")
+    parser.add_argument("--host", help="Real Ollama server (default: local mock server)")
+    parser.add_argument("--model", default="qwen3:4b", help="Model name on the real server")
+    args = parser.parse_args()
+
+    if args.host:
+        with OllamaClient(host=args.host, model=args.model, timeout=120) as client:
+            run(client, args.commits)
+        return 0
+
+    with MockOllamaServer() as server, OllamaClient(host=server.url) as client:
+        run(client, args.commits)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
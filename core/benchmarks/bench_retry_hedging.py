@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark retries and hedged requests against an unreliable server
+
+- retries: a server failing a share of requests with 503; compares the
+  requests that fail with and without retries
+- hedging: two servers where a small share of requests stalls; compares
+  latency percentiles with and without hedging, and how many extra
+  requests hedging sent
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add core directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.ollama_client import OllamaClient
+
+
+def run(client: OllamaClient, requests: int, jobs: int):
+    """Send requests concurrently; returns (latencies of successes, failures)"""
+
+    def send(index: int):
+        start = time.perf_counter()
+        try:
+            client.generate(f"prompt {index}", max_tokens=20)
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(send, range(requests)))
+    latencies = [latency for latency in results if latency is not None]
+    return latencies, len(results) - len(latencies)
+
+
+def percentile(values, percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(percent / 100 * len(ordered)))]
+
+
+def retries(args):
+    print(f"retries: {args.requests} requests, {args.error_rate:.0%} answered with 503")
+    with MockOllamaServer(error_rate=args.error_rate, seed=1) as server:
+        for count in (0, 1, 2):
+            with OllamaClient(host=server.url, retries=count, retry_backoff=0.01) as client:
+                latencies, failures = run(client, args.requests, args.jobs)
+            print(
+                f"  retries={count}   failed {failures:>4} ({failures / args.requests:6.1%})"
+                f"   mean {statistics.mean(latencies) * 1000:6.1f} ms"
+            )
+
+
+def hedging(args):
+    print(
+        f"hedging: {args.requests} requests, latency {args.latency * 1000:.0f} ms, "
+        f"{args.tail_fraction:.0%} stall for {args.tail_latency * 1000:.0f} ms, 2 servers"
+    )
+    servers = [
+        MockOllamaServer(
+            latency=args.latency,
+            tail_latency=args.tail_latency,
+            tail_fraction=args.tail_fraction,
+            seed=seed,
+        ).start()
+        for seed in (1, 2)
+    ]
+    try:
+        hosts = [server.url for server in servers]
+        for hedge in (False, True):
+            sent_before = sum(server.requests for server in servers)
+            with OllamaClient(
+                hosts=hosts, hedge=hedge, hedge_delay=args.tail_latency / 2
+            ) as client:
+                latencies, failures = run(client, args.requests, args.jobs)
+                delay = client.hedge_delay
+            extra = sum(server.requests for server in servers) - sent_before - args.requests
+            label = f"hedge after {delay * 1000:.0f} ms" if hedge else "no hedging"
+            print(
+                f"  {label:<20} p50 {percentile(latencies, 50) * 1000:6.1f} ms"
+                f"   p95 {percentile(latencies, 95) * 1000:6.1f} ms"
+                f"   p99 {percentile(latencies, 99) * 1000:6.1f} ms"
+                f"   extra requests {extra:>3} ({extra / args.requests:.0%})"
+            )
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400, help="Requests per run")
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent requests")
+    parser.add_argument("--error-rate", type=float, default=0.2, help="Share of failing requests")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per normal request")
+    parser.add_argument(
+        "--tail-latency", type=float, default=0.5, help="Seconds per stalled request"
+    )
+    parser.add_argument(
+        "--tail-fraction", type=float, default=0.03, help="Share of stalled requests"
+    )
+    args = parser.parse_args()
+    # Retry and failover logs would drown the results
+    logging.disable(logging.ERROR)
+
+    retries(args)
+    print()
+    hedging(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark staged diff statistics: git numstat backend vs patch parsing
+
+Creates a temporary repository with thousands of staged file changes and
+compares DiffAnalyzer.get_staged_stats (git diff --raw --numstat -z) with
+generating the full patch and parsing it (get_staged_diff + _analyze_diff).
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add core directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from commit_by_lee.diff_analyzer import DiffAnalyzer
+
+
+def _git(repo: Path, *args: str):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def create_repo(repo: Path, files: int, lines: int):
+    """Create a repo with `files` committed files, then stage a change to each"""
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.email", "bench@example.com")
+    _git(repo, "config", "user.name", "bench")
+
+    body = "".join(f"value_{i} = {i}\n" for i in range(lines))
+    for index in range(files):
+        path = repo / f"pkg_{index % 50}" / f"module {index}.py"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(body)
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "initial")
+
+    changed = "".join(
+        f"value_{i} = {i * 2}\n" if i % 10 == 0 else f"value_{i} = {i}\n" for i in range(lines)
+    )
+    for index in range(files):
+        (repo / f"pkg_{index % 50}" / f"module {index}.py").write_text(changed)
+    _git(repo, "add", "-A")
+
+
+def best_of(repeat, func):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000, help="Number of staged files")
+    parser.add_argument("--lines", type=int, default=200, help="Lines per file")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        print(f"Creating repository with {args.files} staged files...")
+        create_repo(repo, args.files, args.lines)
+        analyzer = DiffAnalyzer(str(repo))
+
+        patch_time, patch_stats = best_of(
+            args.repeat, lambda: analyzer._analyze_diff(analyzer.get_staged_diff()).stats
+        )
+        git_time, git_stats = best_of(args.repeat, analyzer.get_staged_stats)
+
+    assert patch_stats.files == git_stats.files
+    assert patch_stats.insertions == git_stats.insertions
+    assert patch_stats.deletions == git_stats.deletions
+
+    print(f"{git_stats.files_changed} files, +{git_stats.insertions} -{git_stats.deletions}")
+    print(f"patch parser  {patch_time * 1000:9.1f} ms")
+    print(f"git numstat   {git_time * 1000:9.1f} ms")
+    print(f"Speedup: {patch_time / git_time:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,17 +4,50 @@ Commit by Lee - AI-powered Git Commit Message Generator
 Generate commit messages automatically using Qwen3:4B via Ollama.
 """
 
+from typing import TYPE_CHECKING
+
 __version__ = "0.1.0"
 __author__ = "Lee"
 __description__ = "Generate commit messages otomatis dengan AI, 100% lokal & privasi terjaga"
 
-from .ollama_client import OllamaClient
-from .diff_analyzer import DiffAnalyzer
-from .llm_generator import CommitMessageGenerator
-from .config import Config
+# Public names and the submodules defining them. Submodules pull in requests,
+# pydantic and yaml, so they are only imported on first attribute access
+# (PEP 562) to keep `import commit_by_lee` and the CLI start-up fast.
+_LAZY_ATTRIBUTES = {
+    "OllamaClient": ".ollama_client",
+    "AsyncOllamaClient": ".async_ollama_client",
+    "DiffAnalyzer": ".diff_analyzer",
+    "CommitMessageGenerator": ".llm_generator",
+    "Config": ".config",
+}
+
+if TYPE_CHECKING:
+    from .ollama_client import OllamaClient
+    from .async_ollama_client import AsyncOllamaClient
+    from .diff_analyzer import DiffAnalyzer
+    from .llm_generator import CommitMessageGenerator
+    from .config import Config
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
+
 
 __all__ = [
     "OllamaClient",
+    "AsyncOllamaClient",
     "DiffAnalyzer",
     "CommitMessageGenerator",
     "Config",
@@ -0,0 +1,519 @@
+"""Async Ollama API client for concurrent requests"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from .host_pool import Backend, HostPool
+from .models.schemas import ConfigModel, GenerationResult, GenerationStats
+from .ollama_client import OllamaClient
+from .retry import backoff_delay
+
+# Optional dependency, imported by the first AsyncOllamaClient (it takes
+# about as long to import as everything else in the package)
+httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+def _import_httpx():
+    """Import httpx on first use"""
+    global httpx
+    if httpx is None:
+        try:
+            import httpx as module
+        except ImportError as e:
+            raise ImportError(
+                "AsyncOllamaClient requires httpx; "
+                "install it with: pip install commit-by-lee[async]"
+            ) from e
+        httpx = module
+
+
+class AsyncOllamaClient:
+    """
+    Async Ollama API client
+
+    Mirrors OllamaClient on httpx's async stack, for workflows that fan out
+    many requests at once (summarizing parts of a large diff, generating
+    several messages). All requests on an event loop share one connection
+    pool, and a semaphore bounds how many are in flight so the server is
+    not flooded.
+    Several hosts are balanced and failed over like in OllamaClient, from
+    request outcomes only (no background health checks), and failed
+    requests are retried with the same backoff. Requests are not hedged.
+
+    Requires the optional httpx dependency: pip install commit-by-lee[async]
+    """
+
+    # Same /api/generate payload as the blocking client
+    _build_payload = OllamaClient._build_payload
+
+    def __init__(
+        self,
+        host: str = "https://ollama.iotech.my.id",
+        model: str = "qwen3:4b",
+        timeout: int = 30,
+        pool_size: int = 4,
+        pool_idle_timeout: float = 60.0,
+        num_ctx: int = 4096,
+        keep_alive: Optional[Union[str, int]] = "30m",
+        max_concurrency: Optional[int] = None,
+        hosts: Optional[List[str]] = None,
+        failure_threshold: int = 3,
+        circuit_reset: float = 30.0,
+        retries: int = 2,
+        retry_backoff: float = 0.5,
+        retry_backoff_max: float = 8.0,
+    ):
+        """
+        Initialize async Ollama client
+
+        Args:
+            host: Ollama server URL
+            model: Model name (default: qwen3:4b)
+            timeout: Request timeout in seconds
+            pool_size: Maximum number of connections to the host
+            pool_idle_timeout: Seconds an idle connection is kept alive
+            num_ctx: Context window in tokens, prompt and response included
+            keep_alive: How long the server keeps the model loaded after a request
+            max_concurrency: Maximum requests in flight (default: pool_size)
+            hosts: Several Ollama server URLs to balance across (replaces host)
+            failure_threshold: Consecutive failures that take a server out of rotation
+            circuit_reset: Seconds before a server out of rotation is tried again
+            retries: Retries after a request failed on every host
+            retry_backoff: Upper bound of the first retry delay in seconds
+            retry_backoff_max: Upper bound of any retry delay in seconds
+        """
+        _import_httpx()
+
+        self.pool = HostPool(
+            hosts or [host], failure_threshold=failure_threshold, reset_timeout=circuit_reset
+        )
+        self.hosts = [backend.host for backend in self.pool.backends]
+        self.host = self.hosts[0]
+        self.model = model
+        self.timeout = timeout
+        self.api_base = f"{self.host}/api"
+        self.pool_size = max(1, pool_size)
+        self.pool_idle_timeout = pool_idle_timeout
+        self.num_ctx = num_ctx
+        self.keep_alive = keep_alive
+        self.max_concurrency = max(1, max_concurrency or self.pool_size)
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+
+        # HTTP client, semaphore and closing guard (see _close_on_shutdown)
+        # of each event loop the client is used from
+        self._pools: Dict[
+            asyncio.AbstractEventLoop, Tuple["httpx.AsyncClient", asyncio.Semaphore, Any]
+        ] = {}
+
+    @classmethod
+    def from_config(cls, config: ConfigModel) -> "AsyncOllamaClient":
+        """
+        Create client from configuration
+
+        Args:
+            config: ConfigModel object
+
+        Returns:
+            AsyncOllamaClient instance
+        """
+        return cls(
+            host=config.ollama_host,
+            model=config.ollama_model,
+            timeout=config.ollama_timeout,
+            pool_size=config.ollama_pool_size,
+            pool_idle_timeout=config.ollama_pool_idle_timeout,
+            num_ctx=config.ollama_num_ctx,
+            keep_alive=config.ollama_keep_alive,
+            hosts=config.ollama_hosts or None,
+            failure_threshold=config.ollama_failure_threshold,
+            circuit_reset=config.ollama_circuit_reset,
+            retries=config.ollama_retries,
+            retry_backoff=config.ollama_retry_backoff,
+            retry_backoff_max=config.ollama_retry_backoff_max,
+        )
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """Pooled HTTP client shared by all requests of this client"""
+        return self._ensure_pool()[0]
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding requests in flight"""
+        return self._ensure_pool()[1]
+
+    def _ensure_pool(self):
+        """
+        Get the HTTP client and semaphore of the running event loop
+
+        Connections belong to the event loop they were opened on, so each
+        loop gets its own pool (e.g. each asyncio.run()). A pool is closed
+        while its loop shuts down (see _close_on_shutdown), or by aclose().
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            # Loops closed without shutting down their async generators
+            for stale in [stale for stale in self._pools if stale.is_closed()]:
+                logger.debug("Dropping the connection pool of a closed event loop")
+                del self._pools[stale]
+
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=self.pool_idle_timeout or None,
+                ),
+            )
+            guard = self._close_on_shutdown(loop, client)
+            pool = self._pools[loop] = (client, asyncio.Semaphore(self.max_concurrency), guard)
+            # Run the guard to its yield right away (it awaits nothing before)
+            try:
+                guard.asend(None).send(None)
+            except StopIteration:
+                pass
+        return pool
+
+    async def _close_on_shutdown(
+        self, loop: asyncio.AbstractEventLoop, client: "httpx.AsyncClient"
+    ):
+        """
+        Async generator that closes a loop's pool when the loop shuts down
+
+        It is left suspended at its first yield. asyncio.run() (and any
+        loop shut down with loop.shutdown_asyncgens()) closes suspended
+        async generators before closing the loop, which runs the finally
+        clause while the pool's connections can still be closed cleanly.
+        The pool holds the generator: asyncio only keeps a weak reference.
+        """
+        try:
+            yield
+        finally:
+            await self._close_pool(loop, client)
+
+    async def _close_pool(self, loop: asyncio.AbstractEventLoop, client: "httpx.AsyncClient"):
+        """Close client and forget it if it is still the pool of loop"""
+        if self._pools.get(loop, (None,))[0] is client:
+            del self._pools[loop]
+        await client.aclose()
+
+    async def aclose(self):
+        """
+        Close pooled connections
+
+        Closes the pool of the running event loop, and those of loops
+        running in other threads; pools of loops that are not running are
+        closed when those loops shut down.
+        """
+        current = asyncio.get_running_loop()
+        for loop, (_, _, guard) in list(self._pools.items()):
+            if loop is current:
+                await guard.aclose()
+            elif loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(guard.aclose(), loop))
+
+    async def __aenter__(self) -> "AsyncOllamaClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        system: Optional[str] = None,
+        context: Optional[List[int]] = None,
+        **kwargs,
+    ) -> str:
+        """
+        Generate text from prompt
+
+        Args:
+            prompt: Input prompt with git diff
+            temperature: Sampling temperature (0.0 - 1.0)
+            max_tokens: Maximum tokens to generate
+            system: System prompt (fixed instructions sent ahead of the prompt)
+            context: Context returned by a previous request, to continue it
+            **kwargs: Additional parameters
+
+        Returns:
+            Generated text
+
+        Raises:
+            httpx.HTTPError: If API request fails
+        """
+        result = await self.generate_result(prompt, temperature, max_tokens, system, context)
+        return result.text
+
+    async def generate_result(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        system: Optional[str] = None,
+        context: Optional[List[int]] = None,
+        seed: Optional[int] = None,
+    ) -> GenerationResult:
+        """
+        Generate text and return it with the context and stats of the request
+
+        Args:
+            prompt: Input prompt with git diff
+            temperature: Sampling temperature (0.0 - 1.0)
+            max_tokens: Maximum tokens to generate
+            system: System prompt (fixed instructions sent ahead of the prompt)
+            context: Context returned by a previous request, to continue it
+            seed: Sampling seed, e.g. to get different completions of one prompt
+
+        Returns:
+            GenerationResult object
+
+        Raises:
+            httpx.HTTPError: If API request fails
+        """
+        payload = self._build_payload(
+            prompt, temperature, max_tokens, stream=False, system=system, context=context, seed=seed
+        )
+
+        try:
+            logger.debug(f"Prompt length: {len(prompt)} characters")
+
+            result = await self._post_generate(payload)
+            generated_text = result.get("response", "")
+            stats = GenerationStats.from_response(result)
+
+            logger.info(f"Generated {len(generated_text)} characters")
+            logger.debug(f"Stats: {stats.describe()}")
+            if not generated_text:
+                logger.warning("Empty response from Ollama")
+                logger.debug(f"Done reason: {result.get('done_reason')}")
+
+            return GenerationResult(
+                text=generated_text.strip(), context=result.get("context"), stats=stats
+            )
+
+        except httpx.TimeoutException:
+            logger.error(f"Request timeout after {self.timeout}s")
+            raise
+        except httpx.HTTPError as e:
+            logger.error(f"Request failed: {e}")
+            raise
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        system: Optional[str] = None,
+        context: Optional[List[int]] = None,
+        **kwargs,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate with streaming, yielding NDJSON chunks as they arrive
+
+        Closing the iterator early (aclose()) closes the HTTP response, which
+        makes the server stop generating. The request holds its semaphore
+        slot until the stream ends.
+
+        Args:
+            prompt: Input prompt with git diff
+            temperature: Sampling temperature (0.0 - 1.0)
+            max_tokens: Maximum tokens to generate
+            system: System prompt (fixed instructions sent ahead of the prompt)
+            context: Context returned by a previous request, to continue it
+            **kwargs: Additional parameters
+
+        Yields:
+            Response chunks
+
+        Raises:
+            httpx.HTTPError: If API request fails
+        """
+        payload = self._build_payload(
+            prompt, temperature, max_tokens, stream=True, system=system, context=context
+        )
+
+        try:
+            last_error = None
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    await self._wait_before_retry(attempt, last_error)
+
+                tried: List[Backend] = []
+                async with self.semaphore:
+                    while True:
+                        backend = self.pool.acquire(exclude=tried)
+                        tried.append(backend)
+                        url = f"{backend.api_base}/generate"
+                        logger.info(f"Streaming request to {url} with model {self.model}")
+
+                        streamed = False
+                        failed = False
+                        start = time.perf_counter()
+                        try:
+                            async with self.client.stream("POST", url, json=payload) as response:
+                                response.raise_for_status()
+
+                                async for line in response.aiter_lines():
+                                    if not line:
+                                        continue
+
+                                    chunk = json.loads(line)
+                                    if chunk.get("error"):
+                                        raise httpx.HTTPError(chunk["error"])
+
+                                    streamed = True
+                                    yield chunk
+
+                                    if chunk.get("done"):
+                                        logger.debug(f"Done reason: {chunk.get('done_reason')}")
+                                        break
+                            return
+
+                        except httpx.HTTPError as e:
+                            failed = self._is_server_failure(e)
+                            # Once text was streamed, switching servers would repeat it
+                            if not failed or streamed:
+                                raise
+                            last_error = e
+                            if len(tried) >= len(self.pool):
+                                break
+                            logger.warning(f"{backend.host} failed ({e}), trying another server")
+
+                        finally:
+                            self.pool.release(
+                                backend,
+                                ok=not failed,
+                                latency=time.perf_counter() - start if not failed else None,
+                            )
+
+            raise last_error
+
+        except httpx.TimeoutException:
+            logger.error(f"Request timeout after {self.timeout}s")
+            raise
+        except httpx.HTTPError as e:
+            logger.error(f"Request failed: {e}")
+            raise
+
+    async def _post_generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a non-streaming /api/generate request
+
+        Fails over between hosts, and retries with backoff once every host
+        failed.
+
+        Args:
+            payload: Request payload
+
+        Returns:
+            Decoded response
+
+        Raises:
+            httpx.HTTPError: If the request failed on every attempt
+        """
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await self._wait_before_retry(attempt, last_error)
+
+            tried: List[Backend] = []
+            async with self.semaphore:
+                while True:
+                    backend = self.pool.acquire(exclude=tried)
+                    tried.append(backend)
+                    url = f"{backend.api_base}/generate"
+                    logger.info(f"Sending request to {url} with model {self.model}")
+
+                    start = time.perf_counter()
+                    try:
+                        response = await self.client.post(url, json=payload)
+                        response.raise_for_status()
+                        result = response.json()
+                    except httpx.HTTPError as e:
+                        failed = self._is_server_failure(e)
+                        self.pool.release(backend, ok=not failed)
+                        if not failed:
+                            raise
+                        last_error = e
+                        if len(tried) >= len(self.pool):
+                            break
+                        logger.warning(f"{backend.host} failed ({e}), trying another server")
+                        continue
+
+                    self.pool.release(backend, ok=True, latency=time.perf_counter() - start)
+                    return result
+
+        raise last_error
+
+    async def _wait_before_retry(self, attempt: int, error: Exception):
+        """Sleep the backoff delay before a retry (semaphore released)"""
+        delay = backoff_delay(attempt, self.retry_backoff, self.retry_backoff_max)
+        logger.warning(
+            f"Request failed ({error}), retrying in {delay:.1f}s ({attempt}/{self.retries})"
+        )
+        await asyncio.sleep(delay)
+
+    @staticmethod
+    def _is_server_failure(error: "httpx.HTTPError") -> bool:
+        """Whether a failed request counts against the server (see OllamaClient)"""
+        if isinstance(error, httpx.TransportError):
+            return True
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500 or error.response.status_code == 404
+        return False
+
+    async def check_connection(self) -> bool:
+        """
+        Test connection to Ollama server and verify Qwen3:4B availability
+
+        Returns:
+            True if connection successful and Qwen3:4B is available
+        """
+        try:
+            models = await self._get_models()
+            model_names = [m.get("name", "") for m in models]
+            qwen_available = any("qwen3:4b" in name for name in model_names)
+
+            if qwen_available:
+                logger.info("[OK] Connection successful! Qwen3:4B is available")
+            else:
+                logger.warning(
+                    f"[OK] Connected but Qwen3:4B not found. Available models: {model_names}"
+                )
+
+            return qwen_available
+
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"[X] Connection failed: {e}")
+            return False
+
+    async def list_models(self) -> list:
+        """
+        List all available models on the server
+
+        Returns:
+            List of model dictionaries
+        """
+        try:
+            return await self._get_models()
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Failed to list models: {e}")
+            return []
+
+    async def _get_models(self) -> list:
+        """Fetch /api/tags"""
+        async with self.semaphore:
+            response = await self.client.get(f"{self.api_base}/tags", timeout=10)
+        response.raise_for_status()
+        return response.json().get("models", [])
@@ -0,0 +1,153 @@
+"""Generate commit messages for a range of existing commits"""
+
+import json
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, NamedTuple, Optional, TextIO
+
+from .llm_generator import CommitMessageGenerator
+from .models.parsed import CommitDiff
+from .models.schemas import CommitMessage, CommitStyle
+
+logger = logging.getLogger(__name__)
+
+# Heredoc terminator in msg-filter scripts; suffixed with the commit hash
+SCRIPT_DELIMITER = "COMMIT_BY_LEE_MESSAGE"
+
+
+class BatchResult(NamedTuple):
+    """Generated message for one commit (message is None when it was skipped)"""
+
+    commit: CommitDiff
+    message: Optional[CommitMessage]
+
+
+def generate_for_commits(
+    generator: CommitMessageGenerator,
+    commits: Iterable[CommitDiff],
+    jobs: int = 4,
+    style: CommitStyle = CommitStyle.CONVENTIONAL,
+) -> Iterator[BatchResult]:
+    """
+    Generate messages for many commits concurrently
+
+    At most `jobs` generations run at once, and commits are pulled from the
+    (streamed) input only as fast as results are consumed, so an arbitrarily
+    long range never sits in memory. Results come out in input order.
+
+    Args:
+        generator: Commit message generator; its Ollama client should pool
+            at least `jobs` connections
+        commits: Commits to reword, e.g. from DiffAnalyzer.iter_commits
+        jobs: Maximum concurrent generations
+        style: Commit message style
+
+    Yields:
+        BatchResult per commit, in input order
+    """
+
+    def generate(commit: CommitDiff) -> Optional[CommitMessage]:
+        if not commit.analysis.raw_diff:
+            # Empty commits and pure mode changes: nothing to describe
+            return None
+        return generator.generate(
+            diff=commit.analysis.raw_diff, analysis=commit.analysis, style=style
+        )
+
+    jobs = max(1, jobs)
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for commit in commits:
+            pending.append((commit, executor.submit(generate, commit)))
+            # Keep the pool busy while the oldest result is being waited on
+            if len(pending) >= jobs * 2:
+                done_commit, future = pending.popleft()
+                yield BatchResult(done_commit, future.result())
+
+        while pending:
+            done_commit, future = pending.popleft()
+            yield BatchResult(done_commit, future.result())
+
+
+def format_jsonl(result: BatchResult) -> str:
+    """
+    Format a result as one JSON line
+
+    Args:
+        result: Batch result
+
+    Returns:
+        JSON object without trailing newline
+    """
+    commit = result.commit
+    record = {
+        "commit": commit.sha,
+        "original_subject": commit.subject,
+        "message": result.message.format_conventional() if result.message else None,
+        "files_changed": commit.analysis.stats.files_changed,
+        "insertions": commit.analysis.stats.insertions,
+        "deletions": commit.analysis.stats.deletions,
+        "truncated": commit.analysis.truncated,
+    }
+    return json.dumps(record, ensure_ascii=False)
+
+
+class MsgFilterScriptWriter:
+    """
+    Write results as a shell script for git filter-branch --msg-filter
+
+    git runs the script once per rewritten commit with the original hash in
+    $GIT_COMMIT and the old message on stdin; the script prints the new
+    message, or passes the old one through for commits without a result.
+
+    Usage:
+        with MsgFilterScriptWriter(stream, "main..feature") as writer:
+            for result in results:
+                writer.write(result)
+    """
+
+    def __init__(self, stream: TextIO, rev_range: str):
+        """
+        Initialize writer
+
+        Args:
+            stream: Output stream
+            rev_range: Revision range the script was generated for
+        """
+        self.stream = stream
+        self.rev_range = rev_range
+
+    def __enter__(self) -> "MsgFilterScriptWriter":
+        self.stream.write(
+            "#!/bin/sh\n"
+            f"# Commit messages generated by commit-by-lee for {self.rev_range}\n"
+            "# Apply with:\n"
+            f"#   git filter-branch --msg-filter 'sh /path/to/this/script' -- {self.rev_range}\n"
+            'case "$GIT_COMMIT" in\n'
+        )
+        return self
+
+    def write(self, result: BatchResult):
+        """
+        Add the message of one commit
+
+        Args:
+            result: Batch result; skipped commits keep their message
+        """
+        if result.message is None:
+            return
+
+        delimiter = f"{SCRIPT_DELIMITER}_{result.commit.sha}"
+        self.stream.write(
+            f"{result.commit.sha})\n"
+            f"cat <<'{delimiter}'\n"
+            f"{result.message.format_conventional()}\n"
+            f"{delimiter}\n"
+            ";;\n"
+        )
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream.write("*)\ncat\n;;\nesac\n")
+        self.stream.flush()
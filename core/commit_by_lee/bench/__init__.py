@@ -0,0 +1,21 @@
+"""
+Benchmark suite for Commit by Lee
+
+Runs the diff processing steps and the whole generate pipeline on synthetic
+diffs against a local mock Ollama server, so results do not depend on a
+real model and can be compared across versions (`commit-by-lee bench`).
+"""
+
+from .mock_ollama import MockOllamaServer
+from .suite import BENCHMARKS, BenchmarkResult, compare_reports, parse_size, run_suite
+from .synthetic_diff import generate_diff
+
+__all__ = [
+    "BENCHMARKS",
+    "BenchmarkResult",
+    "MockOllamaServer",
+    "compare_reports",
+    "generate_diff",
+    "parse_size",
+    "run_suite",
+]
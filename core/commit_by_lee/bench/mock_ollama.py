@@ -0,0 +1,274 @@
+"""
+Local stand-in for an Ollama server
+
+Implements just enough of the Ollama HTTP API (/api/tags, /api/ps and
+/api/generate) to benchmark the client without a real model, with a
+configurable time to first token (latency) and generation speed
+(token_rate). Speaks HTTP/1.1
+so clients can keep connections alive, and counts accepted connections so
+benchmarks can show whether they were reused.
+
+Like a real server, responses report prompt_eval_count: the prompt tokens
+(estimated at 4 characters each) left after the prefix shared with the
+previous request, or only the new prompt when a returned context is passed
+back.
+"""
+
+import contextlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_RESPONSE = "feat(core): add benchmark stand-in server\n\nServe canned responses locally"
+
+# Simulated evaluation speed, for the reported durations only
+PROMPT_NS_PER_TOKEN = 500_000
+EVAL_NS_PER_TOKEN = 20_000_000
+
+
+class _MockOllamaHandler(BaseHTTPRequestHandler):
+    """Request handler for the mock Ollama API"""
+
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment, otherwise Nagle + delayed ACK
+    # adds ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": self.server.model, "size": 0}]})
+        elif self.path == "/api/ps":
+            loaded = [{"name": self.server.model, "size_vram": 0}] if self.server.loaded else []
+            self._send_json({"models": loaded})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path != "/api/generate":
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        with self.server.lock:
+            self.server.requests += 1
+            error_status = self.server.error_status
+            if not error_status and self.server.random.random() < self.server.error_rate:
+                error_status = 503
+            latency = self.server.latency
+            if self.server.random.random() < self.server.tail_fraction:
+                latency = self.server.tail_latency
+            stats = None if error_status else self._evaluate_prompt(body)
+
+        if error_status:
+            self._send_json({"error": "simulated failure"}, status=error_status)
+            return
+
+        # Like Ollama's OLLAMA_NUM_PARALLEL, requests beyond capacity queue up
+        with self.server.capacity:
+            if latency:
+                time.sleep(latency)
+
+            if body.get("stream", True):
+                self._stream_response(body, stats)
+                return
+
+            if self.server.token_rate:
+                time.sleep(len(self.server.response.split(" ")) / self.server.token_rate)
+
+        self._send_json(
+            dict(
+                {
+                    "model": body.get("model", self.server.model),
+                    "response": self.server.response,
+                    "done": True,
+                    "done_reason": "stop",
+                },
+                **stats,
+            )
+        )
+
+    def _evaluate_prompt(self, body: dict) -> dict:
+        """Context, token counts and durations of a request (caller holds the lock)"""
+        text = (body.get("system") or "") + "\n" + body.get("prompt", "")
+        context = body.get("context")
+        if context and context[0] in self.server.conversations:
+            # Continuing a conversation: only the new prompt is evaluated
+            evaluated = len(body.get("prompt", "")) // 4
+            text = self.server.conversations[context[0]] + text
+        else:
+            shared = 0
+            for a, b in zip(text, self.server.last_prompt):
+                if a != b:
+                    break
+                shared += 1
+            evaluated = (len(text) - shared) // 4 + 1
+        self.server.last_prompt = text
+
+        conversation = len(self.server.conversations) + 1
+        self.server.conversations[conversation] = text + self.server.response
+        eval_count = len(self.server.response) // 4
+        return {
+            "context": [conversation],
+            "prompt_eval_count": evaluated,
+            "prompt_eval_duration": evaluated * PROMPT_NS_PER_TOKEN,
+            "eval_count": eval_count,
+            "eval_duration": eval_count * EVAL_NS_PER_TOKEN,
+            "load_duration": 0,
+            "total_duration": evaluated * PROMPT_NS_PER_TOKEN + eval_count * EVAL_NS_PER_TOKEN,
+        }
+
+    def _stream_response(self, body: dict, stats: dict):
+        """Send the canned response word by word as chunked NDJSON"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        model = body.get("model", self.server.model)
+        tokens = self.server.response.split(" ")
+        try:
+            for index, token in enumerate(tokens):
+                if self.server.token_rate:
+                    time.sleep(1 / self.server.token_rate)
+                text = token if index == 0 else " " + token
+                self._write_chunk({"model": model, "response": text, "done": False})
+            self._write_chunk(
+                dict({"model": model, "response": "", "done": True, "done_reason": "stop"}, **stats)
+            )
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading early
+            self.close_connection = True
+
+    def _write_chunk(self, data: dict):
+        line = json.dumps(data).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, data: dict, status: int = 200):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-stream is expected (early stop, cancellation)
+        pass
+
+
+class MockOllamaServer:
+    """
+    Threaded mock Ollama server bound to localhost
+
+    Usage:
+        with MockOllamaServer(latency=0.01) as server:
+            client = OllamaClient(host=server.url)
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        token_rate: float = 0.0,
+        response: str = DEFAULT_RESPONSE,
+        model: str = "qwen3:4b",
+        loaded: bool = True,
+        error_status: Optional[int] = None,
+        parallel: int = 0,
+        error_rate: float = 0.0,
+        tail_latency: float = 0.0,
+        tail_fraction: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize mock server
+
+        Args:
+            port: Port to bind (0 picks a free port)
+            latency: Seconds to wait before answering /api/generate
+            token_rate: Tokens (words of the response) generated per second,
+                streamed or not (0: instant)
+            response: Canned completion text
+            model: Model name reported by /api/tags
+            loaded: Whether /api/ps reports the model as loaded
+            error_status: Answer /api/generate with this HTTP status instead
+                (can be changed on httpd while running)
+            parallel: Requests generated at the same time, others wait
+                (0: unlimited)
+            error_rate: Fraction of /api/generate requests answered with 503
+            tail_latency: Latency of the slow fraction of requests
+            tail_fraction: Fraction of requests waiting tail_latency instead
+                of latency
+            seed: Seed for picking failing and slow requests
+        """
+        self.httpd = _MockHTTPServer(("127.0.0.1", port), _MockOllamaHandler)
+        self.httpd.lock = threading.Lock()
+        self.httpd.connections = 0
+        self.httpd.requests = 0
+        self.httpd.latency = latency
+        self.httpd.token_rate = token_rate
+        self.httpd.response = response
+        self.httpd.model = model
+        self.httpd.loaded = loaded
+        self.httpd.error_status = error_status
+        self.httpd.error_rate = error_rate
+        self.httpd.tail_latency = tail_latency
+        self.httpd.tail_fraction = tail_fraction
+        self.httpd.random = random.Random(seed)
+        self.httpd.capacity = (
+            threading.Semaphore(parallel) if parallel > 0 else contextlib.nullcontext()
+        )
+        self.httpd.last_prompt = ""
+        self.httpd.conversations = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def connections(self) -> int:
+        """Number of TCP connections accepted so far"""
+        return self.httpd.connections
+
+    @property
+    def requests(self) -> int:
+        """Number of /api/generate requests served so far"""
+        return self.httpd.requests
+
+    def start(self) -> "MockOllamaServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockOllamaServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
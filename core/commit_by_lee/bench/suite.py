@@ -0,0 +1,206 @@
+"""Benchmarks run by `commit-by-lee bench` and their JSON report"""
+
+import logging
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from .. import __version__
+from ..diff_analyzer import DiffAnalyzer
+from ..llm_generator import CommitMessageGenerator
+from ..models.schemas import CommitStyle, Language
+from ..ollama_client import OllamaClient
+from ..utils import chunk_diff_by_files, clean_diff
+from .mock_ollama import DEFAULT_RESPONSE, MockOllamaServer
+from .synthetic_diff import generate_diff
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the report layout changes
+REPORT_SCHEMA = 1
+
+BENCHMARKS = (
+    "generate",
+    "analyze_diff",
+    "clean_diff",
+    "chunk_diff_by_files",
+    "build_prompt",
+    "parse_response",
+)
+
+DEFAULT_SIZES = (10 * 1024, 100 * 1024, 1024 * 1024)
+
+_SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 * 1024, "mb": 1024 * 1024}
+
+
+class BenchmarkResult(NamedTuple):
+    """Timings of one benchmark on one diff size, in seconds"""
+
+    name: str
+    size: int
+    rounds: int
+    mean: float
+    median: float
+    min: float
+    max: float
+    stdev: float
+
+    @property
+    def mb_per_s(self) -> float:
+        """Diff megabytes processed per second, at the median"""
+        return self.size / (1024 * 1024) / self.median if self.median else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._asdict(), mb_per_s=round(self.mb_per_s, 3))
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a diff size such as 4096, 10k or 1MB
+
+    Raises:
+        ValueError: If the size cannot be parsed
+    """
+    value = text.strip().lower()
+    number = value.rstrip("bkm")
+    unit = value[len(number) :]
+    if unit not in _SIZE_UNITS or not number:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def run_suite(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    rounds: int = 5,
+    latency: float = 0.05,
+    token_rate: float = 200.0,
+    seed: int = 0,
+    only: Optional[Iterable[str]] = None,
+    on_result: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the benchmarks on synthetic diffs of each size
+
+    The generate benchmark runs the whole pipeline (analysis, packing,
+    summaries of large diffs, the request and parsing) against a local mock
+    Ollama server, without the message cache. The others time one step on
+    its own; clean_diff redacts the whole diff rather than truncating it first.
+
+    Args:
+        sizes: Diff sizes in bytes
+        rounds: Timed runs per benchmark and size (after one warm-up run)
+        latency: Mock server seconds before the first token
+        token_rate: Mock server tokens per second (0: instant)
+        seed: Seed of the synthetic diffs
+        only: Names of the benchmarks to run (default: all of BENCHMARKS)
+        on_result: Called with each result as soon as it is measured
+
+    Returns:
+        JSON-serializable report with the environment, the settings and
+        one entry per benchmark and size
+
+    Raises:
+        ValueError: If a benchmark name is unknown
+    """
+    names = list(only) if only else list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results: List[BenchmarkResult] = []
+    with (
+        MockOllamaServer(latency=latency, token_rate=token_rate) as server,
+        OllamaClient(host=server.url) as client,
+    ):
+        generator = CommitMessageGenerator(client, language=Language.ENGLISH)
+        style = CommitStyle.CONVENTIONAL
+
+        for size in sizes:
+            diff = generate_diff(size, seed=seed)
+            analysis = DiffAnalyzer()._analyze_diff(diff)
+            steps = {
+                "generate": lambda: generator.generate(diff, style=style),
+                "analyze_diff": lambda: DiffAnalyzer().analyze_diff(diff),
+                "clean_diff": lambda: clean_diff(diff, max_length=len(diff)),
+                "chunk_diff_by_files": lambda: chunk_diff_by_files(diff),
+                "build_prompt": lambda: generator._build_packed_prompt(
+                    generator._plan(diff, analysis, style)
+                ),
+                "parse_response": lambda: generator._parse_response(DEFAULT_RESPONSE, analysis),
+            }
+
+            for name in names:
+                result = _measure(name, len(diff), steps[name], rounds)
+                results.append(result)
+                if on_result:
+                    on_result(result)
+
+    return {
+        "schema": REPORT_SCHEMA,
+        "version": __version__,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "sizes": list(sizes),
+            "rounds": rounds,
+            "latency": latency,
+            "token_rate": token_rate,
+            "seed": seed,
+        },
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare median timings of two reports
+
+    Args:
+        baseline: Earlier report from run_suite
+        current: Newer report from run_suite
+
+    Returns:
+        For each benchmark and size found in both: name, size, both
+        medians and change (current / baseline - 1; positive is slower)
+    """
+    earlier = {(entry["name"], entry["size"]): entry for entry in baseline.get("results", [])}
+    rows = []
+    for entry in current.get("results", []):
+        before = earlier.get((entry["name"], entry["size"]))
+        if not before or not before["median"]:
+            continue
+        rows.append(
+            {
+                "name": entry["name"],
+                "size": entry["size"],
+                "baseline": before["median"],
+                "current": entry["median"],
+                "change": entry["median"] / before["median"] - 1,
+            }
+        )
+    return rows
+
+
+def _measure(name: str, size: int, step: Callable[[], Any], rounds: int) -> BenchmarkResult:
+    """Run step once to warm up, then time it rounds times"""
+    step()
+    timings = []
+    for _ in range(max(1, rounds)):
+        start = time.perf_counter()
+        step()
+        timings.append(time.perf_counter() - start)
+
+    logger.debug(f"{name} on {size} bytes: median {statistics.median(timings) * 1000:.2f} ms")
+    return BenchmarkResult(
+        name=name,
+        size=size,
+        rounds=len(timings),
+        mean=statistics.mean(timings),
+        median=statistics.median(timings),
+        min=min(timings),
+        max=max(timings),
+        stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    )
@@ -0,0 +1,100 @@
+"""
+Synthetic git diff generator for benchmarks
+
+Produces realistic-looking unified diffs of a requested size: a mix of
+source files, docs and lockfile-style files, each with several hunks of
+context, added and removed lines.
+"""
+
+import random
+
+_SOURCE_LINES = [
+    "def handle_request(self, request):",
+    "    response = self.session.post(url, json=payload, timeout=self.timeout)",
+    "    if not response.ok:",
+    '        raise RuntimeError(f"request failed: {response.status_code}")',
+    "    return response.json()",
+    "class CacheEntry:",
+    "    __slots__ = ('key', 'value', 'expires')",
+    "import logging",
+    "logger = logging.getLogger(__name__)",
+    "    for index, item in enumerate(items):",
+    "        total += item.price * item.quantity",
+    "    # TODO: handle pagination",
+    "",
+]
+
+_LOCK_LINES = [
+    '    "node_modules/lodash": {',
+    '      "version": "4.17.21",',
+    '      "resolved": "https://registry.npmjs.org/lodash/-/lodash-4.17.21.tgz",',
+    '      "integrity": "sha512-v2kDEe57lecTulaDIuNTPy3Ry4gLGJ6Z1O3vE1krgXZNrsQ+LFTGHVxVjcXPs17LhbZVGedAJv8XZ1tvj5FvSg==",',
+    "    },",
+]
+
+_FILES = [
+    ("src/api/client.py", _SOURCE_LINES),
+    ("src/core/engine.py", _SOURCE_LINES),
+    ("src/utils/helpers.py", _SOURCE_LINES),
+    ("docs/guide.md", ["## Usage", "Run the command below.", "", "```bash", "make build", "```"]),
+    ("package-lock.json", _LOCK_LINES),
+]
+
+
+def _hunk(rng: random.Random, lines, start: int) -> str:
+    """Build one hunk with 3 lines of context around a block of changes"""
+    context_before = [rng.choice(lines) for _ in range(3)]
+    removed = [rng.choice(lines) for _ in range(rng.randint(0, 6))]
+    added = [rng.choice(lines) for _ in range(rng.randint(1, 10))]
+    context_after = [rng.choice(lines) for _ in range(3)]
+
+    old_count = len(context_before) + len(removed) + len(context_after)
+    new_count = len(context_before) + len(added) + len(context_after)
+
+    body = [f"@@ -{start},{old_count} +{start},{new_count} @@ def section_{start}():"]
+    body.extend(" " + line for line in context_before)
+    body.extend("-" + line for line in removed)
+    body.extend("+" + line for line in added)
+    body.extend(" " + line for line in context_after)
+    return "\n".join(body) + "\n"
+
+
+def generate_diff(size_bytes: int, seed: int = 0, hunks_per_file: int = 8) -> str:
+    """
+    Generate a synthetic diff of roughly the requested size
+
+    Args:
+        size_bytes: Target size in bytes (the result is at least this large)
+        seed: Random seed for reproducible output
+        hunks_per_file: Number of hunks in each file
+
+    Returns:
+        Unified diff text
+    """
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    file_index = 0
+
+    while total < size_bytes:
+        template_path, lines = _FILES[file_index % len(_FILES)]
+        directory, _, name = template_path.rpartition("/")
+        path = f"{directory}/{file_index}_{name}" if directory else f"{file_index}_{name}"
+
+        header = (
+            f"diff --git a/{path} b/{path}\n"
+            f"index {rng.getrandbits(28):07x}..{rng.getrandbits(28):07x} 100644\n"
+            f"--- a/{path}\n"
+            f"+++ b/{path}\n"
+        )
+        parts.append(header)
+        total += len(header)
+
+        for hunk_index in range(hunks_per_file):
+            hunk = _hunk(rng, lines, 1 + hunk_index * 40)
+            parts.append(hunk)
+            total += len(hunk)
+
+        file_index += 1
+
+    return "".join(parts)
@@ -0,0 +1,363 @@
+"""On-disk cache of generated commit messages and per-file summaries"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from .models.schemas import CommitMessage, ConfigModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "commit-by-lee"
+
+
+class MessageCache:
+    """
+    Content-addressed, size-bounded cache of commit messages
+
+    Entries are keyed by a hash of the cleaned diff plus every generation
+    setting that influences the output, stored in SQLite and evicted in
+    least-recently-used order once the entry or size limit is exceeded.
+
+    Per-file summaries of map-reduce generation live in a second table with
+    the same limits, keyed by the file's staged blobs (make_summary_key), so
+    a large diff only has the files that changed since the last run
+    summarized again.
+    """
+
+    DB_NAME = "messages.db"
+
+    def __init__(
+        self, cache_dir: Optional[Path] = None, max_entries: int = 500, max_size_mb: float = 20.0
+    ):
+        """
+        Initialize message cache
+
+        Args:
+            cache_dir: Directory holding the cache database
+            max_entries: Maximum number of cached messages
+            max_size_mb: Maximum total size of cached messages in megabytes
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.path = self.cache_dir / self.DB_NAME
+        self.max_entries = max_entries
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._initialized = False
+
+    @classmethod
+    def from_config(cls, config: ConfigModel) -> "MessageCache":
+        """
+        Create cache from configuration
+
+        Args:
+            config: ConfigModel object
+
+        Returns:
+            MessageCache instance
+        """
+        return cls(
+            cache_dir=Path(config.cache_dir).expanduser() if config.cache_dir else None,
+            max_entries=config.cache_max_entries,
+            max_size_mb=config.cache_max_size_mb,
+        )
+
+    @staticmethod
+    def make_key(
+        cleaned_diff: str,
+        model: str,
+        language: str,
+        style: str,
+        temperature: float,
+        template_version: int,
+        mode: str = "single",
+    ) -> str:
+        """
+        Build cache key for a generation request
+
+        Args:
+            cleaned_diff: Output of clean_diff
+            model: Ollama model name
+            language: Output language code
+            style: Commit style
+            temperature: Sampling temperature
+            template_version: Prompt template version
+            mode: Generation mode (single prompt or map-reduce)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        digest = hashlib.sha256()
+        for part in (model, language, style, repr(float(temperature)), str(template_version), mode):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(cleaned_diff.encode("utf-8", errors="replace"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_summary_key(
+        path: str,
+        old_path: Optional[str],
+        blob_id: str,
+        model: str,
+        language: str,
+        temperature: float,
+        template_version: int,
+        chunk_chars: int,
+    ) -> str:
+        """
+        Build cache key for the summary of one file
+
+        Args:
+            path: File path
+            old_path: Previous path of a renamed or copied file
+            blob_id: Modes and blob hashes from git diff --raw
+            model: Ollama model name
+            language: Output language code
+            temperature: Sampling temperature
+            template_version: Prompt template version
+            chunk_chars: Maximum characters per summarized chunk
+
+        Returns:
+            Hex digest identifying the summary
+        """
+        digest = hashlib.sha256()
+        for part in (
+            path,
+            old_path or "",
+            blob_id,
+            model,
+            language,
+            repr(float(temperature)),
+            str(template_version),
+            str(chunk_chars),
+        ):
+            digest.update(part.encode("utf-8", errors="replace"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the database on first use"""
+        if not self._initialized:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=5)
+
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    key TEXT PRIMARY KEY,
+                    message TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+                """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_messages_last_access ON messages(last_access)"
+            )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS summaries (
+                    key TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_summaries_last_access ON summaries(last_access)"
+            )
+            conn.commit()
+            self._initialized = True
+
+        return conn
+
+    def get(self, key: str) -> Optional[CommitMessage]:
+        """
+        Look up cached commit message
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            CommitMessage or None on a miss
+        """
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute("SELECT message FROM messages WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+
+                conn.execute(
+                    "UPDATE messages SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                    (time.time(), key),
+                )
+
+            return CommitMessage.model_validate_json(row[0])
+
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning(f"Cache lookup failed: {e}")
+            return None
+
+    def put(self, key: str, message: CommitMessage):
+        """
+        Store commit message and evict old entries if over the limits
+
+        Args:
+            key: Cache key from make_key
+            message: Generated commit message
+        """
+        payload = message.model_dump_json()
+        now = time.time()
+
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO messages (key, message, size, created, last_access, hits)
+                    VALUES (?, ?, ?, ?, ?, 0)
+                    """,
+                    (key, payload, len(payload), now, now),
+                )
+                self._evict(conn)
+
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Cache store failed: {e}")
+
+    def get_summaries(self, keys: List[str]) -> Dict[str, str]:
+        """
+        Look up cached file summaries
+
+        Args:
+            keys: Cache keys from make_summary_key
+
+        Returns:
+            Summary text by key, for the keys that were found
+        """
+        if not keys:
+            return {}
+
+        try:
+            with closing(self._connect()) as conn, conn:
+                found = {}
+                # Stay under SQLite's limit on query parameters
+                for index in range(0, len(keys), 500):
+                    batch = keys[index : index + 500]
+                    placeholders = ", ".join("?" * len(batch))
+                    found.update(
+                        conn.execute(
+                            f"SELECT key, summary FROM summaries WHERE key IN ({placeholders})",
+                            batch,
+                        ).fetchall()
+                    )
+                    conn.execute(
+                        f"UPDATE summaries SET last_access = ? WHERE key IN ({placeholders})",
+                        (time.time(), *batch),
+                    )
+            return found
+
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Summary cache lookup failed: {e}")
+            return {}
+
+    def put_summaries(self, summaries: Dict[str, str]):
+        """
+        Store file summaries and evict old ones if over the limits
+
+        Args:
+            summaries: Summary text by key from make_summary_key
+        """
+        if not summaries:
+            return
+
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO summaries (key, summary, size, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (key, text, len(text.encode("utf-8")), now)
+                        for key, text in summaries.items()
+                    ],
+                )
+                self._evict(conn, "summaries")
+
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Summary cache store failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection, table: str = "messages"):
+        """Drop least recently used entries of table until both limits are met"""
+        count, total_size = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}"
+        ).fetchone()
+
+        if count <= self.max_entries and total_size <= self.max_size_bytes:
+            return
+
+        evicted = 0
+        rows = conn.execute(f"SELECT key, size FROM {table} ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if count <= self.max_entries and total_size <= self.max_size_bytes:
+                break
+            conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+            count -= 1
+            total_size -= size
+            evicted += 1
+
+        logger.debug(f"Evicted {evicted} cached {table} entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with entry count, sizes and hit count
+        """
+        stats = {
+            "path": str(self.path),
+            "entries": 0,
+            "size_bytes": 0,
+            "hits": 0,
+            "summaries": 0,
+            "max_entries": self.max_entries,
+            "max_size_bytes": self.max_size_bytes,
+        }
+
+        if not self.path.exists():
+            return stats
+
+        with closing(self._connect()) as conn:
+            entries, size, hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM messages"
+            ).fetchone()
+            summaries = conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+        stats.update(entries=entries, size_bytes=size, hits=hits, summaries=summaries)
+        return stats
+
+    def clear(self) -> int:
+        """
+        Remove all cached messages and summaries
+
+        Returns:
+            Number of removed messages
+        """
+        if not self.path.exists():
+            return 0
+
+        with closing(self._connect()) as conn, conn:
+            removed = conn.execute("DELETE FROM messages").rowcount
+            conn.execute("DELETE FROM summaries")
+
+        with closing(self._connect()) as conn:
+            conn.execute("VACUUM")
+
+        logger.info(f"Cleared {removed} cached message(s)")
+        return removed
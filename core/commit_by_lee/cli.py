@@ -1,22 +1,20 @@
-"""CLI commands for Commit by Lee"""
+"""CLI commands for Commit by Lee
+
+Only click, rich's console and the stdlib daemon client are imported at
+module load. Everything that pulls in requests, pydantic or yaml is
+imported inside the commands that need it, so --help, --version and
+`generate --via-daemon` start fast (see benchmarks/bench_import_time.py).
+"""
 
 import click
+import functools
 import logging
-import time
 from pathlib import Path
 from rich.console import Console
 from rich.panel import Panel
-from rich.prompt import Confirm
-from rich.syntax import Syntax
-from rich.text import Text
-
-from .ollama_client import OllamaClient
-from .diff_analyzer import DiffAnalyzer
-from .llm_generator import CommitMessageGenerator
-from .config import Config
-from .formatters import format_commit_message
-from .models.schemas import Language, CommitStyle
-from .utils import clean_diff
+
+from . import __version__
+from .daemon_client import DaemonUnavailable, default_socket_path, ping, send_request
 
 # Setup logging
 logging.basicConfig(
@@ -41,7 +39,7 @@ BANNER = """
 
 
 @click.group()
-@click.version_option(version='0.1.0', prog_name='commit-by-lee')
+@click.version_option(version=__version__, prog_name='commit-by-lee')
 def cli():
     """Commit by Lee - AI-powered Git Commit Message Generator
     
@@ -55,71 +53,525 @@ def cli():
               help='Output language (en=id, id=Indonesian)')
 @click.option('--style', '-s', type=click.Choice(['conventional', 'simple', 'emoji']), default='conventional',
               help='Commit message style')
-@click.option('--max-files', type=int, default=5,
-              help='Maximum number of files to include in analysis')
+@click.option('--max-files', type=int, default=None,
+              help='Maximum number of files to include in analysis (default: all)')
 @click.option('--yes', '-y', is_flag=True, help='Automatically apply commit message without confirmation')
-def generate(language, style, max_files, yes):
+@click.option('--stream', is_flag=True, help='Show the commit message as it is being generated')
+@click.option('--no-cache', is_flag=True, help='Do not reuse or store cached commit messages')
+@click.option('--via-daemon', is_flag=True,
+              help='Ask a running `commit-by-lee serve` daemon (falls back to in-process)')
+@click.option('--deadline', type=float, default=None,
+              help='Seconds to wait for the model before using a heuristic message')
+@click.option('--spill', is_flag=True, default=None,
+              help='Memory-map the whole staged diff instead of reading only what fits the prompt')
+@click.option('--candidates', type=click.IntRange(1, 10), default=1,
+              help='Generate this many alternative messages at once and pick one')
+@click.option('--profile', is_flag=True, help='Show how long each stage took')
+@click.option('--profile-output', type=click.File('w', encoding='utf-8'),
+              help='Write the timed stages to a file')
+@click.option('--profile-format', type=click.Choice(['json', 'otlp']), default='json',
+              help='Format of --profile-output (otlp: OpenTelemetry OTLP/JSON)')
+def generate(language, style, max_files, yes, stream, no_cache, via_daemon, deadline,
+             spill, candidates, profile, profile_output, profile_format):
     """Generate commit message from current git changes"""
+    if candidates > 1:
+        # Candidates are ranked once all are complete, so neither applies
+        for option, given in (("--stream", stream), ("--deadline", deadline is not None)):
+            if given:
+                raise click.UsageError(f"{option} cannot be used with --candidates")
+
     try:
         # Display banner
         console.print(Panel.fit(BANNER, style="bold blue"))
         console.print()
         
-        # Load config
-        config = Config()
-        
-        # Initialize clients
-        ollama = OllamaClient(config.config.ollama_host)
-        analyzer = DiffAnalyzer()
-        generator = CommitMessageGenerator(ollama, config)
+        profiler = None
+        if profile or profile_output:
+            from .profiling import Profiler
+            profiler = Profiler()
         
-        # Update config based on command line options
-        if language == 'id':
-            config.update(language='id')
-        commit_style = CommitStyle(style)
+        choose = functools.partial(_choose_candidate, yes=yes)
+        result = None
+        if via_daemon:
+            result = _generate_via_daemon(language, style, max_files, stream, no_cache, deadline,
+                                          profiler, candidates, choose, spill)
+        if result is None:
+            if profiler:
+                with profiler:
+                    result = _generate_in_process(language, style, max_files, stream, no_cache,
+                                                  deadline, candidates, choose, spill)
+            else:
+                result = _generate_in_process(language, style, max_files, stream, no_cache,
+                                              deadline, candidates, choose, spill)
+        if profiler:
+            _report_profile(profiler.to_dict(), profile, profile_output, profile_format)
+        if result is False:
+            return
+        message, regenerate = result
         
-        # Display progress
-        with console.status("[bold yellow]Analyzing changes...") as status:
-            # Get git diff
-            diff_text = analyzer.get_staged_diff()
-            
-            if not diff_text:
-                console.print("[yellow]No changes detected to commit.[/yellow]")
-                return
+        # Display result, regenerating on request
+        from rich.prompt import Prompt
+        while True:
+            console.print(Panel(
+                message,
+                title="[bold green]Generated Commit Message[/bold green]",
+                border_style="green"
+            ))
+            if yes:
+                apply = True
+                break
             
-            # Analyze diff
-            analysis = analyzer.analyze_diff(diff_text)
+            if regenerate is None:
+                answer = Prompt.ask("[bold yellow]Apply this commit message?[/bold yellow]",
+                                    choices=['y', 'n'], default='n')
+            else:
+                answer = Prompt.ask(
+                    "[bold yellow]Apply this commit message?[/bold yellow] (r = regenerate)",
+                    choices=['y', 'n', 'r'], default='n'
+                )
+            if answer != 'r':
+                apply = answer == 'y'
+                break
             
-            # Display analysis
-            console.print(f"[green][OK][/green] Found {analysis.stats.files_changed} file(s) changed")
-            console.print(f"   [dim]+{analysis.stats.insertions} -{analysis.stats.deletions}[/dim]")
-            console.print()
+            instruction = Prompt.ask(
+                "[bold yellow]What should change?[/bold yellow] (empty to just try again)",
+                default='', show_default=False
+            )
+            message = regenerate(instruction.strip() or None)
+        
+        # Ask to apply
+        if apply:
+            # Apply commit
+            import subprocess
+            subprocess.run(['git', 'commit', '-m', message], check=True)
+            console.print("[green][OK] Commit created successfully![/green]")
+        
+    except Exception as e:
+        console.print(f"[red][ERROR] {str(e)}[/red]")
+        raise click.ClickException(str(e))
+
+
+def _generate_in_process(language, style, max_files, stream, no_cache, deadline=None,
+                         candidates=1, choose=None, spill=None):
+    """
+    Analyze staged changes and generate a commit message in this process
+
+    With candidates above 1, that many messages are generated at once and
+    choose (given their texts, best first) returns the index of the one to use.
+
+    Returns:
+        (formatted commit message, function regenerating it from an optional
+        instruction), or False if there is nothing to commit
+    """
+    from rich.live import Live
+    from .cache import MessageCache
+    from .config import Config
+    from .diff_analyzer import DiffAnalyzer
+    from .llm_generator import CommitMessageGenerator
+    from .models.schemas import Language, CommitStyle
+    from .ollama_client import OllamaClient
+    from .path_filter import PathFilter
+    
+    # Load config
+    config = Config()
+    
+    # Update config based on command line options
+    config.update(language=Language(language))
+    commit_style = CommitStyle(style)
+    
+    # Initialize clients (the pooled Ollama client is shared by all generator calls)
+    ollama = OllamaClient.from_config(config.config)
+    analyzer = DiffAnalyzer(
+        path_filter=PathFilter.from_config(config.config),
+        workers=config.config.diff_workers
+    )
+    message_cache = None
+    if config.config.cache_enabled and not no_cache:
+        message_cache = MessageCache.from_config(config.config)
+    generator = CommitMessageGenerator.from_config(
+        config.config,
+        ollama_client=ollama,
+        cache=message_cache
+    )
+    
+    # Display progress
+    with console.status("[bold yellow]Analyzing changes...") as status:
+        # Stream and analyze git diff, reading only as much patch text as the prompt can use
+        analysis = analyzer.analyze_staged(
+            max_chars=max(config.config.diff_read_limit, generator.read_limit),
+            max_files=max_files,
+            spill=config.config.diff_spill if spill is None else spill
+        )
+        diff_text = analysis.raw_diff
+        
+        if not diff_text:
+            console.print("[yellow]No changes detected to commit.[/yellow]")
+            return False
+        
+        # Display analysis
+        _print_stats(analysis.stats.files_changed, analysis.stats.insertions,
+                     analysis.stats.deletions, len(analysis.excluded))
+        
+        # Generate commit message
+        if candidates > 1:
+            status.update(f"[bold yellow]Generating {candidates} candidate messages...")
             
-            # Generate commit message
+            options = generator.generate_candidates(
+                diff=diff_text,
+                analysis=analysis,
+                style=commit_style,
+                count=candidates
+            )
+        elif not stream:
             status.update("[bold yellow]Generating commit message...]")
             
-            result = generator.generate(
+            message = generator.generate(
+                diff=diff_text,
+                analysis=analysis,
+                style=commit_style,
+                deadline=deadline
+            )
+    
+    if candidates > 1:
+        message = options[choose([option.format_conventional() for option in options])]
+    elif stream:
+        # Render tokens into the panel as they arrive
+        with Live(_streaming_panel(""), console=console, refresh_per_second=15,
+                  transient=True) as live:
+            message = generator.generate(
+                diff=diff_text,
+                analysis=analysis,
+                style=commit_style,
+                on_token=lambda text: live.update(_streaming_panel(text)),
+                deadline=deadline
+            )
+    
+    if message.heuristic:
+        _print_heuristic_notice()
+    _print_generation(message.stats.describe() if message.stats else None)
+    
+    def regenerate(instruction):
+        nonlocal message
+        with console.status("[bold yellow]Regenerating commit message..."):
+            # Continues the previous request, so the diff is not evaluated again
+            message = generator.refine(
+                message,
                 diff=diff_text,
                 analysis=analysis,
-                style=commit_style
+                style=commit_style,
+                instruction=instruction
             )
+        _print_generation(message.stats.describe() if message.stats else None)
+        return message.format_conventional()
+    
+    return message.format_conventional(), regenerate
+
+
+def _generate_via_daemon(language, style, max_files, stream, no_cache, deadline=None, profiler=None,
+                         candidates=1, choose=None, spill=None):
+    """
+    Ask a running daemon to generate the commit message (or candidates
+    to choose from, as for _generate_in_process)
+
+    Returns:
+        (formatted commit message, None), False if there is nothing to
+        commit, or None if no daemon is running (the caller falls back to in-process
+        generation)
+    """
+    from rich.live import Live
+    
+    request = {
+        "action": "generate",
+        "repo": str(Path.cwd()),
+        "language": language,
+        "style": style,
+        "max_files": max_files,
+        "no_cache": no_cache,
+        "stream": stream,
+    }
+    if deadline is not None:
+        request["deadline"] = deadline
+    if profiler:
+        request["profile"] = True
+    if candidates > 1:
+        request["candidates"] = candidates
+        stream = False
+    if spill is not None:
+        request["spill"] = spill
+    
+    try:
+        if stream:
+            with Live(_streaming_panel(""), console=console, refresh_per_second=15,
+                      transient=True) as live:
+                reply = send_request(
+                    request, on_token=lambda text: live.update(_streaming_panel(text))
+                )
+        else:
+            with console.status("[bold yellow]Generating commit message (daemon)..."):
+                reply = send_request(request)
+    except DaemonUnavailable as e:
+        logger.info(f"{e}, generating in-process")
+        return None
+    
+    if profiler and reply.get("profile"):
+        profiler.merge(reply["profile"])
+    if reply.get("message") is None:
+        console.print("[yellow]No changes detected to commit.[/yellow]")
+        return False
+    
+    stats = reply["stats"]
+    _print_stats(stats["files_changed"], stats["insertions"], stats["deletions"],
+                 stats.get("excluded", 0))
+    if reply.get("candidates"):
+        options = reply["candidates"]
+        reply = options[choose([option["text"] for option in options])]
+    if reply.get("heuristic"):
+        _print_heuristic_notice()
+    _print_generation((reply.get("generation") or {}).get("summary"))
+    # Regenerating needs the request context, which stays in the daemon
+    return reply["text"], None
+
+
+def _choose_candidate(texts, yes):
+    """List alternative messages (best first) and return the index of the one to use"""
+    if len(texts) == 1:
+        return 0
+    
+    for number, text in enumerate(texts, 1):
+        console.print(
+            Panel(text, title=f"[bold cyan]Candidate {number}[/bold cyan]", border_style="cyan")
+        )
+    if yes:
+        return 0
+    
+    from rich.prompt import Prompt
+    answer = Prompt.ask("[bold yellow]Use which message?[/bold yellow]",
+                        choices=[str(number) for number in range(1, len(texts) + 1)], default='1')
+    return int(answer) - 1
+
+
+def _print_stats(files_changed: int, insertions: int, deletions: int, excluded: int = 0):
+    """Print the staged change summary"""
+    console.print(f"[green][OK][/green] Found {files_changed} file(s) changed")
+    console.print(f"   [dim]+{insertions} -{deletions}[/dim]")
+    if excluded:
+        console.print(
+            f"   [dim]Patch of {excluded} lock, generated or vendored file(s) left out[/dim]"
+        )
+    console.print()
+
+
+def _print_heuristic_notice():
+    """Explain that the message was not written by the model"""
+    console.print("[yellow][!] The model did not answer in time or failed; "
+                  "this message is based on the diff analysis only[/yellow]")
+    console.print()
+
+
+def _print_generation(summary):
+    """Print Ollama's token counts and timings (nothing for cached messages)"""
+    if summary:
+        console.print(f"   [dim]{summary}[/dim]")
+        console.print()
+
+
+def _report_profile(profile, show, output, output_format):
+    """Print the timed stages as a table and/or write them to output"""
+    import json
+    from .profiling import summarize, to_otlp
+    
+    spans = profile["spans"]
+    if show and spans:
+        from rich.table import Table
         
-        # Display result
-        console.print(Panel(
-            result.format_conventional(),
-            title="[bold green]Generated Commit Message[/bold green]",
-            border_style="green"
-        ))
+        wall = (max(span["end"] for span in spans) - min(span["start"] for span in spans)) / 1e9
+        table = Table(title=f"Profile ({wall * 1000:.0f} ms)")
+        table.add_column("Stage")
+        table.add_column("Calls", justify="right")
+        table.add_column("Time", justify="right")
+        table.add_column("Share", justify="right")
+        for row in summarize(spans):
+            share = row.total / wall if wall else 0.0
+            table.add_row(
+                "  " * row.depth + row.name,
+                str(row.calls),
+                f"{row.total * 1000:.1f} ms",
+                f"{share:.0%}"
+            )
+        console.print(table)
+        console.print("[dim]Parallel calls overlap, so their time can exceed the total[/dim]")
+        console.print()
+    
+    if output:
+        data = to_otlp(profile) if output_format == 'otlp' else profile
+        output.write(json.dumps(data, indent=2) + "\n")
+        output.flush()
+
+
+def _streaming_panel(text: str) -> Panel:
+    """Panel showing a commit message that is still being generated"""
+    return Panel(
+        text or "[dim]Waiting for first token...[/dim]",
+        title="[bold yellow]Generating Commit Message[/bold yellow]",
+        border_style="yellow"
+    )
+
+
+@cli.command()
+@click.argument('rev_range')
+@click.option('--language', '-l', type=click.Choice(['en', 'id']), default='en',
+              help='Output language (en=English, id=Indonesian)')
+@click.option('--style', '-s', type=click.Choice(['conventional', 'simple', 'emoji']),
+              default='conventional', help='Commit message style')
+@click.option('--jobs', '-j', type=int, default=None,
+              help='Concurrent generations (default: Ollama pool size)')
+@click.option('--format', 'output_format', type=click.Choice(['jsonl', 'msg-filter']),
+              default='jsonl',
+              help='JSON lines, or a shell script for git filter-branch --msg-filter')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-',
+              help='Output file (default: stdout)')
+@click.option('--no-cache', is_flag=True, help='Do not reuse or store cached commit messages')
+def batch(rev_range, language, style, jobs, output_format, output, no_cache):
+    """Generate commit messages for every commit in REV_RANGE (e.g. main..feature)"""
+    import time
+    from .batch import MsgFilterScriptWriter, format_jsonl, generate_for_commits
+    from .cache import MessageCache
+    from .config import Config
+    from .diff_analyzer import DiffAnalyzer
+    from .llm_generator import CommitMessageGenerator
+    from .models.schemas import Language, CommitStyle
+    from .ollama_client import OllamaClient
+    
+    # Progress goes to stderr so stdout carries only the results
+    err_console = Console(stderr=True)
+    
+    try:
+        config = Config()
+        jobs = jobs or config.config.ollama_pool_size
+        # Parallelism comes from the commits; summarizing large ones one part at a
+        # time keeps the total number of requests in flight at `jobs`
+        config.update(
+            language=Language(language),
+            ollama_pool_size=max(config.config.ollama_pool_size, jobs),
+            summary_concurrency=1
+        )
         
-        # Ask to apply
-        if yes or Confirm.ask("[bold yellow]Apply this commit message?[/bold yellow]", default=False):
-            # Apply commit
-            import subprocess
-            subprocess.run(['git', 'commit', '-m', result.format_conventional()], check=True)
-            console.print("[green][OK] Commit created successfully![/green]")
+        message_cache = None
+        if config.config.cache_enabled and not no_cache:
+            message_cache = MessageCache.from_config(config.config)
+        generator = CommitMessageGenerator.from_config(
+            config.config,
+            ollama_client=OllamaClient.from_config(config.config),
+            cache=message_cache
+        )
+        
+        analyzer = DiffAnalyzer()
+        commits = analyzer.iter_commits(
+            rev_range,
+            max_chars=max(config.config.diff_read_limit, generator.read_limit)
+        )
+        results = generate_for_commits(generator, commits, jobs=jobs, style=CommitStyle(style))
+        
+        start = time.perf_counter()
+        count = 0
+        with err_console.status(f"[bold yellow]Generating messages for {rev_range}...") as status:
+            if output_format == 'msg-filter':
+                with MsgFilterScriptWriter(output, rev_range) as writer:
+                    for result in results:
+                        writer.write(result)
+                        count += 1
+                        status.update(f"[bold yellow]Generated {count} message(s)...")
+            else:
+                for result in results:
+                    output.write(format_jsonl(result) + "\n")
+                    output.flush()
+                    count += 1
+                    status.update(f"[bold yellow]Generated {count} message(s)...")
+        
+        elapsed = time.perf_counter() - start
+        err_console.print(
+            f"[green][OK][/green] {count} commit(s) in {elapsed:.1f}s ({jobs} concurrent)"
+        )
         
     except Exception as e:
-        console.print(f"[red][ERROR] {str(e)}[/red]")
+        err_console.print(f"[red][ERROR] {str(e)}[/red]")
+        raise click.ClickException(str(e))
+
+
+@cli.command()
+@click.option('--size', 'sizes', multiple=True,
+              help='Synthetic diff size, e.g. 10k or 1MB (repeatable; default: 10k, 100k, 1MB)')
+@click.option('--rounds', type=int, default=5, help='Timed runs per benchmark and size')
+@click.option('--only', multiple=True, type=click.Choice(['generate', 'analyze_diff', 'clean_diff',
+                                                          'chunk_diff_by_files', 'build_prompt',
+                                                          'parse_response']),
+              help='Run only this benchmark (repeatable)')
+@click.option('--latency', type=float, default=0.05,
+              help='Mock server seconds before the first token')
+@click.option('--token-rate', type=float, default=200.0,
+              help='Mock server tokens per second (0: instant)')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-',
+              help='File for the JSON report (default: stdout)')
+@click.option('--compare', 'baseline', type=click.File('r', encoding='utf-8'),
+              help='Earlier JSON report to compare median timings against')
+def bench(sizes, rounds, only, latency, token_rate, output, baseline):
+    """Benchmark the pipeline against a local mock Ollama server"""
+    import json
+    from rich.table import Table
+    from .bench import compare_reports, parse_size, run_suite
+
+    # Progress and tables go to stderr so stdout carries only the report
+    err_console = Console(stderr=True)
+    # Per-request logs would drown the progress
+    logging.getLogger('commit_by_lee').setLevel(logging.WARNING)
+
+    try:
+        kwargs = {}
+        if sizes:
+            kwargs['sizes'] = [parse_size(size) for size in sizes]
+        previous = json.load(baseline) if baseline else None
+
+        with err_console.status("[bold yellow]Running benchmarks...") as status:
+            report = run_suite(
+                rounds=rounds,
+                latency=latency,
+                token_rate=token_rate,
+                only=only,
+                on_result=lambda result: status.update(
+                    f"[bold yellow]{result.name} ({result.size // 1024} KB): "
+                    f"{result.median * 1000:.2f} ms"
+                ),
+                **kwargs
+            )
+
+        output.write(json.dumps(report, indent=2) + "\n")
+        output.flush()
+
+        rows = compare_reports(previous, report) if previous else []
+        if previous and not rows:
+            err_console.print("[yellow]No benchmark and size in common with the baseline[/yellow]")
+        if rows:
+            table = Table(title="Median timings")
+            table.add_column("Benchmark")
+            table.add_column("Size", justify="right")
+            table.add_column("Baseline", justify="right")
+            table.add_column("Current", justify="right")
+            table.add_column("Change", justify="right")
+            for row in rows:
+                color = "red" if row["change"] > 0.1 else "green" if row["change"] < -0.1 else "dim"
+                table.add_row(
+                    row["name"],
+                    f"{row['size'] // 1024} KB",
+                    f"{row['baseline'] * 1000:.2f} ms",
+                    f"{row['current'] * 1000:.2f} ms",
+                    f"[{color}]{row['change']:+.1%}[/{color}]"
+                )
+            err_console.print(table)
+
+        err_console.print(f"[green][OK][/green] {len(report['results'])} result(s)")
+
+    except Exception as e:
+        err_console.print(f"[red][ERROR] {str(e)}[/red]")
         raise click.ClickException(str(e))
 
 
@@ -133,8 +585,15 @@ def test_connection():
         
         console.print("[bold yellow]Testing Ollama connection...[/bold yellow]")
         
+        from .config import Config
+        from .ollama_client import OllamaClient
+        
         config = Config()
-        ollama = OllamaClient(config.config.ollama_host)
+        ollama = OllamaClient.from_config(config.config)
+        
+        if len(ollama.hosts) > 1:
+            _print_host_status(ollama)
+            return
         
         # Test connection
         if ollama.check_connection():
@@ -146,7 +605,7 @@ def test_connection():
             for model in models:
                 console.print(f"   - [dim]{model}[/dim]")
         else:
-            console.print(f"[red][ERROR] Cannot connect to {config.base_url}[/red]")
+            console.print(f"[red][ERROR] Cannot connect to {config.config.ollama_host}[/red]")
             raise click.ClickException("Connection failed")
             
     except Exception as e:
@@ -154,6 +613,27 @@ def test_connection():
         raise click.ClickException(str(e))
 
 
+def _print_host_status(ollama):
+    """Health-check every configured host and print their status"""
+    hosts = ollama.check_hosts()
+    
+    for host in hosts:
+        if not host["healthy"]:
+            console.print(f"[red][X] {host['host']}: unreachable[/red]")
+        elif not host["has_model"]:
+            console.print(f"[yellow][!] {host['host']}: {ollama.model} not available[/yellow]")
+        else:
+            loaded = "loaded" if host["model_loaded"] else "not loaded yet"
+            console.print(
+                f"[green][OK] {host['host']}[/green] [dim]({ollama.model} {loaded})[/dim]"
+            )
+    
+    usable = sum(1 for host in hosts if host["healthy"] and host["has_model"])
+    if not usable:
+        raise click.ClickException("No usable Ollama host")
+    console.print(f"[green][OK] {usable}/{len(hosts)} hosts usable[/green]")
+
+
 @cli.command()
 @click.option('--base-url', help='Ollama base URL')
 @click.option('--model', help='Ollama model name')
@@ -164,6 +644,8 @@ def config(base_url, model):
         console.print(Panel.fit(BANNER, style="bold blue"))
         console.print()
         
+        from .config import Config
+        
         cfg = Config()
         
         if base_url:
@@ -176,7 +658,10 @@ def config(base_url, model):
         
         # Display current config
         console.print("[bold]Current Configuration:[/bold]")
-        console.print(f"  Base URL: [dim]{cfg.config.ollama_host}[/dim]")
+        if cfg.config.ollama_hosts:
+            console.print(f"  Hosts: [dim]{', '.join(cfg.config.ollama_hosts)}[/dim]")
+        else:
+            console.print(f"  Base URL: [dim]{cfg.config.ollama_host}[/dim]")
         console.print(f"  Model: [dim]{cfg.config.ollama_model}[/dim]")
         
     except Exception as e:
@@ -184,5 +669,97 @@ def config(base_url, model):
         raise click.ClickException(str(e))
 
 
+@cli.group()
+def cache():
+    """Manage the cache of generated commit messages"""
+    pass
+
+
+@cache.command()
+def stats():
+    """Show cache statistics"""
+    try:
+        from .cache import MessageCache
+        from .config import Config
+        
+        message_cache = MessageCache.from_config(Config().config)
+        cache_stats = message_cache.stats()
+        
+        console.print("[bold]Commit Message Cache:[/bold]")
+        console.print(f"  Path: [dim]{cache_stats['path']}[/dim]")
+        console.print(
+            f"  Entries: [dim]{cache_stats['entries']} / {cache_stats['max_entries']}[/dim]"
+        )
+        console.print(
+            f"  Size: [dim]{cache_stats['size_bytes'] / 1024:.1f} KB"
+            f" / {cache_stats['max_size_bytes'] / (1024 * 1024):.1f} MB[/dim]"
+        )
+        console.print(f"  Hits: [dim]{cache_stats['hits']}[/dim]")
+        console.print(f"  File summaries: [dim]{cache_stats['summaries']}[/dim]")
+        
+    except Exception as e:
+        console.print(f"[red][ERROR] {str(e)}[/red]")
+        raise click.ClickException(str(e))
+
+
+@cache.command()
+def clear():
+    """Remove all cached commit messages and file summaries"""
+    try:
+        from .cache import MessageCache
+        from .config import Config
+        
+        message_cache = MessageCache.from_config(Config().config)
+        removed = message_cache.clear()
+        console.print(f"[green][OK] Removed {removed} cached message(s)[/green]")
+        
+    except Exception as e:
+        console.print(f"[red][ERROR] {str(e)}[/red]")
+        raise click.ClickException(str(e))
+
+
+@cli.command()
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False, path_type=Path),
+              help='Unix socket to listen on (default: $COMMIT_BY_LEE_SOCKET or a per-user socket)')
+@click.option('--idle-timeout', type=float, default=0,
+              help='Exit after this many seconds without requests (default: never)')
+@click.option('--status', is_flag=True, help='Show whether a daemon is running and exit')
+@click.option('--stop', is_flag=True, help='Stop the running daemon and exit')
+def serve(socket_path, idle_timeout, status, stop):
+    """Run a background daemon for fast `generate --via-daemon` calls"""
+    try:
+        socket_path = socket_path or default_socket_path()
+        
+        if status:
+            info = ping(socket_path)
+            if info:
+                console.print(f"[green][OK] Daemon running on {socket_path}[/green]")
+                console.print(f"  PID: [dim]{info['pid']}[/dim]")
+                console.print(f"  Uptime: [dim]{info['uptime']:.0f}s[/dim]")
+                console.print(f"  Requests: [dim]{info['requests']}[/dim]")
+            else:
+                console.print(f"[yellow]No daemon running on {socket_path}[/yellow]")
+            return
+        
+        if stop:
+            try:
+                send_request({"action": "shutdown"}, socket_path, timeout=5)
+                console.print("[green][OK] Daemon stopped[/green]")
+            except DaemonUnavailable:
+                console.print(f"[yellow]No daemon running on {socket_path}[/yellow]")
+            return
+        
+        from .daemon import CommitDaemon
+        
+        console.print(f"[bold]Serving on {socket_path}[/bold] [dim](Ctrl+C to stop)[/dim]")
+        CommitDaemon(socket_path, idle_timeout=idle_timeout).serve_forever()
+        
+    except KeyboardInterrupt:
+        console.print("[dim]Stopped[/dim]")
+    except Exception as e:
+        console.print(f"[red][ERROR] {str(e)}[/red]")
+        raise click.ClickException(str(e))
+
+
 if __name__ == '__main__':
     cli()
@@ -3,7 +3,7 @@
 import os
 import yaml
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import logging
 
 from .models.schemas import ConfigModel, Language, CommitStyle
@@ -57,9 +57,30 @@ class Config:
             'ollama_timeout': self._parse_int(os.getenv('OLLAMA_TIMEOUT')),
             'ollama_temperature': self._parse_float(os.getenv('OLLAMA_TEMPERATURE')),
             'ollama_max_tokens': self._parse_int(os.getenv('OLLAMA_MAX_TOKENS')),
+            'ollama_num_ctx': self._parse_int(os.getenv('OLLAMA_NUM_CTX')),
+            'ollama_pool_size': self._parse_int(os.getenv('OLLAMA_POOL_SIZE')),
+            'ollama_pool_idle_timeout': self._parse_float(os.getenv('OLLAMA_POOL_IDLE_TIMEOUT')),
+            'ollama_keep_alive': os.getenv('OLLAMA_KEEP_ALIVE'),
+            'ollama_hosts': self._parse_list(os.getenv('OLLAMA_HOSTS')),
+            'ollama_failure_threshold': self._parse_int(os.getenv('OLLAMA_FAILURE_THRESHOLD')),
+            'ollama_circuit_reset': self._parse_float(os.getenv('OLLAMA_CIRCUIT_RESET')),
+            'ollama_retries': self._parse_int(os.getenv('OLLAMA_RETRIES')),
+            'ollama_hedge': self._parse_bool(os.getenv('OLLAMA_HEDGE')),
+            'ollama_hedge_delay': self._parse_float(os.getenv('OLLAMA_HEDGE_DELAY')),
             'language': os.getenv('COMMIT_BY_LEE_LANGUAGE'),
             'style': os.getenv('COMMIT_BY_LEE_STYLE'),
             'auto_commit': self._parse_bool(os.getenv('COMMIT_BY_LEE_AUTO_COMMIT')),
+            'deadline': self._parse_float(os.getenv('COMMIT_BY_LEE_DEADLINE')),
+            'diff_spill': self._parse_bool(os.getenv('COMMIT_BY_LEE_DIFF_SPILL')),
+            'diff_workers': self._parse_int(os.getenv('COMMIT_BY_LEE_DIFF_WORKERS')),
+            'diff_exclude_generated': self._parse_bool(
+                os.getenv('COMMIT_BY_LEE_DIFF_EXCLUDE_GENERATED')
+            ),
+            'diff_exclude': self._parse_list(os.getenv('COMMIT_BY_LEE_DIFF_EXCLUDE')),
+            'cache_enabled': self._parse_bool(os.getenv('COMMIT_BY_LEE_CACHE')),
+            'cache_dir': os.getenv('COMMIT_BY_LEE_CACHE_DIR'),
+            'summarize_large_diffs': self._parse_bool(os.getenv('COMMIT_BY_LEE_SUMMARIZE')),
+            'summary_concurrency': self._parse_int(os.getenv('COMMIT_BY_LEE_SUMMARY_CONCURRENCY')),
         }
 
         # Apply non-None environment overrides
@@ -113,6 +134,13 @@ class Config:
             return None
         return value.lower() in ('true', '1', 'yes', 'on')
 
+    @staticmethod
+    def _parse_list(value: Optional[str]) -> Optional[List[str]]:
+        """Parse comma-separated list from string"""
+        if value is None:
+            return None
+        return [item.strip() for item in value.split(',') if item.strip()]
+
     @classmethod
     def load_project_config(cls, project_path: Path) -> Optional['Config']:
         """
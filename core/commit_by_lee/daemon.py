@@ -0,0 +1,309 @@
+"""Long-running daemon serving commit message generation over a Unix socket"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from . import __version__
+from .cache import MessageCache
+from .config import Config
+from .daemon_client import (
+    MAX_CANDIDATES,
+    MAX_REQUEST_BYTES,
+    PROTOCOL_VERSION,
+    default_socket_path,
+    ping,
+)
+from .diff_analyzer import DiffAnalyzer, FileAnalysisCache
+from .llm_generator import CommitMessageGenerator
+from .models.schemas import CommitMessage, CommitStyle, Language
+from .ollama_client import OllamaClient
+from .path_filter import PathFilter
+from .profiling import Profiler
+
+logger = logging.getLogger(__name__)
+
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one connection: read a request line, write reply lines"""
+
+    def handle(self):
+        daemon: "CommitDaemon" = self.server.daemon
+
+        def write(reply: Dict[str, Any]):
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+        line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+        if not line:
+            return
+
+        try:
+            if len(line) > MAX_REQUEST_BYTES:
+                raise ValueError("Request too large")
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            reply = daemon.handle(request, write)
+        except Exception as e:
+            logger.error(f"Request failed: {e}")
+            reply = {"ok": False, "error": str(e)}
+
+        # A provisional reply is followed by the model's late message
+        upgrade: Optional[Future] = reply.pop("_upgrade", None)
+        try:
+            write(reply)
+            if upgrade is not None:
+                write({"upgrade": upgrade.result()})
+        except OSError:
+            # Client went away (e.g. Ctrl+C); nothing left to do
+            pass
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def service_actions(self):
+        self.daemon.check_idle()
+
+
+class CommitDaemon:
+    """
+    Commit message daemon
+
+    Keeps configuration, the pooled Ollama client and the message cache warm
+    across requests, so IDE integrations and git hooks skip interpreter
+    start-up, imports and connection setup on every call. Each request
+    analyzes the staged changes of the repository it names; files whose
+    staged blobs are unchanged since an earlier request are not re-read.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[Path] = None,
+        config: Optional[Config] = None,
+        idle_timeout: float = 0.0,
+    ):
+        """
+        Initialize daemon
+
+        Args:
+            socket_path: Unix socket to listen on (default: default_socket_path())
+            config: Configuration (default: loaded once at start-up)
+            idle_timeout: Seconds without requests before the daemon exits
+                (0 runs until shut down)
+        """
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        self.config = config or Config()
+        self.idle_timeout = idle_timeout
+
+        self.client = OllamaClient.from_config(self.config.config)
+        self.cache = None
+        if self.config.config.cache_enabled:
+            self.cache = MessageCache.from_config(self.config.config)
+        self.file_cache = FileAnalysisCache()
+
+        self.started = time.time()
+        self.requests = 0
+        self._last_request = self.started
+        self._server: Optional[_DaemonServer] = None
+
+    def serve_forever(self):
+        """
+        Listen on the socket until shut down or idle for idle_timeout
+
+        Raises:
+            RuntimeError: If Unix sockets are unsupported or another daemon
+                is already listening on the socket
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Unix domain sockets are not supported on this platform")
+
+        if self.socket_path.exists():
+            if ping(self.socket_path) is not None:
+                raise RuntimeError(f"A daemon is already running on {self.socket_path}")
+            # Left behind by a daemon that did not shut down cleanly
+            self.socket_path.unlink()
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Create the socket owner-only; it hands out repository contents
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _DaemonServer(str(self.socket_path), _DaemonRequestHandler)
+        finally:
+            os.umask(old_umask)
+        self._server.daemon = self
+
+        logger.info(f"Listening on {self.socket_path}")
+        try:
+            self._server.serve_forever(poll_interval=0.5)
+        finally:
+            self._server.server_close()
+            self.client.close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+            logger.info("Daemon stopped")
+
+    def shutdown(self):
+        """Stop serving; safe to call from a request handler"""
+        if self._server:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def check_idle(self):
+        """Shut down once idle_timeout has passed without requests"""
+        if self.idle_timeout and time.time() - self._last_request > self.idle_timeout:
+            logger.info(f"Idle for {self.idle_timeout:.0f}s, shutting down")
+            self.shutdown()
+
+    def handle(
+        self, request: Dict[str, Any], write: Callable[[Dict[str, Any]], None]
+    ) -> Dict[str, Any]:
+        """
+        Handle one protocol request
+
+        Args:
+            request: Decoded request object
+            write: Sends an intermediate reply line (used for streamed tokens)
+
+        Returns:
+            Final reply object
+        """
+        self.requests += 1
+        self._last_request = time.time()
+
+        version = request.get("version", PROTOCOL_VERSION)
+        if version != PROTOCOL_VERSION:
+            return {"ok": False, "error": f"Unsupported protocol version {version}"}
+
+        action = request.get("action")
+        if action == "ping":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "version": __version__,
+                "uptime": time.time() - self.started,
+                "requests": self.requests,
+            }
+        if action == "generate":
+            if request.get("profile"):
+                with Profiler() as profiler:
+                    reply = self._generate(request, write)
+                return dict(reply, profile=profiler.to_dict())
+            return self._generate(request, write)
+        if action == "shutdown":
+            self.shutdown()
+            return {"ok": True}
+
+        return {"ok": False, "error": f"Unknown action: {action}"}
+
+    def _generate(
+        self, request: Dict[str, Any], write: Callable[[Dict[str, Any]], None]
+    ) -> Dict[str, Any]:
+        """Analyze the staged changes of the requested repository and generate a message"""
+        repo = request.get("repo")
+        if not repo or not Path(repo).is_dir():
+            return {"ok": False, "error": f"Not a directory: {repo}"}
+
+        count = request.get("candidates") or 1
+        if type(count) is not int or not 1 <= count <= MAX_CANDIDATES:
+            return {"ok": False, "error": f"candidates must be between 1 and {MAX_CANDIDATES}"}
+
+        config = self.config.config.model_copy(
+            update={"language": Language(request.get("language") or self.config.config.language)}
+        )
+        style = CommitStyle(request.get("style") or config.style)
+        generator = CommitMessageGenerator.from_config(
+            config, ollama_client=self.client, cache=None if request.get("no_cache") else self.cache
+        )
+
+        analysis = DiffAnalyzer(
+            repo,
+            file_cache=self.file_cache,
+            path_filter=PathFilter.from_config(config),
+            workers=config.diff_workers,
+        ).analyze_staged(
+            max_chars=max(config.diff_read_limit, generator.read_limit),
+            max_files=request.get("max_files"),
+            spill=request.get("spill", config.diff_spill),
+        )
+        if not analysis.raw_diff:
+            return {"ok": True, "message": None}
+
+        stats = {
+            "files_changed": analysis.stats.files_changed,
+            "insertions": analysis.stats.insertions,
+            "deletions": analysis.stats.deletions,
+            "excluded": len(analysis.excluded),
+        }
+        if count > 1:
+            candidates = generator.generate_candidates(
+                diff=analysis.raw_diff, analysis=analysis, style=style, count=count
+            )
+            return dict(
+                self._message_reply(candidates[0]),
+                ok=True,
+                stats=stats,
+                candidates=[self._message_reply(message) for message in candidates],
+            )
+
+        on_token = None
+        if request.get("stream"):
+
+            def on_token(text: str):
+                write({"token": text})
+
+        deadline = request.get("deadline", config.deadline)
+        upgrade = None
+        if deadline is not None and request.get("upgrade"):
+            upgrade = Future()
+
+        result = generator.generate(
+            diff=analysis.raw_diff,
+            analysis=analysis,
+            style=style,
+            on_token=on_token,
+            deadline=deadline,
+            on_upgrade=(
+                (lambda message: self._resolve_upgrade(upgrade, message)) if upgrade else None
+            ),
+        )
+
+        reply = dict(self._message_reply(result), ok=True, stats=stats)
+        if upgrade is not None and result.heuristic:
+            reply["provisional"] = True
+            reply["_upgrade"] = upgrade
+        return reply
+
+    @classmethod
+    def _resolve_upgrade(cls, upgrade: Future, message: Optional[CommitMessage]):
+        """Resolve the upgrade reply the handler waits on, with None if building it fails"""
+        reply = None
+        try:
+            if message is not None:
+                reply = cls._message_reply(message)
+        finally:
+            upgrade.set_result(reply)
+
+    @staticmethod
+    def _message_reply(message: CommitMessage) -> Dict[str, Any]:
+        """Reply fields describing a generated message"""
+        return {
+            "message": message.model_dump(mode="json"),
+            "text": message.format_conventional(),
+            "heuristic": message.heuristic,
+            "generation": (
+                dict(message.stats.model_dump(), summary=message.stats.describe())
+                if message.stats
+                else None
+            ),
+        }
@@ -0,0 +1,181 @@
+"""Client side of the commit-by-lee daemon protocol
+
+Kept free of third-party imports so talking to a running daemon stays cheap.
+
+Protocol: the client connects to the daemon's Unix socket and sends one
+JSON request terminated by a newline, e.g.
+
+    {"action": "generate", "repo": "/path/to/repo", "language": "en",
+     "style": "conventional", "max_files": null, "no_cache": false,
+     "stream": true, "deadline": 2.0, "upgrade": true, "profile": false,
+     "candidates": 1, "spill": false}
+
+The daemon answers with newline-delimited JSON objects: zero or more
+{"token": "<text so far>"} while streaming, then one final object with
+"ok" set, e.g. {"ok": true, "message": {...}, "text": "...", "heuristic":
+false, "stats": {...}, "generation": {...}} or {"ok": false, "error": "..."}.
+"generation" holds Ollama's token counts and timings plus a one-line
+"summary" of them (null for cached messages). "heuristic" is set when the
+message was built from the diff analysis because the model failed or
+missed the "deadline" (seconds, optional). With "profile", the reply
+also carries the timed stages of the request as {"trace_id": ...,
+"spans": [...]} (see profiling.py). With "candidates" (a count above 1),
+several messages are generated at once; the reply describes the best one
+and adds "candidates", a list of {"message", "text", "heuristic",
+"generation"} objects, best first ("stream" and "deadline" do not apply).
+"spill" memory-maps the whole staged patch (default: the daemon's config).
+
+With "upgrade" and a deadline, a heuristic reply has "provisional" set and
+is followed, once the model is done, by {"upgrade": {"message": {...},
+"text": "...", "heuristic": false, "generation": {...}}}, or
+{"upgrade": null} if the model failed. Other actions are "ping" and
+"shutdown".
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+PROTOCOL_VERSION = 1
+
+# Largest request line the daemon accepts
+MAX_REQUEST_BYTES = 64 * 1024
+
+# Upper bound of the "candidates" of a generate request
+MAX_CANDIDATES = 10
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening on the socket"""
+
+
+class DaemonError(Exception):
+    """The daemon received the request but could not handle it"""
+
+
+def default_socket_path() -> Path:
+    """
+    Socket path used by `serve` and `generate --via-daemon`
+
+    Returns:
+        $COMMIT_BY_LEE_SOCKET, or a per-user socket in $XDG_RUNTIME_DIR
+        (falling back to the temp directory)
+    """
+    if os.getenv("COMMIT_BY_LEE_SOCKET"):
+        return Path(os.environ["COMMIT_BY_LEE_SOCKET"])
+
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(runtime_dir) / f"commit-by-lee-{uid}.sock"
+
+
+def send_request(
+    request: Dict[str, Any],
+    socket_path: Optional[Path] = None,
+    timeout: Optional[float] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    on_upgrade: Optional[Callable[[Optional[Dict[str, Any]]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Send one request to the daemon and wait for the final reply
+
+    Args:
+        request: Request object; "version" is filled in
+        socket_path: Daemon socket (default: default_socket_path())
+        timeout: Socket timeout in seconds for each read (None waits forever)
+        on_token: Called with the text generated so far for streamed replies
+        on_upgrade: For provisional replies, called from a background thread
+            with the upgrade object (None if the model failed or the
+            connection broke)
+
+    Returns:
+        Final reply object
+
+    Raises:
+        DaemonUnavailable: If no daemon is listening
+        DaemonError: If the daemon replied with an error
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("Unix domain sockets are not supported on this platform")
+
+    path = str(socket_path or default_socket_path())
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    reader = None
+    handed_off = False
+
+    try:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise DaemonUnavailable(f"No daemon listening on {path}") from e
+
+        payload = dict(request, version=PROTOCOL_VERSION)
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+
+        reader = sock.makefile("rb")
+        for line in reader:
+            reply = json.loads(line)
+            if "token" in reply:
+                if on_token:
+                    on_token(reply["token"])
+                continue
+
+            if not reply.get("ok"):
+                raise DaemonError(reply.get("error") or "Unknown daemon error")
+
+            if reply.get("provisional") and on_upgrade:
+                # The connection stays open for the upgrade line
+                threading.Thread(
+                    target=_read_upgrade, args=(sock, reader, on_upgrade), daemon=True
+                ).start()
+                handed_off = True
+            return reply
+
+        raise DaemonError("Daemon closed the connection without replying")
+
+    finally:
+        if not handed_off:
+            if reader is not None:
+                reader.close()
+            sock.close()
+
+
+def _read_upgrade(
+    sock: socket.socket, reader, on_upgrade: Callable[[Optional[Dict[str, Any]]], None]
+):
+    """Wait for the upgrade line of a provisional reply and pass it on"""
+    upgrade = None
+    try:
+        # The model may take as long as it takes
+        sock.settimeout(None)
+        line = reader.readline()
+        if line:
+            upgrade = json.loads(line).get("upgrade")
+    except (OSError, ValueError):
+        pass
+    finally:
+        reader.close()
+        sock.close()
+    on_upgrade(upgrade)
+
+
+def ping(socket_path: Optional[Path] = None, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+    """
+    Check whether a daemon is running
+
+    Args:
+        socket_path: Daemon socket (default: default_socket_path())
+        timeout: Seconds to wait for the reply
+
+    Returns:
+        Daemon info (pid, version, uptime) or None if none is running
+    """
+    try:
+        return send_request({"action": "ping"}, socket_path, timeout=timeout)
+    except (DaemonUnavailable, DaemonError, OSError, ValueError):
+        return None
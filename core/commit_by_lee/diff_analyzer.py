@@ -1,29 +1,277 @@
 """Git diff analyzer"""
 
-import subprocess
+import os
 import re
-from typing import List, Optional
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import BinaryIO, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Set, Tuple
 from pathlib import Path
 import logging
 
-from .models.schemas import DiffAnalysis, DiffStats, CommitType
+from .models.parsed import CommitDiff, ParsedDiff, ParsedFile, ParsedStats
+from .models.schemas import CommitType, DiffAnalysis, FileStatus
+from .diff_parser import FILE_HEADER, DiffParser, _unquote_path, parse_diff
+from .mapped_diff import MappedDiff
+from .path_filter import PathFilter
+from .profiling import in_context, span
 
 logger = logging.getLogger(__name__)
 
+SCOPE_MAPPINGS = {
+    "src/auth/": "auth",
+    "src/ui/": "ui",
+    "src/api/": "api",
+    "src/utils/": "utils",
+    "src/core/": "core",
+    "tests/": "tests",
+    "docs/": "docs",
+    "config/": "config",
+}
+
+DOC_MARKERS = ('.md', '.txt', 'docs/')
+
+# Characters of patch text read by analyze_staged; a few times the prompt's
+# diff budget so redaction and per-file chunking still have enough to work with
+DEFAULT_READ_LIMIT = 20000
+
+# Bytes requested from the git pipe per read
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Parallel extraction (see DiffAnalyzer): at most this many files and
+# changed lines per git diff call
+BATCH_MAX_FILES = 200
+BATCH_MAX_LINES = 10000
+
+# Upper bound of the concurrent git diff calls, however many are configured
+MAX_WORKERS = 32
+
+# Estimated patch text from which parallel extraction pays off; below it,
+# one streamed git diff that stops at the budget is faster
+PARALLEL_MIN_CHARS = 256 * 1024
+
+# Rough patch size of a file from its numstat counts: header plus changed lines
+ESTIMATED_HEADER_CHARS = 200
+ESTIMATED_LINE_CHARS = 40
+
+# Status letters of git diff --raw / --name-status
+GIT_STATUS_MAP = {
+    'A': FileStatus.ADDED,
+    'M': FileStatus.MODIFIED,
+    'D': FileStatus.DELETED,
+    'R': FileStatus.RENAMED,
+    'C': FileStatus.COPIED,
+    'T': FileStatus.MODIFIED,  # Type change, e.g. file to symlink
+}
+
+# Starts each commit header in iter_commits' git log output; patch lines
+# never start with it. The header holds the hash and subject separated by \x1f
+COMMIT_RECORD_MARKER = '\x1e'
+
+# Keyword groups hinting at the commit type, searched in the diff content
+TYPE_KEYWORDS = {
+    'fix': ('fix', 'bug', 'error', 'issue', 'patch'),
+    'refactor': ('refactor', 'restructure', 'reorganize', 'optimize'),
+    'feat': ('add', 'new', 'implement', 'create', 'feature'),
+}
+
+
+class _CachedFile(NamedTuple):
+    """Patch text of one staged file with its parse results"""
+    text: str
+    file: ParsedFile  # Offsets relative to text
+    keywords: FrozenSet[str]
+
+
+class FileAnalysisCache:
+    """
+    Per-file patch text and parse results of staged files, keyed by blob ids
+
+    A file's patch only depends on its paths, modes and old and new blobs,
+    so a long-running caller (the daemon) can keep one cache across
+    requests and repositories: analyzing the staged changes again then only
+    asks git for, and parses, the files whose staged content changed.
+    Entries are evicted in least-recently-used order. Thread-safe.
+    """
+
+    def __init__(self, max_chars: int = 16 * 1024 * 1024):
+        """
+        Initialize cache
+
+        Args:
+            max_chars: Maximum total patch text kept
+        """
+        self.max_chars = max_chars
+        self._entries: "OrderedDict[str, _CachedFile]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(file: ParsedFile) -> Optional[str]:
+        """Cache key of a staged file (None without a blob id)"""
+        if not file.blob_id:
+            return None
+        return f"{file.old_path or ''}\0{file.path}\0{file.blob_id}"
+
+    def get(self, key: str) -> Optional[_CachedFile]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: _CachedFile):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.text)
+            self._entries[key] = entry
+            self._size += len(entry.text)
+            while self._size > self.max_chars and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.text)
+
+
+class _GitProcesses:
+    """
+    Git processes run by the workers of one parallel extraction
+
+    Once cancelled, running processes are killed and new ones are killed
+    as they start, so workers whose results are no longer needed finish
+    right away instead of holding up the executor's shutdown.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running: Set[subprocess.Popen] = set()
+        self.cancelled = False
+
+    def add(self, process: subprocess.Popen):
+        with self._lock:
+            if self.cancelled:
+                process.kill()
+            else:
+                self._running.add(process)
+
+    def discard(self, process: subprocess.Popen):
+        with self._lock:
+            self._running.discard(process)
+
+    def cancel(self):
+        """Kill the running processes and any started from now on"""
+        with self._lock:
+            self.cancelled = True
+            for process in self._running:
+                process.kill()
+            if self._running:
+                logger.debug(f"Stopped {len(self._running)} git call(s) no longer needed")
+
+
+class _CommitPatch:
+    """Patch of one commit being read by DiffAnalyzer.iter_commits"""
+
+    def __init__(self, sha: str, subject: str, max_chars: int):
+        self.sha = sha
+        self.subject = subject
+        self.parser = DiffParser(keywords=TYPE_KEYWORDS)
+        self.parts: List[str] = []
+        self.read = 0
+        self.max_chars = max_chars
+        self.truncated = False
+        self.in_patch = False
+        # Exact counts from the numstat lines ahead of the patch
+        self.stats = ParsedStats()
+
+    def feed(self, text: str):
+        """Parse more of the patch, dropping everything past max_chars"""
+        if not self.in_patch:
+            text = self._feed_numstat(text)
+            if not text:
+                return
+            self.in_patch = True
+        if self.truncated:
+            # Nothing after the cut may be appended, or the patch would have a gap
+            return
+        room = self.max_chars - self.read
+        if len(text) > room:
+            # Keep whole lines only; the parser needs line boundaries
+            text = text[:text.rfind('\n', 0, room) + 1]
+            self.truncated = True
+        if text:
+            self.parser.feed(text)
+            self.parts.append(text)
+            self.read += len(text)
+
+    def _feed_numstat(self, text: str) -> str:
+        """Count the numstat lines at the start of text and return the rest (from the patch on)"""
+        pos = 0
+        while pos < len(text) and not text.startswith(FILE_HEADER, pos):
+            line_end = text.find('\n', pos)
+            if line_end == -1:
+                line_end = len(text)
+            # "<added>\t<deleted>\t<path>", "-" for binary files; blank lines around them
+            fields = text[pos:line_end].split('\t', 2)
+            if len(fields) == 3:
+                self.stats.files_changed += 1
+                self.stats.insertions += int(fields[0]) if fields[0].isdigit() else 0
+                self.stats.deletions += int(fields[1]) if fields[1].isdigit() else 0
+                self.stats.files.append(_numstat_path(fields[2]))
+            pos = line_end + 1
+        return text[pos:]
+
+
+def _numstat_path(path: str) -> str:
+    """New path of a numstat entry ("old => new" and "dir/{old => new}/file" for renames)"""
+    if path.endswith('"'):
+        # Quoted because of special or non-ASCII characters; renames quote
+        # each side ("old" => "new"), and a quote inside a side is escaped
+        arrow = path.rfind(' => "')
+        return _unquote_path(path[arrow + 4:] if arrow != -1 else path)
+    if ' => ' not in path:
+        return path
+    if '{' in path:
+        path = re.sub(r'\{[^{}]* => ([^{}]*)\}', r'\1', path)
+        return path.replace('//', '/')
+    return path.split(' => ', 1)[1]
+
 
 class DiffAnalyzer:
     """
     Analyze git diff to extract meaningful information
     """
 
-    def __init__(self, repo_path: Optional[str] = None):
+    def __init__(
+        self,
+        repo_path: Optional[str] = None,
+        file_cache: Optional[FileAnalysisCache] = None,
+        path_filter: Optional[PathFilter] = None,
+        workers: Optional[int] = 1
+    ):
         """
         Initialize diff analyzer
 
         Args:
             repo_path: Path to git repository (default: current directory)
+            file_cache: Per-file results of earlier analyze_staged calls to
+                reuse for files whose staged blobs did not change (optional)
+            path_filter: Staged files whose patch analyze_staged leaves out
+                (default: none)
+            workers: Concurrent git diff calls analyze_staged may use to
+                extract a large patch, at most MAX_WORKERS; None for one
+                per CPU (default: 1, a single call)
         """
         self.repo_path = Path(repo_path) if repo_path else Path.cwd()
+        self.file_cache = file_cache
+        self.path_filter = path_filter
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = max(1, min(workers, MAX_WORKERS))
 
     def get_staged_diff(self) -> str:
         """
@@ -53,136 +301,943 @@ class DiffAnalyzer:
             logger.error("Git not found. Please ensure git is installed.")
             raise
 
+    def iter_staged_diff(
+        self,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        paths: Optional[List[str]] = None,
+        excludes: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """
+        Stream git diff for staged changes
+
+        Output is read from a pipe in blocks of whole lines, so callers can
+        stop early without git's full output ever being held in memory.
+        Closing the iterator terminates git.
+
+        Args:
+            chunk_size: Approximate number of characters per block
+            paths: Limit the diff to these paths (default: all staged files)
+            excludes: Pathspecs of files to leave out (see PathFilter.pathspecs)
+
+        Yields:
+            Blocks of diff text ending at line boundaries
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        yield from self._stream_git(
+            ["diff", "--staged", *self._pathspec_args(paths, excludes)], chunk_size
+        )
+
+    def get_staged_files(self) -> List[ParsedFile]:
+        """
+        Get per-file status and line counts for staged changes
+
+        Uses a single git diff --raw --numstat -z call, so counts are exact
+        and paths with spaces, quotes or unicode need no unquoting. Renames,
+        copies and binary files are reported by git itself. No patch text
+        is generated, which keeps this cheap for thousands of files.
+
+        Returns:
+            ParsedFile objects without hunks, in git's order
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        output = self._run_git(["diff", "--staged", "--raw", "--numstat", "-z", "--no-abbrev"])
+        fields = output.split('\0')
+        index = 0
+
+        # Raw records: ":<modes> <blobs> <status>", then one path (two for renames/copies)
+        raw_records = []
+        while index < len(fields) and fields[index].startswith(':'):
+            blob_id, _, status_code = fields[index][1:].rpartition(' ')
+            if status_code[:1] in ('R', 'C'):
+                old_path, path = fields[index + 1], fields[index + 2]
+                index += 3
+            else:
+                old_path, path = None, fields[index + 1]
+                index += 2
+            status = GIT_STATUS_MAP.get(status_code[:1], FileStatus.MODIFIED)
+            raw_records.append((path, old_path, status, blob_id))
+
+        # Numstat records follow in the same order: "<added>\t<deleted>\t<path>",
+        # with an empty path followed by old and new path for renames/copies
+        files = []
+        for path, old_path, status, blob_id in raw_records:
+            added, deleted, numstat_path = fields[index].split('\t', 2)
+            index += 1 if numstat_path else 3
+
+            binary = added == '-'
+            files.append(ParsedFile(
+                path=path,
+                old_path=old_path,
+                status=status,
+                binary=binary,
+                insertions=0 if binary else int(added),
+                deletions=0 if binary else int(deleted),
+                blob_id=blob_id
+            ))
+
+        return files
+
+    def get_staged_stats(self) -> ParsedStats:
+        """
+        Get exact statistics for staged changes without generating the patch
+
+        Returns:
+            ParsedStats object covering every staged file
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        return self._calculate_stats(self.get_staged_files())
+
+    def get_excluded_paths(self) -> Set[str]:
+        """
+        Get the staged paths matched by path_filter
+
+        Git matches the filter's pathspecs (including .gitattributes), so
+        the result agrees with what the exclude pathspecs leave out. Only
+        names are listed; no patch text is generated.
+
+        Returns:
+            Excluded paths (empty without a filter)
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        if not self.path_filter:
+            return set()
+        output = self._run_git(
+            ["diff", "--staged", "--name-only", "-z", "--", *self.path_filter.pathspecs()]
+        )
+        return {path for path in output.split('\0') if path}
+
+    def analyze_staged(
+        self,
+        max_chars: int = DEFAULT_READ_LIMIT,
+        max_files: Optional[int] = None,
+        spill: bool = False
+    ) -> ParsedDiff:
+        """
+        Analyze staged changes, reading at most max_chars of patch text
+
+        Statistics come from git's own numstat output and cover every
+        staged file. Patch text is only requested for the files that can
+        make it into the prompt; it is streamed and parsed incrementally,
+        and git is stopped as soon as the budget is reached.
+
+        Files matched by path_filter (lockfiles, generated and vendored
+        code) are left out with exclude pathspecs, so their patch is never
+        fetched; they are only listed in the result's excluded files, with
+        their line counts. When every staged file matches, none is left out.
+
+        With spill, the whole patch is instead written to a temporary file
+        and memory-mapped (see MappedDiff), and every file is parsed with
+        offsets into the mapping. The packer can then pick hunks from
+        anywhere in a huge diff while only the slices it picks are decoded.
+
+        With several workers, a large patch (thousands of files, or a large
+        max_chars) is extracted by concurrent git diff calls over batches
+        of files instead; the result is the same as with a single call.
+
+        Args:
+            max_chars: Maximum characters of patch text to read (ignored with spill)
+            max_files: Only fetch patch text for the first max_files files
+                (not counting excluded files)
+            spill: Memory-map the whole patch instead of reading max_chars of it
+
+        Returns:
+            ParsedDiff with complete stats; raw_diff and files cover the read
+            part (with spill, raw_diff is a MappedDiff)
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        with span("git.numstat") as attributes:
+            staged_files = self.get_staged_files()
+            stats = self._calculate_stats(staged_files)
+            attributes["files"] = stats.files_changed
+        if not stats.files_changed:
+            return ParsedDiff(raw_diff="", stats=stats)
+
+        with span("git.exclude") as attributes:
+            excluded_paths = self.get_excluded_paths()
+            attributes["files"] = len(excluded_paths)
+        included = [file for file in staged_files if file.path not in excluded_paths]
+        if included and len(included) < len(staged_files):
+            excluded = [file for file in staged_files if file.path in excluded_paths]
+            excludes = self.path_filter.pathspecs(exclude=True)
+            logger.info(
+                f"Leaving out the patch of {len(excluded)} generated, vendored or lock file(s)"
+            )
+        else:
+            included, excluded, excludes = staged_files, [], None
+
+        selected = included[:max_files] if max_files else included
+        if spill and self._parallel(selected, None):
+            diff, files, keywords, truncated = self._spill_parallel(selected)
+        elif spill:
+            diff, files, keywords, truncated = self._spill_staged(
+                selected if len(selected) < len(included) else None, excludes
+            )
+        elif self.file_cache is not None:
+            diff, files, keywords, truncated = self._read_incremental(selected, max_chars)
+        elif self._parallel(selected, max_chars):
+            diff, files, keywords, truncated = self._read_parallel(selected, max_chars)
+        else:
+            diff, files, keywords, truncated = self._read_staged(
+                selected if len(selected) < len(included) else None, max_chars, excludes
+            )
+        truncated = truncated or len(selected) < len(included)
+
+        if truncated:
+            logger.info(
+                f"Read {len(diff)} characters of diff for {stats.files_changed} file(s), "
+                "rest skipped"
+            )
+
+        # Parsed files do not know their blobs; take them from the raw records
+        blob_ids = {file.path: file.blob_id for file in staged_files}
+        for file in files:
+            file.blob_id = blob_ids.get(file.path)
+
+        with span("analyze"):
+            analysis = self._build_analysis(diff, files, keywords, stats=stats)
+        analysis.truncated = truncated
+        analysis.excluded = excluded
+        return analysis
+
+    def _read_staged(
+        self,
+        selected: Optional[List[ParsedFile]],
+        max_chars: int,
+        excludes: Optional[List[str]] = None
+    ) -> Tuple[str, List[ParsedFile], Set[str], bool]:
+        """
+        Stream and parse the staged patch text of some or all files
+
+        Args:
+            selected: Files to request (default: all staged files)
+            max_chars: Maximum characters of patch text to read
+            excludes: Pathspecs of files to leave out
+
+        Returns:
+            Patch text, parsed files, matched keywords and whether reading
+            stopped at max_chars
+        """
+        paths = self._paths_of(selected)
+        parser = DiffParser(keywords=TYPE_KEYWORDS)
+        parts = []
+        read = 0
+        truncated = False
+
+        # Reading and parsing overlap, so they are timed together
+        blocks = self.iter_staged_diff(min(STREAM_CHUNK_SIZE, max_chars), paths, excludes)
+        with span("git.diff") as attributes, closing(blocks):
+            for block in blocks:
+                if read + len(block) > max_chars:
+                    # Stop at the last whole line within max_chars
+                    block = block[:block.rfind('\n', 0, max_chars - read) + 1]
+                    truncated = True
+                parser.feed(block)
+                parts.append(block)
+                read += len(block)
+                if truncated:
+                    break
+
+            diff = ''.join(parts)
+            parser.finish()
+            attributes["chars"] = read
+
+        return diff, parser.files, parser.matched_keywords, truncated
+
+    def _spill_staged(
+        self,
+        selected: Optional[List[ParsedFile]],
+        excludes: Optional[List[str]] = None
+    ) -> Tuple[MappedDiff, List[ParsedFile], Set[str], bool]:
+        """
+        Spill the staged patch of some or all files to a mapped temporary file and parse it
+
+        Args:
+            selected: Files to request (default: all staged files)
+            excludes: Pathspecs of files to leave out
+
+        Returns:
+            Mapped patch, parsed files, matched keywords and False (nothing
+            is cut off)
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        with span("git.diff", spill=True) as attributes:
+            diff = self._spill_git(
+                ["diff", "--staged", *self._pathspec_args(self._paths_of(selected), excludes)]
+            )
+            attributes["bytes"] = len(diff)
+            parser = parse_diff(diff, keywords=TYPE_KEYWORDS)
+
+        return diff, parser.files, parser.matched_keywords, False
+
+    def _parallel(self, files: List[ParsedFile], max_chars: Optional[int]) -> bool:
+        """Whether extracting the patch of files in parallel batches pays off"""
+        if self.workers < 2 or len(files) < 2:
+            return False
+        estimate = sum(
+            ESTIMATED_HEADER_CHARS + ESTIMATED_LINE_CHARS * (file.insertions + file.deletions)
+            for file in files
+        )
+        if max_chars is not None:
+            estimate = min(estimate, max_chars)
+        return estimate >= PARALLEL_MIN_CHARS and len(self._batches(files)) > 1
+
+    @staticmethod
+    def _batches(files: List[ParsedFile]) -> List[List[ParsedFile]]:
+        """
+        Split files (in git's order) into runs of at most BATCH_MAX_FILES files
+        and about BATCH_MAX_LINES lines
+        """
+        batches = []
+        batch: List[ParsedFile] = []
+        lines = 0
+        for file in files:
+            size = file.insertions + file.deletions
+            if batch and (len(batch) >= BATCH_MAX_FILES or lines + size > BATCH_MAX_LINES):
+                batches.append(batch)
+                batch, lines = [], 0
+            batch.append(file)
+            lines += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _read_parallel(
+        self,
+        selected: List[ParsedFile],
+        max_chars: int
+    ) -> Tuple[str, List[ParsedFile], Set[str], bool]:
+        """
+        Extract and parse the staged patch of files in parallel batches
+
+        Up to workers git diff calls run at a time, each over a batch of
+        consecutive files, and every batch is parsed by its worker as soon
+        as git is done. Results are merged in batch order, so offsets and
+        file order are those of a single call. New batches are only started
+        while the merged text is short of max_chars, and the git calls of
+        batches still running once it is reached are killed.
+
+        Args:
+            selected: Files to request, in git's order
+            max_chars: Maximum characters of patch text to return
+
+        Returns:
+            Patch text, parsed files, matched keywords and whether the text
+            stopped at max_chars
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        batches = self._batches(selected)
+        texts = []
+        files = []
+        keywords: Set[str] = set()
+        offset = 0
+        cut = False
+
+        processes = _GitProcesses()
+        with span("git.diff", workers=self.workers, batches=len(batches)) as attributes, \
+                ThreadPoolExecutor(max_workers=self.workers) as executor:
+            extract = in_context(self._extract_batch)
+            pending = deque(
+                executor.submit(extract, batch, processes) for batch in batches[:self.workers]
+            )
+            submitted = len(pending)
+            try:
+                while pending:
+                    text, batch_files, batch_keywords = pending.popleft().result()
+                    if offset + len(text) > max_chars:
+                        # Keep whole lines only; the parser needs line boundaries
+                        text = text[:text.rfind('\n', 0, max_chars - offset) + 1]
+                        parser = parse_diff(text, keywords=TYPE_KEYWORDS)
+                        batch_files, batch_keywords = parser.files, parser.matched_keywords
+                        cut = True
+                    texts.append(text)
+                    files.extend(file.shifted(offset) for file in batch_files)
+                    keywords.update(batch_keywords)
+                    offset += len(text)
+                    if cut or offset >= max_chars:
+                        break
+                    if submitted < len(batches):
+                        pending.append(executor.submit(extract, batches[submitted], processes))
+                        submitted += 1
+            finally:
+                # Batches still running are not needed (or a batch failed):
+                # stop them so leaving the executor does not wait for them
+                for future in pending:
+                    future.cancel()
+                processes.cancel()
+            attributes["chars"] = offset
+
+        return ''.join(texts), files, keywords, cut or len(texts) < len(batches)
+
+    def _extract_batch(
+        self,
+        batch: List[ParsedFile],
+        processes: _GitProcesses
+    ) -> Tuple[str, List[ParsedFile], Set[str]]:
+        """
+        Patch text of a batch of files with its parse results
+        (runs in a worker; empty if cancelled)
+        """
+        args = ["diff", "--staged", *self._pathspec_args(self._paths_of(batch), None)]
+        process, stderr_file = self._popen_git(args, text=True, encoding='utf-8', errors='replace')
+        processes.add(process)
+        try:
+            text = process.stdout.read()
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+            stderr = self._read_stderr(stderr_file)
+            processes.discard(process)
+
+        if processes.cancelled:
+            return '', [], set()
+        if returncode != 0:
+            error = subprocess.CalledProcessError(returncode, ["git", *args], stderr=stderr)
+            logger.error(f"Failed to get git diff: {error}")
+            raise error
+        parser = parse_diff(text, keywords=TYPE_KEYWORDS)
+        return text, parser.files, parser.matched_keywords
+
+    def _spill_parallel(
+        self,
+        selected: List[ParsedFile]
+    ) -> Tuple[MappedDiff, List[ParsedFile], Set[str], bool]:
+        """
+        Like _spill_staged, but spill and parse batches of files in parallel
+
+        Each worker spills and parses one batch; the batches' files are then
+        joined into one mapped file in batch order and their offsets shifted
+        accordingly.
+
+        Args:
+            selected: Files to request, in git's order
+
+        Returns:
+            Mapped patch, parsed files, matched keywords and False (nothing
+            is cut off)
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        batches = self._batches(selected)
+        results = []
+        processes = _GitProcesses()
+        with span("git.diff", spill=True, workers=self.workers, batches=len(batches)) as attributes:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                spill = in_context(self._spill_batch)
+                futures = [executor.submit(spill, batch, processes) for batch in batches]
+                try:
+                    for future in futures:
+                        results.append(future.result())
+                except BaseException:
+                    # Stop the other batches, then release every part spilled
+                    for future in futures:
+                        future.cancel()
+                    processes.cancel()
+                    executor.shutdown()
+                    for future in futures:
+                        if future.done() and not future.cancelled() and future.exception() is None:
+                            part = future.result()
+                            if part is not None:
+                                part[0].close()
+                    raise
+
+            files = []
+            keywords: Set[str] = set()
+            offset = 0
+            for part, batch_files, batch_keywords in results:
+                files.extend(file.shifted(offset) for file in batch_files)
+                keywords.update(batch_keywords)
+                offset += len(part)
+            try:
+                diff = MappedDiff.join([part for part, _, _ in results])
+            finally:
+                for part, _, _ in results:
+                    part.close()
+            attributes["bytes"] = len(diff)
+
+        return diff, files, keywords, False
+
+    def _spill_batch(
+        self,
+        batch: List[ParsedFile],
+        processes: _GitProcesses
+    ) -> Optional[Tuple[MappedDiff, List[ParsedFile], Set[str]]]:
+        """
+        Spilled patch of a batch of files with its parse results
+        (runs in a worker; None if cancelled)
+        """
+        args = ["diff", "--staged", *self._pathspec_args(self._paths_of(batch), None)]
+        diff = self._spill_git(args, processes)
+        if diff is None:
+            return None
+        parser = parse_diff(diff, keywords=TYPE_KEYWORDS)
+        return diff, parser.files, parser.matched_keywords
+
+    def _spill_git(
+        self, args: List[str], processes: Optional[_GitProcesses] = None
+    ) -> Optional[MappedDiff]:
+        """
+        Run a git command and spill its output to a mapped temporary file
+
+        Args:
+            args: Git arguments (without "git")
+            processes: Registry that may cancel the command (from a parallel extraction)
+
+        Returns:
+            MappedDiff of the output (None if processes was cancelled)
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        process, stderr_file = self._popen_git(args)
+        if processes is not None:
+            processes.add(process)
+
+        try:
+            diff = MappedDiff.from_stream(process.stdout)
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+            stderr = self._read_stderr(stderr_file)
+            if processes is not None:
+                processes.discard(process)
+
+        if processes is not None and processes.cancelled:
+            diff.close()
+            return None
+        if returncode != 0:
+            diff.close()
+            error = subprocess.CalledProcessError(returncode, ["git", *args], stderr=stderr)
+            logger.error(f"Failed to get git diff: {error}")
+            raise error
+        return diff
+
+    @staticmethod
+    def _pathspec_args(paths: Optional[List[str]], excludes: Optional[List[str]]) -> List[str]:
+        """Git arguments limiting a diff to paths (None: all files) minus excludes"""
+        pathspecs = [f":(top,literal){path}" for path in paths or ()]
+        pathspecs += excludes or ()
+        return ["--", *pathspecs] if paths is not None or pathspecs else []
+
+    @staticmethod
+    def _paths_of(selected: Optional[List[ParsedFile]]) -> Optional[List[str]]:
+        """Pathspec limiting git diff to the selected files (None: all files)"""
+        if selected is None:
+            return None
+        paths = []
+        for file in selected:
+            paths.append(file.path)
+            if file.old_path:
+                # Keep both sides so git still detects the rename
+                paths.append(file.old_path)
+        return paths
+
+    def _read_incremental(
+        self,
+        selected: List[ParsedFile],
+        max_chars: int
+    ) -> Tuple[str, List[ParsedFile], Set[str], bool]:
+        """
+        Like _read_staged, but reuse file_cache entries of unchanged files
+
+        Only files without a cache entry for their current blobs are
+        requested from git and parsed; each of them is cached on its own.
+        The result is assembled in git's order, as a single read would give.
+
+        Args:
+            selected: Files to include, in git's order
+            max_chars: Maximum characters of patch text to return
+
+        Returns:
+            Patch text, parsed files, matched keywords and whether the text
+            stopped at max_chars
+        """
+        cache = self.file_cache
+        entries: Dict[str, _CachedFile] = {}
+        missing = []
+        for file in selected:
+            key = cache.key(file)
+            entry = cache.get(key) if key else None
+            if entry is None:
+                missing.append(file)
+            else:
+                entries[file.path] = entry
+
+        truncated = False
+        if missing:
+            read = self._read_parallel if self._parallel(missing, max_chars) else self._read_staged
+            diff, _, _, truncated = read(missing, max_chars)
+            by_path = {file.path: file for file in missing}
+            parts = self._split_files(diff)
+            for index, part in enumerate(parts):
+                parser = parse_diff(part, keywords=TYPE_KEYWORDS)
+                if not parser.files:
+                    continue
+                entry = _CachedFile(part, parser.files[0], frozenset(parser.matched_keywords))
+                entries[entry.file.path] = entry
+                key = cache.key(by_path.get(entry.file.path, entry.file))
+                if key and not (truncated and index == len(parts) - 1):
+                    cache.put(key, entry)
+        logger.debug(f"Reused {len(selected) - len(missing)} of {len(selected)} analyzed file(s)")
+
+        texts = []
+        files = []
+        keywords: Set[str] = set()
+        offset = 0
+        for file in selected:
+            entry = entries.get(file.path)
+            if entry is None:
+                # Cut off by max_chars while reading
+                truncated = True
+                break
+            cut = offset + len(entry.text) > max_chars
+            if cut:
+                truncated = True
+                text = entry.text[:entry.text.rfind('\n', 0, max_chars - offset) + 1]
+                parser = parse_diff(text, keywords=TYPE_KEYWORDS)
+                if not parser.files:
+                    break
+                entry = _CachedFile(text, parser.files[0], frozenset(parser.matched_keywords))
+            texts.append(entry.text)
+            files.append(entry.file.shifted(offset))
+            keywords.update(entry.keywords)
+            offset += len(entry.text)
+            if cut:
+                break
+
+        return ''.join(texts), files, keywords, truncated
+
+    @staticmethod
+    def _split_files(diff: str) -> List[str]:
+        """Split patch text into one part per file"""
+        parts = []
+        start = 0
+        while start < len(diff):
+            end = diff.find('\n' + FILE_HEADER, start) + 1 or len(diff)
+            parts.append(diff[start:end])
+            start = end
+        return parts
+
+    def iter_commits(
+        self,
+        rev_range: str,
+        max_chars: int = DEFAULT_READ_LIMIT
+    ) -> Iterator[CommitDiff]:
+        """
+        Read and analyze the patches of every commit in a range
+
+        All commits come from a single streamed git log -p process instead
+        of one git call per commit. Each patch is parsed as it arrives and
+        only its first max_chars characters are kept, so memory stays
+        bounded however long the range is. Statistics of cut patches come
+        from git's numstat lines, so they stay exact. Merge commits are
+        skipped.
+
+        Args:
+            rev_range: Revision range, e.g. "main..feature" or "HEAD~50.."
+            max_chars: Maximum characters of patch text kept per commit
+
+        Yields:
+            CommitDiff per commit, newest first (git log order)
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        args = [
+            "log", "-p", "--numstat", "--no-merges", "--no-color", "--no-ext-diff",
+            f"--format={COMMIT_RECORD_MARKER}%H\x1f%s", rev_range, "--"
+        ]
+        marker_line = '\n' + COMMIT_RECORD_MARKER
+        current = None
+
+        for block in self._stream_git(args):
+            pos = 0
+            while pos < len(block):
+                if block.startswith(COMMIT_RECORD_MARKER, pos):
+                    if current:
+                        yield self._finish_commit(current)
+                    line_end = block.find('\n', pos)
+                    if line_end == -1:
+                        line_end = len(block)
+                    sha, _, subject = block[pos + 1:line_end].partition('\x1f')
+                    current = _CommitPatch(sha, subject, max_chars)
+                    pos = line_end + 1
+                    continue
+
+                next_commit = block.find(marker_line, pos)
+                end = next_commit + 1 if next_commit != -1 else len(block)
+                if current:
+                    current.feed(block[pos:end])
+                pos = end
+
+        if current:
+            yield self._finish_commit(current)
+
+    def _finish_commit(self, commit: "_CommitPatch") -> CommitDiff:
+        """Build the CommitDiff of a fully read commit"""
+        commit.parser.finish()
+        if commit.parser.files:
+            analysis = self._build_analysis(
+                ''.join(commit.parts),
+                commit.parser.files,
+                commit.parser.matched_keywords,
+                # The parse only covers the part that was kept
+                stats=commit.stats if commit.truncated else None
+            )
+        else:
+            analysis = ParsedDiff(raw_diff="", stats=ParsedStats())
+        analysis.truncated = commit.truncated
+        return CommitDiff(sha=commit.sha, subject=commit.subject, analysis=analysis)
+
+    def _run_git(self, args: List[str]) -> str:
+        """
+        Run a git command and return its output
+
+        Args:
+            args: Git arguments (without "git")
+
+        Returns:
+            Command output
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        try:
+            result = subprocess.run(
+                ["git", *args],
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                check=True
+            )
+            return result.stdout
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Git command failed: {e}")
+            raise
+        except FileNotFoundError:
+            logger.error("Git not found. Please ensure git is installed.")
+            raise
+
+    def _popen_git(self, args: List[str], **kwargs) -> Tuple[subprocess.Popen, BinaryIO]:
+        """
+        Start a git command with its output piped
+
+        Its errors go to a temporary file rather than a second pipe: a pipe
+        that is only read after the output could fill up and block git
+        while the caller is still waiting for output.
+
+        Args:
+            args: Git arguments (without "git")
+            **kwargs: Popen arguments for the output (e.g. text=True)
+
+        Returns:
+            The process and its stderr file (see _read_stderr)
+        """
+        stderr_file = tempfile.TemporaryFile(prefix="commit-by-lee-")
+        try:
+            process = subprocess.Popen(
+                ["git", *args],
+                cwd=self.repo_path,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                **kwargs,
+            )
+        except FileNotFoundError:
+            stderr_file.close()
+            logger.error("Git not found. Please ensure git is installed.")
+            raise
+        except BaseException:
+            stderr_file.close()
+            raise
+        return process, stderr_file
+
+    @staticmethod
+    def _read_stderr(stderr_file: BinaryIO) -> str:
+        """Decoded contents of a git command's stderr file, which is closed"""
+        with stderr_file:
+            stderr_file.seek(0)
+            return stderr_file.read().decode('utf-8', errors='replace')
+
+    def _stream_git(self, args: List[str], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Run a git command and yield its output in blocks of whole lines
+
+        Args:
+            args: Git arguments (without "git")
+            chunk_size: Approximate number of characters per block
+
+        Yields:
+            Output blocks
+
+        Raises:
+            subprocess.CalledProcessError: If git command fails
+        """
+        process, stderr_file = self._popen_git(args, text=True, encoding='utf-8', errors='replace')
+
+        finished = False
+        try:
+            while True:
+                lines = process.stdout.readlines(chunk_size)
+                if not lines:
+                    break
+                yield ''.join(lines)
+            finished = True
+        finally:
+            if not finished:
+                # Caller stopped early: stop git instead of draining its output
+                process.kill()
+            process.stdout.close()
+            returncode = process.wait()
+            stderr = self._read_stderr(stderr_file)
+
+        if returncode != 0:
+            error = subprocess.CalledProcessError(returncode, ["git", *args], stderr=stderr)
+            logger.error(f"Failed to get git diff: {error}")
+            raise error
+
     def analyze_diff(self, diff: str) -> DiffAnalysis:
         """
         Analyze git diff and extract statistics
 
+        The diff is parsed in a single pass; statistics, file types and
+        scope/type suggestions are all derived from the parsed file list.
+
         Args:
             diff: Raw git diff string
 
         Returns:
             DiffAnalysis object with statistics and suggestions
         """
+        return self._analyze_diff(diff).to_model()
+
+    def _analyze_diff(self, diff: str) -> ParsedDiff:
+        """Like analyze_diff, but return the internal ParsedDiff without converting it"""
         if not diff:
             logger.warning("Empty diff provided")
-            return DiffAnalysis(raw_diff="", stats=DiffStats())
+            return ParsedDiff(raw_diff="", stats=ParsedStats())
+
+        with span("analyze", chars=len(diff)):
+            parser = parse_diff(diff, keywords=TYPE_KEYWORDS)
+            return self._build_analysis(diff, parser.files, parser.matched_keywords)
+
+    def _build_analysis(
+        self,
+        diff: str,
+        files: List[ParsedFile],
+        matched_keywords: Set[str],
+        stats: Optional[ParsedStats] = None
+    ) -> ParsedDiff:
+        """
+        Build analysis result from parsed files
 
-        stats = self._calculate_stats(diff)
-        file_types = self._extract_file_types(diff)
-        suggested_scope = self._suggest_scope(diff)
-        suggested_type = self._suggest_type(diff, stats)
+        Args:
+            diff: Raw git diff string
+            files: Parsed per-file diffs
+            matched_keywords: Keyword groups found in the diff content
+            stats: Precomputed statistics (default: calculated from files)
 
-        return DiffAnalysis(
+        Returns:
+            ParsedDiff object
+        """
+        stats = stats or self._calculate_stats(files)
+        file_types = self._extract_file_types(stats.files)
+        suggested_scope = self._suggest_scope(stats.files)
+        suggested_type = self._suggest_type(stats, matched_keywords)
+
+        return ParsedDiff(
             raw_diff=diff,
             stats=stats,
+            files=files,
             file_types=file_types,
             suggested_scope=suggested_scope,
             suggested_type=suggested_type
         )
 
-    def _calculate_stats(self, diff: str) -> DiffStats:
+    def _calculate_stats(self, files: List[ParsedFile]) -> ParsedStats:
         """
         Calculate diff statistics
 
         Args:
-            diff: Raw git diff string
+            files: Parsed per-file diffs
 
         Returns:
-            DiffStats object
+            ParsedStats object
         """
-        files_changed = 0
-        insertions = 0
-        deletions = 0
-        files = []
-
-        # Split by file headers
-        file_chunks = re.split(r'^diff --git a/', diff, flags=re.MULTILINE)
-
-        for chunk in file_chunks[1:]:  # Skip first empty chunk
-            files_changed += 1
-
-            # Extract filename
-            match = re.search(r'^([\w/._-]+)', chunk)
-            if match:
-                files.append(match.group(1))
-
-            # Count insertions and deletions
-            for line in chunk.split('\n'):
-                if line.startswith('+') and not line.startswith('+++'):
-                    insertions += 1
-                elif line.startswith('-') and not line.startswith('---'):
-                    deletions += 1
-
-        return DiffStats(
-            files_changed=files_changed,
-            insertions=insertions,
-            deletions=deletions,
-            files=files
+        return ParsedStats(
+            files_changed=len(files),
+            insertions=sum(f.insertions for f in files),
+            deletions=sum(f.deletions for f in files),
+            files=[f.path for f in files]
         )
 
-    def _extract_file_types(self, diff: str) -> List[str]:
+    def _extract_file_types(self, paths: List[str]) -> List[str]:
         """
-        Extract file extensions from diff
+        Extract file extensions from changed file paths
 
         Args:
-            diff: Raw git diff string
+            paths: Changed file paths
 
         Returns:
             List of file extensions
         """
         extensions = set()
 
-        # Match file extensions
-        pattern = r'\.(\w+)'
-        matches = re.findall(pattern, diff)
-
-        extensions.update(matches)
+        for path in paths:
+            name = path.rsplit('/', 1)[-1]
+            stem, dot, extension = name.rpartition('.')
+            if dot and stem and extension:
+                extensions.add(extension)
 
-        # Add special cases
-        if 'Dockerfile' in diff:
-            extensions.add('dockerfile')
-        if 'Makefile' in diff:
-            extensions.add('makefile')
-        if any(ext in diff for ext in ['.yml', '.yaml']):
-            extensions.add('yaml')
+            # Add special cases
+            if name == 'Dockerfile':
+                extensions.add('dockerfile')
+            elif name == 'Makefile':
+                extensions.add('makefile')
+            if extension in ('yml', 'yaml'):
+                extensions.add('yaml')
 
         return sorted(list(extensions))
 
-    def _suggest_scope(self, diff: str) -> Optional[str]:
+    def _suggest_scope(self, paths: List[str]) -> Optional[str]:
         """
         Suggest commit scope based on changed files
 
         Args:
-            diff: Raw git diff string
+            paths: Changed file paths
 
         Returns:
             Suggested scope or None
         """
-        scope_mappings = {
-            "src/auth/": "auth",
-            "src/ui/": "ui",
-            "src/api/": "api",
-            "src/utils/": "utils",
-            "src/core/": "core",
-            "tests/": "tests",
-            "docs/": "docs",
-            "config/": "config",
-        }
-
         # Check for known paths
-        for path, scope in scope_mappings.items():
-            if path in diff:
+        for prefix, scope in SCOPE_MAPPINGS.items():
+            if any(prefix in path for path in paths):
                 return scope
 
         return None
 
-    def _suggest_type(self, diff: str, stats: DiffStats) -> Optional[CommitType]:
+    def _suggest_type(self, stats: ParsedStats, matched_keywords: Set[str]) -> Optional[CommitType]:
         """
-        Suggest commit type based on diff content
+        Suggest commit type based on changed files and diff content
 
         Args:
-            diff: Raw git diff string
             stats: Diff statistics
+            matched_keywords: Keyword groups found in the diff content
 
         Returns:
             Suggested CommitType
@@ -192,24 +1247,18 @@ class DiffAnalyzer:
             return CommitType.TEST
 
         # Check for documentation
-        if any(ext in diff for ext in ['.md', '.txt', 'docs/']):
+        if any(marker in f for f in stats.files for marker in DOC_MARKERS):
             if stats.insertions > 0 or stats.deletions > 0:
                 return CommitType.DOCS
 
-        # Check for common fix patterns
-        fix_keywords = ['fix', 'bug', 'error', 'issue', 'patch']
-        if any(keyword in diff.lower() for keyword in fix_keywords):
-            return CommitType.FIX
-
-        # Check for refactoring patterns
-        refactor_keywords = ['refactor', 'restructure', 'reorganize', 'optimize']
-        if any(keyword in diff.lower() for keyword in refactor_keywords):
-            return CommitType.REFACTOR
-
-        # Check for feature patterns
-        feature_keywords = ['add', 'new', 'implement', 'create', 'feature']
-        if any(keyword in diff.lower() for keyword in feature_keywords):
-            return CommitType.FEAT
+        # Check for common fix, refactoring and feature patterns
+        for keyword_group, commit_type in (
+            ('fix', CommitType.FIX),
+            ('refactor', CommitType.REFACTOR),
+            ('feat', CommitType.FEAT),
+        ):
+            if keyword_group in matched_keywords:
+                return commit_type
 
         # Default based on changes
         if stats.insertions > stats.deletions * 2:
@@ -0,0 +1,282 @@
+"""Single-pass git diff parser"""
+
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from .models.parsed import Hunk, ParsedFile
+from .models.schemas import FileStatus
+
+HUNK_HEADER_PATTERN = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+FILE_HEADER = "diff --git "
+
+# Keyword search is a heuristic; stop after this many characters of hunk text
+KEYWORD_SCAN_LIMIT = 1024 * 1024
+
+
+def _unquote_path(path: str) -> str:
+    """Decode a path git quoted because of special or non-ASCII characters"""
+    if len(path) < 2 or not (path.startswith('"') and path.endswith('"')):
+        return path
+    raw = path[1:-1].encode("latin-1", "backslashreplace").decode("unicode_escape")
+    return raw.encode("latin-1", "replace").decode("utf-8", "replace")
+
+
+def _strip_prefix(path: str) -> str:
+    """Strip the a/ or b/ prefix git adds to diff paths"""
+    path = _unquote_path(path.rstrip("\r").rstrip("\t"))
+    if path[:2] in ("a/", "b/"):
+        return path[2:]
+    return path
+
+
+def _parse_git_header(line: str) -> str:
+    """
+    Extract the file path from a "diff --git a/<path> b/<path>" line
+
+    Paths may contain spaces, so the line is split in the middle when both
+    sides are equal (the common, non-rename case) and at the last " b/"
+    otherwise. Renames are corrected later by "rename to" / "+++" lines.
+    """
+    rest = line[len(FILE_HEADER) :].rstrip("\r")
+
+    if rest.startswith('"'):
+        closing = rest.find('" ', 1)
+        if closing != -1:
+            return _strip_prefix(rest[closing + 2 :])
+
+    half = (len(rest) - 1) // 2
+    if len(rest) > 4 and rest[half] == " " and rest[2:half] == rest[half + 3 :]:
+        return rest[half + 3 :]
+
+    split = rest.rfind(" b/")
+    if split != -1:
+        return rest[split + 3 :]
+    return _strip_prefix(rest)
+
+
+class DiffParser:
+    """
+    Single-pass parser for unified git diffs
+
+    The diff is swept once from start to end, building a per-file and
+    per-hunk model. File and hunk boundaries are located with str.find and
+    changed lines are counted with str.count on index ranges, so the work is
+    done at C speed and no copies of the diff are made. This relies on git's
+    format guarantee that hunk content lines always start with ' ', '+', '-'
+    or '\\', so a line starting with "@@ " or "diff --git " is a header.
+
+    Text can be fed incrementally (e.g. from a pipe); each feed() must end
+    at a line boundary.
+    """
+
+    def __init__(
+        self,
+        keywords: Optional[Dict[str, Tuple[str, ...]]] = None,
+        keyword_scan_limit: int = KEYWORD_SCAN_LIMIT,
+    ):
+        """
+        Initialize parser
+
+        Args:
+            keywords: Named groups of lowercase keywords searched (case-insensitively)
+                in hunks and file headers; names of groups that matched end up
+                in matched_keywords
+            keyword_scan_limit: Characters of hunk text to search for keywords
+        """
+        self.files: List[ParsedFile] = []
+        self.matched_keywords: Set[str] = set()
+        self.offset = 0
+
+        self._pending_keywords = dict(keywords or {})
+        self._keyword_budget = keyword_scan_limit
+        self._pending_text: List[str] = []
+
+    def feed(self, text: str):
+        """
+        Parse more of the diff
+
+        Complete file sections are parsed right away; the trailing, possibly
+        incomplete section is kept until the next feed() or finish().
+
+        Args:
+            text: Diff text ending at a line boundary
+        """
+        if not text:
+            return
+
+        boundary = text.rfind("\n" + FILE_HEADER) + 1
+        if not boundary and not text.startswith(FILE_HEADER):
+            self._pending_text.append(text)
+            return
+
+        if self._pending_text:
+            self._pending_text.append(text[:boundary])
+            section = "".join(self._pending_text)
+            self._parse(section, 0, len(section))
+        elif boundary:
+            self._parse(text, 0, boundary)
+
+        self._pending_text = [text[boundary:]]
+
+    def finish(self) -> List[ParsedFile]:
+        """
+        Parse any remaining text
+
+        Returns:
+            Parsed files in diff order
+        """
+        if self._pending_text:
+            section = "".join(self._pending_text)
+            self._pending_text = []
+            self._parse(section, 0, len(section))
+
+        return self.files
+
+    def _parse(self, text: str, start: int, end: int):
+        """Parse all file sections in text[start:end]"""
+        base = self.offset - start
+        find = text.find
+        pos = start
+
+        while pos < end:
+            next_file = find("\n" + FILE_HEADER, pos, end)
+            file_end = next_file + 1 if next_file != -1 else end
+
+            if text.startswith(FILE_HEADER, pos):
+                self._parse_file(text, pos, file_end, base)
+
+            pos = file_end
+
+        self.offset = base + end
+
+    def _parse_file(self, text: str, start: int, end: int, base: int):
+        """Parse one file section text[start:end]"""
+        find = text.find
+        count = text.count
+
+        first_hunk = find("\n@@ ", start, end)
+        header_end = first_hunk + 1 if first_hunk != -1 else end
+
+        header = self._parse_file_header(text[start:header_end].split("\n"))
+
+        hunks = []
+        insertions = 0
+        deletions = 0
+        hunk_start = header_end
+
+        while hunk_start < end:
+            next_hunk = find("\n@@ ", hunk_start, end)
+            hunk_end = next_hunk + 1 if next_hunk != -1 else end
+
+            body_start = find("\n", hunk_start, hunk_end)
+            if body_start == -1:
+                body_start = hunk_end
+
+            match = HUNK_HEADER_PATTERN.match(text[hunk_start:body_start])
+            if match:
+                old_start, old_lines, new_start, new_lines = match.groups()
+                hunk_insertions = count("\n+", body_start, hunk_end)
+                hunk_deletions = count("\n-", body_start, hunk_end)
+
+                hunks.append(
+                    Hunk(
+                        base + hunk_start,
+                        base + hunk_end,
+                        int(old_start),
+                        int(old_lines) if old_lines is not None else 1,
+                        int(new_start),
+                        int(new_lines) if new_lines is not None else 1,
+                        hunk_insertions,
+                        hunk_deletions,
+                    )
+                )
+                insertions += hunk_insertions
+                deletions += hunk_deletions
+
+                if self._pending_keywords and self._keyword_budget > 0:
+                    self._match_keywords(text, body_start, hunk_end)
+
+            hunk_start = hunk_end
+
+        self.files.append(
+            ParsedFile(
+                *header,
+                insertions=insertions,
+                deletions=deletions,
+                hunks=hunks,
+                start=base + start,
+                end=base + end,
+            )
+        )
+
+    def _parse_file_header(self, lines: List[str]) -> Tuple[str, Optional[str], FileStatus, bool]:
+        """
+        Parse the extended header lines of one file section
+
+        Returns:
+            ParsedFile fields: path, old_path, status and binary flag
+        """
+        path = ""
+        old_path = None
+        status = FileStatus.MODIFIED
+        binary = False
+
+        for line in lines:
+            if line.startswith(FILE_HEADER):
+                path = _parse_git_header(line)
+                if self._pending_keywords:
+                    self._match_keywords(line, 0, len(line))
+            elif line.startswith("+++ "):
+                if not line.startswith("+++ /dev/null"):
+                    path = _strip_prefix(line[4:])
+            elif line.startswith("--- "):
+                if not line.startswith("--- /dev/null"):
+                    old_path = _strip_prefix(line[4:])
+            elif line.startswith("new file mode"):
+                status = FileStatus.ADDED
+            elif line.startswith("deleted file mode"):
+                status = FileStatus.DELETED
+            elif line.startswith("rename from "):
+                status = FileStatus.RENAMED
+                old_path = _unquote_path(line[12:].rstrip("\r"))
+            elif line.startswith("rename to "):
+                path = _unquote_path(line[10:].rstrip("\r"))
+            elif line.startswith("copy from "):
+                status = FileStatus.COPIED
+                old_path = _unquote_path(line[10:].rstrip("\r"))
+            elif line.startswith("copy to "):
+                path = _unquote_path(line[8:].rstrip("\r"))
+            elif line.startswith("Binary files ") or line.startswith("GIT binary patch"):
+                binary = True
+
+        if old_path == path:
+            old_path = None
+
+        return path, old_path, status, binary
+
+    def _match_keywords(self, text: str, start: int, end: int):
+        """Record keyword groups found in text[start:end], then stop searching for them"""
+        end = min(end, start + max(self._keyword_budget, 0))
+        self._keyword_budget -= end - start
+        lowered = text[start:end].lower()
+        for name, words in list(self._pending_keywords.items()):
+            if any(word in lowered for word in words):
+                self.matched_keywords.add(name)
+                del self._pending_keywords[name]
+
+
+def parse_diff(diff: str, keywords: Optional[Dict[str, Tuple[str, ...]]] = None) -> DiffParser:
+    """
+    Parse a complete diff in one pass
+
+    Args:
+        diff: Raw git diff string
+        keywords: Named keyword groups to look for (see DiffParser)
+
+    Returns:
+        Finished DiffParser holding files and matched keywords
+    """
+    parser = DiffParser(keywords)
+    parser._parse(diff, 0, len(diff))
+    return parser
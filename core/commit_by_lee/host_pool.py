@@ -0,0 +1,293 @@
+"""Routing, health and circuit breaking across several Ollama servers"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the moving latency average
+LATENCY_SMOOTHING = 0.3
+
+
+class Backend:
+    """State of one Ollama server in a HostPool"""
+
+    def __init__(self, host: str):
+        """
+        Initialize backend
+
+        Args:
+            host: Server URL
+        """
+        self.host = host.rstrip("/")
+        self.api_base = f"{self.host}/api"
+        self.outstanding = 0  # Requests in flight
+        self.latency: Optional[float] = None  # Moving average of request seconds
+        self.failures = 0  # Consecutive failures
+        self.opened_at: Optional[float] = None  # Circuit opened (None: closed)
+        self.probing = False  # A half-open trial request is in flight
+        self.healthy: Optional[bool] = None  # Last health check (None: never checked)
+        self.has_model = True
+        self.model_loaded = False
+
+    @property
+    def state(self) -> str:
+        """Circuit state: "closed", "open" or "half-open\" """
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.probing else "open"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State as a plain dict, for status output"""
+        return {
+            "host": self.host,
+            "state": self.state,
+            "healthy": self.healthy,
+            "has_model": self.has_model,
+            "model_loaded": self.model_loaded,
+            "outstanding": self.outstanding,
+            "latency": self.latency,
+            "failures": self.failures,
+        }
+
+
+class HostPool:
+    """
+    Pick a server for each request and keep track of how servers behave
+
+    Requests go to the available server with the fewest requests in flight,
+    preferring servers that have the model loaded (no cold start) and then
+    the lowest observed latency. A server failing failure_threshold times
+    in a row is taken out of rotation (circuit open) for reset_timeout
+    seconds; after that a single trial request decides whether it comes
+    back (half-open). If every server is out, the one that has been out the
+    longest is tried anyway, so a single-server pool behaves like no pool.
+
+    Thread-safe; health checks are run by the client owning the pool.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[str],
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        health_interval: float = 60.0,
+    ):
+        """
+        Initialize pool
+
+        Args:
+            hosts: Server URLs, in order of preference
+            failure_threshold: Consecutive failures that open a server's circuit
+            reset_timeout: Seconds before an open circuit allows a trial request
+            health_interval: Seconds after which health information is stale
+
+        Raises:
+            ValueError: If no hosts are given
+        """
+        self.backends = [Backend(host) for host in dict.fromkeys(hosts)]
+        if not self.backends:
+            raise ValueError("At least one Ollama host is required")
+
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.health_interval = health_interval
+        self.checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._checking = False
+        self._checked = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    def acquire(self, exclude: Iterable[Backend] = ()) -> Optional[Backend]:
+        """
+        Choose a server for a request and count it as in flight
+
+        Args:
+            exclude: Servers already tried for this request
+
+        Returns:
+            Backend, or None if every server was excluded
+        """
+        excluded = set(map(id, exclude))
+        now = time.monotonic()
+
+        with self._lock:
+            candidates = [backend for backend in self.backends if id(backend) not in excluded]
+            if not candidates:
+                return None
+
+            available = [backend for backend in candidates if self._available(backend, now)]
+            if available:
+                backend = min(available, key=self._routing_key)
+            else:
+                # Everything is out of rotation; probe the longest-resting server
+                backend = min(candidates, key=lambda b: b.opened_at or 0.0)
+
+            if backend.opened_at is not None:
+                backend.probing = True
+                logger.info(
+                    f"Trying {backend.host} again after "
+                    f"{now - backend.opened_at:.0f}s out of rotation"
+                )
+            backend.outstanding += 1
+            return backend
+
+    def release(self, backend: Backend, ok: bool, latency: Optional[float] = None):
+        """
+        Record the outcome of a request
+
+        Args:
+            backend: Server the request went to
+            ok: Whether the server answered properly
+            latency: Seconds the request took (only recorded if ok)
+        """
+        with self._lock:
+            backend.outstanding = max(0, backend.outstanding - 1)
+            backend.probing = False
+
+            if ok:
+                if backend.opened_at is not None:
+                    logger.info(f"{backend.host} is back in rotation")
+                backend.failures = 0
+                backend.opened_at = None
+                backend.healthy = True
+                if latency is not None:
+                    backend.latency = (
+                        latency
+                        if backend.latency is None
+                        else (
+                            LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * backend.latency
+                        )
+                    )
+                return
+
+            backend.failures += 1
+            if backend.opened_at is not None or backend.failures >= self.failure_threshold:
+                if backend.opened_at is None and len(self.backends) > 1:
+                    logger.warning(
+                        f"{backend.host} failed {backend.failures} times in a row, "
+                        f"taking it out of rotation for {self.reset_timeout:.0f}s"
+                    )
+                backend.opened_at = time.monotonic()
+
+    def discard(self, backend: Backend):
+        """
+        Forget a request that was abandoned before it finished
+
+        Nothing is recorded about the server: an abandoned request (e.g.
+        the slower attempt of a hedged request) says nothing about its health
+        or speed.
+
+        Args:
+            backend: Server the request went to
+        """
+        with self._lock:
+            backend.outstanding = max(0, backend.outstanding - 1)
+            backend.probing = False
+
+    def health_check_due(self) -> bool:
+        """Whether a health check should run now (claims it if so)"""
+        if len(self.backends) < 2:
+            return False
+
+        with self._lock:
+            if self._checking:
+                return False
+            if (
+                self.checked_at is not None
+                and time.monotonic() - self.checked_at < self.health_interval
+            ):
+                return False
+            self._checking = True
+            return True
+
+    def wait_for_health_check(self, timeout: float) -> bool:
+        """
+        Wait until the first health check has finished
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if a health check has finished
+        """
+        return self._checked.wait(timeout)
+
+    def check_health(self, probe: Callable[[Backend], Dict[str, bool]]):
+        """
+        Run a health check of every server in parallel
+
+        Args:
+            probe: Returns {"healthy", "has_model", "model_loaded"} for a
+                backend; exceptions count as unhealthy
+        """
+        results: Dict[int, Optional[Dict[str, bool]]] = {}
+
+        def run(backend: Backend):
+            try:
+                results[id(backend)] = probe(backend)
+            except Exception as e:
+                logger.debug(f"Health check of {backend.host} failed: {e}")
+                results[id(backend)] = None
+
+        threads = [
+            threading.Thread(target=run, args=(backend,), daemon=True) for backend in self.backends
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with self._lock:
+            now = time.monotonic()
+            for backend in self.backends:
+                result = results.get(id(backend))
+                backend.healthy = bool(result and result.get("healthy"))
+                backend.model_loaded = bool(result and result.get("model_loaded"))
+                # A failed probe says nothing about the model: keep what the
+                # last answer said, so the server is gated by the circuit
+                # alone and still gets its trial request after reset_timeout
+                if result is not None:
+                    backend.has_model = bool(result.get("has_model", True))
+
+                # An unreachable server is taken out of rotation right away.
+                # Passing the check does not bring one back: it may answer
+                # /api/tags and still fail requests, so that is left to the
+                # trial request after reset_timeout.
+                if not backend.healthy and backend.opened_at is None:
+                    backend.failures = max(backend.failures, self.failure_threshold)
+                    backend.opened_at = now
+
+            self.checked_at = now
+            self._checking = False
+        self._checked.set()
+
+        healthy = [backend.host for backend in self.backends if backend.healthy]
+        logger.debug(f"Health check: {len(healthy)}/{len(self.backends)} servers healthy")
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """State of every server, for status output"""
+        with self._lock:
+            return [backend.snapshot() for backend in self.backends]
+
+    def _available(self, backend: Backend, now: float) -> bool:
+        """Whether backend may take a request (caller holds the lock)"""
+        if not backend.has_model:
+            return False
+        if backend.opened_at is None:
+            return True
+        # Half-open: one trial request at a time once the reset timeout passed
+        return not backend.probing and now - backend.opened_at >= self.reset_timeout
+
+    @staticmethod
+    def _routing_key(backend: Backend):
+        """Sort key of available backends: lower is better"""
+        return (
+            backend.outstanding,
+            not backend.model_loaded,
+            backend.latency if backend.latency is not None else 0.0,
+        )
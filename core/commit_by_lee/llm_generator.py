@@ -1,22 +1,174 @@
 """Commit message generator using Qwen3:4B via Ollama"""
 
+import asyncio
 import logging
+import random
 import re
-from typing import Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, List, NamedTuple, Optional, Tuple
 
+from .async_ollama_client import AsyncOllamaClient
 from .ollama_client import OllamaClient
 from .diff_analyzer import DiffAnalyzer
+from .cache import MessageCache
+from .diff_parser import parse_diff
+from .mapped_diff import MappedDiff
+from .profiling import in_context, timed
+from .redaction import Redactor
+from .models.parsed import ParsedDiff, ParsedFile
 from .models.schemas import (
     CommitMessage,
+    ConfigModel,
     DiffAnalysis,
+    GenerationResult,
+    GenerationStats,
     Language,
     CommitStyle,
     CommitType
 )
-from .utils import clean_diff, chunk_diff_by_files
+from .utils import (
+    clean_diff,
+    redact_sensitive,
+    estimate_tokens,
+    pack_diff,
+    group_diff_by_files,
+    truncate_subject,
+    validate_commit_message,
+    CHARS_PER_TOKEN,
+    MAX_DIFF_LENGTH
+)
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompt templates change so cached messages are not reused
+PROMPT_TEMPLATE_VERSION = 3
+
+# Tokens kept free in the context window to absorb estimation error
+PROMPT_TOKEN_MARGIN = 64
+
+# Excluded files listed by name in the prompt; the rest are only counted
+MAX_EXCLUDED_LISTED = 30
+
+# Fixed instructions sent as the system prompt. They must not depend on the
+# diff: the server only reuses the evaluated prompt prefix while it is identical.
+SYSTEM_PROMPTS = {
+    Language.ENGLISH: """You write Conventional Commits messages for code changes.
+
+REQUIRED FORMAT:
+type(scope): subject
+
+Subject must be descriptive and concise.
+
+Allowed types:
+- feat: new feature
+- fix: bug fix
+- docs: documentation changes
+- refactor: code refactoring
+- test: adding/updating tests
+- chore: maintenance, dependency updates, etc.
+
+Reply with the commit message only, no explanation.""",
+    Language.INDONESIAN: """Kamu menulis pesan commit dalam format Conventional Commits untuk perubahan kode.
+
+FORMAT WAJIB:
+type(scope): subject
+
+subject harus deskriptif dan singkat.
+
+Type yang boleh dipakai:
+- feat: fitur baru
+- fix: perbaikan bug
+- docs: perubahan dokumentasi
+- refactor: refactoring kode
+- test: menambah/mengubah test
+- chore: maintenance, update dependency, dll
+
+Balas hanya dengan pesan commit, tanpa penjelasan.""",
+}
+
+SUMMARY_SYSTEM_PROMPTS = {
+    Language.ENGLISH: """Summarize the code changes you are given in one or two short sentences.
+Focus on what changed and why.""",
+    Language.INDONESIAN: """Ringkas perubahan kode yang diberikan dalam satu atau dua kalimat singkat.
+Fokus pada apa yang berubah dan tujuannya.""",
+}
+
+# A usable first line: a known commit type, optional scope, colon and subject
+COMPLETE_SUBJECT_PATTERN = re.compile(
+    r'^(?:' + '|'.join(t.value for t in CommitType) + r')(?:\([^)]+\))?!?\s*:\s*\S'
+)
+
+
+def rank_candidates(
+    candidates: List[Tuple[str, CommitMessage]],
+    analysis: ParsedDiff
+) -> List[CommitMessage]:
+    """
+    Order alternative messages best first and drop duplicates
+
+    A candidate scores for a raw response that already was a valid
+    Conventional Commits line, a header that fits without truncate_subject
+    cutting it, a subject that is not trivially short, and agreeing with
+    the type and scope suggested by the diff analysis. Ties keep their
+    order; of duplicates (same type, scope and subject, ignoring case,
+    spacing and a trailing period) the best-ranked one is kept.
+
+    Args:
+        candidates: (raw response, parsed message) pairs
+        analysis: Diff analysis result
+
+    Returns:
+        Distinct messages, best first
+    """
+    def score(candidate: Tuple[str, CommitMessage]) -> float:
+        response, message = candidate
+        value = 0.0
+        if validate_commit_message(response.strip().split('\n', 1)[0].strip()):
+            value += 3
+        header = message.format_conventional().split('\n', 1)[0]
+        if truncate_subject(header) != header:
+            value -= 2
+        elif len(message.subject.strip()) < 10:
+            value -= 1
+        if analysis.suggested_type and message.type == analysis.suggested_type:
+            value += 1
+        scope = (message.scope or '').lower()
+        if analysis.suggested_scope and scope == analysis.suggested_scope.lower():
+            value += 0.5
+        return value
+
+    ranked = []
+    seen = set()
+    for _, message in sorted(candidates, key=score, reverse=True):
+        identity = (
+            message.type,
+            (message.scope or '').lower(),
+            ' '.join(message.subject.lower().split()).rstrip('.')
+        )
+        if identity not in seen:
+            seen.add(identity)
+            ranked.append(message)
+    return ranked
+
+
+class _GenerationPlan(NamedTuple):
+    """Everything decided about a request before any model call"""
+    analysis: ParsedDiff
+    files: List[ParsedFile]
+    packed_diff: str
+    omitted: List[str]
+    summarize: bool
+    cache_key: Optional[str]
+
+
+class _SummaryUnit(NamedTuple):
+    """Files summarized together; with a key, their summary lines are cached as one entry"""
+    paths: List[str]
+    key: Optional[str]
+    cached: Optional[str]  # Summary lines found in the cache
+    groups: List[Tuple[List[str], str]]  # (paths, diff text) to summarize otherwise
+
 
 class CommitMessageGenerator:
     """
@@ -26,7 +178,18 @@ class CommitMessageGenerator:
     def __init__(
         self,
         ollama_client: Optional[OllamaClient] = None,
-        language: Language = Language.INDONESIAN
+        language: Language = Language.INDONESIAN,
+        cache: Optional[MessageCache] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        summarize_large_diffs: bool = True,
+        summary_concurrency: int = 4,
+        summary_chunk_chars: int = 4000,
+        summary_max_chunks: int = 16,
+        summary_max_tokens: int = 120,
+        async_client: Optional[AsyncOllamaClient] = None,
+        redactor: Optional[Redactor] = None,
+        deadline: Optional[float] = None
     ):
         """
         Initialize commit message generator
@@ -34,15 +197,106 @@ class CommitMessageGenerator:
         Args:
             ollama_client: Ollama client instance
             language: Output language (Indonesian or English)
+            cache: Cache of previously generated messages (optional)
+            temperature: Sampling temperature
+            max_tokens: Token budget for the commit message
+            summarize_large_diffs: Summarize diffs that do not fit in one prompt
+                part by part (map) and write the message from the summaries (reduce)
+            summary_concurrency: Maximum parallel summary requests
+            summary_chunk_chars: Diff characters per summary request
+            summary_max_chunks: Maximum summary requests per message
+            summary_max_tokens: Token budget for each summary
+            async_client: Client used by agenerate (default: created from
+                ollama_client's settings on first use)
+            redactor: Secret redaction applied to every diff sent to the
+                model (default: the built-in rules)
+            deadline: Seconds generate() waits for the model before
+                returning the heuristic message (None waits as long as it takes)
         """
         self.client = ollama_client or OllamaClient()
         self.language = language
+        self.cache = cache
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.summarize_large_diffs = summarize_large_diffs
+        self.summary_concurrency = max(1, summary_concurrency)
+        self.summary_chunk_chars = summary_chunk_chars
+        self.summary_max_chunks = summary_max_chunks
+        self.summary_max_tokens = summary_max_tokens
+        self._async_client = async_client
+        self.redactor = redactor
+        self.deadline = deadline
 
+    @classmethod
+    def from_config(
+        cls,
+        config: ConfigModel,
+        ollama_client: Optional[OllamaClient] = None,
+        cache: Optional[MessageCache] = None
+    ) -> "CommitMessageGenerator":
+        """
+        Create generator from configuration
+
+        Args:
+            config: ConfigModel object
+            ollama_client: Ollama client instance (default: created from config)
+            cache: Cache of previously generated messages (optional)
+
+        Returns:
+            CommitMessageGenerator instance
+        """
+        return cls(
+            ollama_client=ollama_client or OllamaClient.from_config(config),
+            language=config.language,
+            cache=cache,
+            temperature=config.ollama_temperature,
+            summarize_large_diffs=config.summarize_large_diffs,
+            summary_concurrency=config.summary_concurrency,
+            summary_chunk_chars=config.summary_chunk_chars,
+            summary_max_chunks=config.summary_max_chunks,
+            summary_max_tokens=config.summary_max_tokens,
+            redactor=Redactor.from_config(config),
+            deadline=config.deadline
+        )
+
+    @property
+    def read_limit(self) -> int:
+        """Characters of diff this generator can make use of"""
+        # Reading more than fits lets the packer choose the most useful hunks
+        limit = max(MAX_DIFF_LENGTH, self.client.num_ctx * CHARS_PER_TOKEN)
+        if self.summarize_large_diffs:
+            return max(limit, self.summary_chunk_chars * self.summary_max_chunks)
+        return limit
+
+    def diff_token_budget(self, analysis: ParsedDiff) -> int:
+        """
+        Tokens left for the diff in the commit message prompt
+
+        The context window minus the system prompt, the prompt template, the
+        response and a safety margin.
+
+        Args:
+            analysis: Diff analysis result
+
+        Returns:
+            Token budget for the diff
+        """
+        template_tokens = (
+            estimate_tokens(self._system_prompt())
+            + estimate_tokens(self._build_prompt("", analysis))
+        )
+        budget = self.client.num_ctx - template_tokens - self.max_tokens - PROMPT_TOKEN_MARGIN
+        return max(budget, 0)
+
+    @timed("generate")
     def generate(
         self,
         diff: str,
-        analysis: Optional[DiffAnalysis] = None,
-        style: CommitStyle = CommitStyle.CONVENTIONAL
+        analysis: Optional[ParsedDiff] = None,
+        style: CommitStyle = CommitStyle.CONVENTIONAL,
+        on_token: Optional[Callable[[str], None]] = None,
+        deadline: Optional[float] = None,
+        on_upgrade: Optional[Callable[[Optional[CommitMessage]], None]] = None
     ) -> CommitMessage:
         """
         Generate commit message from diff
@@ -51,55 +305,761 @@ class CommitMessageGenerator:
             diff: Git diff string
             analysis: Diff analysis result (optional, will be generated if not provided)
             style: Commit message style
+            on_token: If given, the response is streamed and this callback is
+                called with the text received so far after every chunk
+            deadline: Seconds to wait for the model before returning the
+                heuristic message (default: the generator's deadline)
+            on_upgrade: With a deadline, called once the model is done if the
+                heuristic message was returned: with the model's message if it
+                arrived late, or None if the model failed
 
         Returns:
             CommitMessage object
         """
-        if not diff:
-            raise ValueError("Diff cannot be empty")
+        plan = self._plan(diff, analysis, style)
+        analysis = plan.analysis
 
-        # Analyze diff if not provided
-        if not analysis:
-            analyzer = DiffAnalyzer()
-            analysis = analyzer.analyze_diff(diff)
+        cached = self._cached(plan)
+        if cached:
+            if on_token:
+                on_token(cached.format_conventional())
+            return cached
 
-        # Clean and chunk diff for better model performance
-        cleaned_diff = clean_diff(diff)
-        if analysis.stats.files_changed > 5:
-            cleaned_diff = chunk_diff_by_files(cleaned_diff, max_files=5)
-            logger.info(f"Chunked diff from {len(diff)} to {len(cleaned_diff)} characters")
+        if deadline is None:
+            deadline = self.deadline
+        if deadline is not None:
+            return self._generate_within(deadline, diff, plan, on_token, on_upgrade)
 
-        # Generate prompt based on language
-        prompt = self._build_prompt(cleaned_diff, analysis)
+        try:
+            return self._generate_with_model(diff, plan, on_token)
+        except Exception as e:
+            logger.error(f"Failed to generate commit message: {e}")
+            # Fallback to basic message
+            logger.info("Using fallback message")
+            return self._create_fallback_message(analysis)
+
+    def _generate_with_model(
+        self,
+        diff: str,
+        plan: "_GenerationPlan",
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> CommitMessage:
+        """
+        Generate the message with Qwen3:4B (summarizing first if planned)
+
+        Raises:
+            Exception: If a request to the model fails
+        """
+        prompt = self._generation_prompt(diff, plan)
+
+        if on_token:
+            result = self._generate_streaming(prompt, on_token, system=self._system_prompt())
+        else:
+            result = self.client.generate_result(
+                prompt=prompt,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                system=self._system_prompt()
+            )
+
+        return self._finish(result, plan)
+
+    def _generation_prompt(self, diff: str, plan: "_GenerationPlan") -> str:
+        """
+        Commit message prompt: the packed diff, or summaries of its parts if planned
+
+        Raises:
+            Exception: If a summary request fails in a way that is not absorbed
+        """
+        if plan.summarize:
+            split = self._split_for_summaries(diff, plan)
+            if split:
+                units, omitted = split
+                groups = [group for unit in units for group in unit.groups]
+                logger.info(
+                    f"Summarizing {len(groups)} part(s) of the diff, "
+                    f"{self.summary_concurrency} at a time"
+                )
+                summaries = self._collect_summaries(units, self._summarize_groups(groups))
+                return self._build_reduce_prompt(summaries, omitted, plan.analysis)
+
+        return self._build_packed_prompt(plan)
+
+    @timed("generate")
+    def generate_candidates(
+        self,
+        diff: str,
+        analysis: Optional[ParsedDiff] = None,
+        style: CommitStyle = CommitStyle.CONVENTIONAL,
+        count: int = 3
+    ) -> List[CommitMessage]:
+        """
+        Generate several alternative commit messages at once
+
+        The prompt is built once (summarizing first if needed) and count
+        completions with different sampling seeds are requested
+        concurrently, so choosing between alternatives costs about one
+        request instead of one per "regenerate". Candidates are ranked
+        locally with rank_candidates and duplicates are dropped, so fewer
+        than count may be returned. Candidates are not cached.
+
+        Args:
+            diff: Git diff string
+            analysis: Diff analysis result (optional, will be generated if not provided)
+            style: Commit message style
+            count: Number of completions to request
+
+        Returns:
+            CommitMessage objects, best first; just the fallback message if
+            every request failed
+        """
+        plan = self._plan(diff, analysis, style)
+        analysis = plan.analysis
 
-        # Generate using Qwen3:4B
         try:
-            response = self.client.generate(
+            prompt = self._generation_prompt(diff, plan)
+        except Exception as e:
+            logger.error(f"Failed to generate commit message: {e}")
+            logger.info("Using fallback message")
+            return [self._create_fallback_message(analysis)]
+
+        def request(seed: int) -> GenerationResult:
+            return self.client.generate_result(
                 prompt=prompt,
-                temperature=0.7,
-                max_tokens=500
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                system=self._system_prompt(),
+                seed=seed
             )
 
-            # If response is empty, use fallback based on analysis
-            if not response or response.strip() == "":
-                logger.warning("Empty response from LLM, using fallback")
-                commit_msg = self._create_fallback_message(analysis)
-            else:
-                # Parse response
-                commit_msg = self._parse_response(response, analysis)
+        base_seed = random.randrange(2 ** 31)
+        responses = []
+        with ThreadPoolExecutor(max_workers=max(1, count)) as executor:
+            futures = [
+                executor.submit(in_context(request), base_seed + index) for index in range(count)
+            ]
+            for future in futures:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Candidate request failed: {e}")
+                    continue
+                if result.text:
+                    responses.append((result.text, self._parse_result(result, analysis)))
+
+        logger.info(f"Got {len(responses)} of {count} candidate(s)")
+        ranked = rank_candidates(responses, analysis)
+        return ranked or [self._create_fallback_message(analysis)]
 
-            return commit_msg
+    def _generate_within(
+        self,
+        deadline: float,
+        diff: str,
+        plan: "_GenerationPlan",
+        on_token: Optional[Callable[[str], None]],
+        on_upgrade: Optional[Callable[[Optional[CommitMessage]], None]]
+    ) -> CommitMessage:
+        """
+        Race the model against a deadline, with the heuristic message ready
+
+        The heuristic message is built up front and the model runs in a
+        worker thread. If the model has not answered when the deadline
+        passes, the heuristic message is returned right away; the worker
+        keeps going, caches its message when it finishes and hands it to
+        on_upgrade (from the worker thread). The worker is a daemon thread,
+        so a caller that exits does not wait for it; the late message is
+        then lost rather than cached.
+        """
+        fallback = self._create_fallback_message(plan.analysis)
+        expired = threading.Event()
+        future: Future = Future()
+
+        def forward(text: str):
+            # The caller stopped displaying tokens once it got the heuristic message
+            if not expired.is_set():
+                on_token(text)
+
+        def run():
+            try:
+                future.set_result(
+                    self._generate_with_model(diff, plan, forward if on_token else None)
+                )
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=in_context(run), name="commit-message-model", daemon=True).start()
+
+        try:
+            message = future.result(timeout=max(deadline, 0.0))
+        except FutureTimeoutError:
+            expired.set()
+            logger.info(
+                f"No message from the model within {deadline:g}s, using the heuristic message"
+            )
+            if on_upgrade:
+                future.add_done_callback(lambda done: self._upgrade(done, on_upgrade))
+            return fallback
+        except Exception as e:
+            logger.error(f"Failed to generate commit message: {e}")
+            logger.info("Using fallback message")
+            message = fallback
+
+        if message.heuristic and on_upgrade:
+            # In time, but failed or empty: nothing better is coming
+            on_upgrade(None)
+        return message
+
+    @staticmethod
+    def _upgrade(done: Future, on_upgrade: Callable[[Optional[CommitMessage]], None]):
+        """Pass the model's late message to on_upgrade (None if it failed)"""
+        message = None
+        if done.exception() is not None:
+            logger.error(f"Failed to generate commit message: {done.exception()}")
+        elif not done.result().heuristic:
+            message = done.result()
+            logger.info("The model's message arrived after the deadline")
+
+        try:
+            on_upgrade(message)
+        except Exception as e:
+            logger.error(f"Upgrade callback failed: {e}")
+
+    async def agenerate(
+        self,
+        diff: str,
+        analysis: Optional[ParsedDiff] = None,
+        style: CommitStyle = CommitStyle.CONVENTIONAL
+    ) -> CommitMessage:
+        """
+        Generate commit message from diff without blocking the event loop
+
+        Same as generate(), but requests go through the AsyncOllamaClient, so
+        many messages (and the summaries of large diffs) can be generated
+        concurrently; the client's semaphore bounds in-flight requests.
+
+        Args:
+            diff: Git diff string
+            analysis: Diff analysis result (optional, will be generated if not provided)
+            style: Commit message style
+
+        Returns:
+            CommitMessage object
+        """
+        plan = self._plan(diff, analysis, style)
+        analysis = plan.analysis
+
+        cached = self._cached(plan)
+        if cached:
+            return cached
+
+        try:
+            client = self.async_client
+            prompt = None
+            if plan.summarize:
+                split = self._split_for_summaries(diff, plan)
+                if split:
+                    units, omitted = split
+                    groups = [group for unit in units for group in unit.groups]
+                    logger.info(
+                        f"Summarizing {len(groups)} part(s) of the diff, "
+                        f"{self.summary_concurrency} at a time"
+                    )
+                    semaphore = asyncio.Semaphore(self.summary_concurrency)
+
+                    async def summarize(group: Tuple[List[str], str]) -> str:
+                        async with semaphore:
+                            return await client.generate(
+                                prompt=self._build_group_summary_prompt(group),
+                                temperature=self.temperature,
+                                max_tokens=self.summary_max_tokens,
+                                system=self._summary_system_prompt()
+                            )
+
+                    results = await asyncio.gather(
+                        *(summarize(group) for group in groups),
+                        return_exceptions=True
+                    )
+                    summaries = self._collect_summaries(units, results)
+                    prompt = self._build_reduce_prompt(summaries, omitted, analysis)
+
+            if prompt is None:
+                prompt = self._build_packed_prompt(plan)
+
+            result = await client.generate_result(
+                prompt=prompt,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                system=self._system_prompt()
+            )
+
+            return self._finish(result, plan)
 
         except Exception as e:
             logger.error(f"Failed to generate commit message: {e}")
-            # Fallback to basic message
             logger.info("Using fallback message")
             return self._create_fallback_message(analysis)
 
-    def _build_prompt(self, diff: str, analysis: DiffAnalysis) -> str:
+    def refine(
+        self,
+        previous: CommitMessage,
+        diff: str,
+        analysis: Optional[ParsedDiff] = None,
+        style: CommitStyle = CommitStyle.CONVENTIONAL,
+        instruction: Optional[str] = None
+    ) -> CommitMessage:
+        """
+        Generate another message for the same changes
+
+        Continues the request that produced `previous` through its returned
+        context, so the server does not evaluate the diff again; only the
+        short follow-up is new. Without a context (cached or early-stopped
+        messages) the whole conversation is sent as one prompt instead.
+        Refined messages are not cached.
+
+        Args:
+            previous: Message to replace
+            diff: Git diff string the message was generated from
+            analysis: Diff analysis result (optional, will be generated if not provided)
+            style: Commit message style
+            instruction: What to change, e.g. "mention the config migration"
+
+        Returns:
+            New CommitMessage object, or previous if generation fails
+        """
+        plan = self._plan(diff, analysis, style)
+        follow_up = self._build_refine_prompt(instruction)
+
+        try:
+            if previous.context:
+                # The context already holds the system prompt of the first request
+                result = self.client.generate_result(
+                    prompt=follow_up,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                    context=previous.context
+                )
+            else:
+                prompt = (
+                    f"{self._build_packed_prompt(plan)}\n"
+                    f"{previous.format_conventional()}\n\n{follow_up}"
+                )
+                result = self.client.generate_result(
+                    prompt=prompt,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                    system=self._system_prompt()
+                )
+        except Exception as e:
+            logger.error(f"Failed to refine commit message: {e}")
+            return previous
+
+        if not result.text:
+            logger.warning("Empty response from LLM, keeping the previous message")
+            return previous
+
+        return self._parse_result(result, plan.analysis)
+
+    @property
+    def async_client(self) -> AsyncOllamaClient:
+        """Async client used by agenerate, created with the sync client's settings on first use"""
+        if self._async_client is None:
+            self._async_client = AsyncOllamaClient(
+                host=self.client.host,
+                model=self.client.model,
+                timeout=self.client.timeout,
+                pool_size=self.client.pool_size,
+                pool_idle_timeout=self.client.pool_idle_timeout,
+                num_ctx=self.client.num_ctx,
+                keep_alive=self.client.keep_alive,
+                hosts=self.client.hosts,
+                failure_threshold=self.client.pool.failure_threshold,
+                circuit_reset=self.client.pool.reset_timeout,
+                retries=self.client.retries,
+                retry_backoff=self.client.retry_backoff,
+                retry_backoff_max=self.client.retry_backoff_max
+            )
+        return self._async_client
+
+    @timed("plan")
+    def _plan(
+        self,
+        diff: str,
+        analysis: Optional[ParsedDiff],
+        style: CommitStyle
+    ) -> "_GenerationPlan":
+        """Analyze and pack the diff and decide how the message will be generated"""
+        if not diff:
+            raise ValueError("Diff cannot be empty")
+
+        # Analyze diff if not provided
+        if not analysis:
+            analyzer = DiffAnalyzer()
+            analysis = analyzer._analyze_diff(diff)
+        elif isinstance(analysis, DiffAnalysis):
+            analysis = ParsedDiff.from_model(analysis)
+
+        # Pack the most informative hunks into the context window
+        files = self._files_for(diff, analysis)
+        budget = self.diff_token_budget(analysis)
+        packed_diff, omitted = pack_diff(diff, files, budget)
+        dropped = omitted or len(packed_diff) < sum(file.end - file.start for file in files)
+        summarize = self.summarize_large_diffs and bool(dropped)
+        if dropped:
+            logger.info(
+                f"Packed diff from {len(diff)} to {len(packed_diff)} characters "
+                f"({budget} token budget)"
+            )
+
+        cache_key = None
+        if self.cache:
+            # Summaries cover the whole diff, not just the packed part
+            content = diff if summarize else packed_diff
+            if isinstance(content, MappedDiff):
+                content = content.fingerprint()
+            # The excluded files are part of the prompt, not of the diff
+            content += self._excluded_section(analysis)
+            cache_key = MessageCache.make_key(
+                content,
+                model=self.client.model,
+                language=self.language.value,
+                style=style.value,
+                temperature=self.temperature,
+                template_version=PROMPT_TEMPLATE_VERSION,
+                mode="map-reduce" if summarize else "single"
+            )
+
+        return _GenerationPlan(analysis, files, packed_diff, omitted, summarize, cache_key)
+
+    @timed("cache.lookup")
+    def _cached(self, plan: "_GenerationPlan") -> Optional[CommitMessage]:
+        """Cached message for the planned request, if any"""
+        if not plan.cache_key:
+            return None
+
+        cached = self.cache.get(plan.cache_key)
+        if cached:
+            logger.info("Using cached commit message")
+        return cached
+
+    @timed("build_prompt")
+    def _build_packed_prompt(self, plan: "_GenerationPlan") -> str:
+        """Commit message prompt with the packed diff"""
+        cleaned_diff = redact_sensitive(plan.packed_diff, self.redactor)
+        if plan.omitted:
+            cleaned_diff += f"\n... ({len(plan.omitted)} more files omitted for brevity)"
+
+        # Generate prompt based on language
+        return self._build_prompt(cleaned_diff, plan.analysis)
+
+    @timed("parse")
+    def _finish(self, result: GenerationResult, plan: "_GenerationPlan") -> CommitMessage:
+        """Parse the model response and cache the result"""
+        # If response is empty, use fallback based on analysis
+        if not result.text or result.text.strip() == "":
+            logger.warning("Empty response from LLM, using fallback")
+            return self._create_fallback_message(plan.analysis)
+
+        # Parse response
+        commit_msg = self._parse_result(result, plan.analysis)
+        if plan.cache_key:
+            self.cache.put(plan.cache_key, commit_msg)
+        return commit_msg
+
+    def _parse_result(self, result: GenerationResult, analysis: ParsedDiff) -> CommitMessage:
+        """Parse a generation result, keeping its stats and context for follow-ups"""
+        commit_msg = self._parse_response(result.text, analysis)
+        commit_msg.stats = result.stats
+        commit_msg.context = result.context
+        return commit_msg
+
+    @staticmethod
+    def _files_for(diff: str, analysis: ParsedDiff) -> List[ParsedFile]:
+        """Parsed files of diff, reusing the analysis when it was made from the same text"""
+        if analysis.raw_diff == diff:
+            return analysis.files
+        return parse_diff(diff).files
+
+    def _split_for_summaries(
+        self,
+        diff: str,
+        plan: "_GenerationPlan"
+    ) -> Optional[Tuple[List[_SummaryUnit], List[str]]]:
+        """
+        Split a large diff into parts to summarize separately
+
+        Map: the diff is split into groups of files (or hunks of large files),
+        each summarized by its own request. Reduce: the summaries replace the
+        diff in the commit message prompt.
+
+        With a cache and staged blob ids, files are summarized one by one so
+        their summaries can be cached and reused while their blobs stay the
+        same; only new or changed files are sent to the model.
+
+        Args:
+            diff: Git diff string
+            plan: Generation plan
+
+        Returns:
+            Tuple of (units to summarize or reuse, paths of files left out),
+            or None if the diff is too small to split
+        """
+        split = self._split_by_file(diff, plan) if self.cache else None
+        if split is None:
+            groups, omitted = group_diff_by_files(
+                diff,
+                plan.files,
+                max_chars=self.summary_chunk_chars,
+                max_groups=self.summary_max_chunks
+            )
+            units = [_SummaryUnit(paths, None, None, [(paths, text)]) for paths, text in groups]
+        else:
+            units, omitted = split
+
+        if sum(len(unit.groups) or 1 for unit in units) < 2:
+            return None
+
+        # Files that were staged but never made it into the read diff
+        # (excluded files are listed with their stats instead)
+        summarized = {path for unit in units for path in unit.paths}
+        summarized.update(file.path for file in plan.analysis.excluded)
+        for path in plan.analysis.stats.files:
+            if path not in summarized and path not in omitted:
+                omitted.append(path)
+
+        return units, omitted
+
+    def _split_by_file(
+        self,
+        diff: str,
+        plan: "_GenerationPlan"
+    ) -> Optional[Tuple[List[_SummaryUnit], List[str]]]:
+        """
+        One cacheable unit per file, reusing cached summaries
+
+        Returns:
+            Tuple of (units, paths of files left out), or None if the files
+            have no blob ids or the uncached ones need more than
+            summary_max_chunks requests one by one
+        """
+        files = plan.files
+        if not files or not all(file.blob_id for file in files):
+            return None
+
+        keys = [
+            MessageCache.make_summary_key(
+                file.path,
+                file.old_path,
+                file.blob_id,
+                model=self.client.model,
+                language=self.language.value,
+                temperature=self.temperature,
+                template_version=PROMPT_TEMPLATE_VERSION,
+                chunk_chars=self.summary_chunk_chars
+            )
+            for file in files
+        ]
+        found = self.cache.get_summaries(keys)
+
+        units = []
+        requests = 0
+        for index, (file, key) in enumerate(zip(files, keys)):
+            if key in found:
+                units.append(_SummaryUnit([file.path], key, found[key], []))
+                continue
+
+            groups, _ = group_diff_by_files(
+                diff, [file], max_chars=self.summary_chunk_chars, max_groups=self.summary_max_chunks
+            )
+            requests += len(groups)
+            if requests > self.summary_max_chunks:
+                return None
+            # The last file of a truncated read is incomplete; its summary is not reusable
+            partial = plan.analysis.truncated and index == len(files) - 1
+            units.append(_SummaryUnit([file.path], None if partial else key, None, groups))
+
+        if found:
+            logger.info(f"Reusing cached summaries of {len(found)} of {len(files)} file(s)")
+        return units, []
+
+    @timed("summarize")
+    def _summarize_groups(self, groups: List[Tuple[List[str], str]]) -> List[object]:
+        """
+        Summarize diff groups concurrently, at most summary_concurrency at a time
+
+        Args:
+            groups: (paths, diff text) pairs
+
+        Returns:
+            One response (or the exception raised) per group, in input order
+        """
+        def summarize(group: Tuple[List[str], str]) -> str:
+            return self.client.generate(
+                prompt=self._build_group_summary_prompt(group),
+                temperature=self.temperature,
+                max_tokens=self.summary_max_tokens,
+                system=self._summary_system_prompt()
+            )
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.summary_concurrency) as executor:
+            futures = [executor.submit(in_context(summarize), group) for group in groups]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+
+        return results
+
+    def _collect_summaries(self, units: List[_SummaryUnit], results: List[object]) -> List[str]:
+        """
+        Summary lines of all units, caching those of newly summarized files
+
+        Args:
+            units: Units from _split_for_summaries
+            results: Responses (or exceptions) for the units' groups, in order
+
+        Returns:
+            "paths: summary" lines, in unit order
+        """
+        results = iter(results)
+        lines = []
+        fresh = {}
+        for unit in units:
+            if unit.cached is not None:
+                lines.extend(unit.cached.split("\n"))
+                continue
+
+            unit_results = [next(results) for _ in unit.groups]
+            unit_lines = [
+                self._format_summary(paths, result)
+                for (paths, _), result in zip(unit.groups, unit_results)
+            ]
+            lines.extend(unit_lines)
+            # Failed or empty summaries are retried next time
+            succeeded = all(isinstance(result, str) and result.strip() for result in unit_results)
+            if unit.key and succeeded:
+                fresh[unit.key] = "\n".join(unit_lines)
+
+        if fresh:
+            self.cache.put_summaries(fresh)
+        return lines
+
+    def _build_group_summary_prompt(self, group: Tuple[List[str], str]) -> str:
+        """Summary prompt for one (paths, diff text) group"""
+        paths, text = group
+        return self._build_summary_prompt(
+            clean_diff(text, max_length=self.summary_chunk_chars, redactor=self.redactor),
+            paths
+        )
+
+    @staticmethod
+    def _format_summary(paths: List[str], result) -> str:
+        """Summary line for one group; result is the response or the exception raised"""
+        if isinstance(result, BaseException):
+            logger.warning(f"Failed to summarize {', '.join(paths)}: {result}")
+            result = ""
+        summary = ' '.join(result.split())
+        return f"- {', '.join(paths)}: {summary or '-'}"
+
+    def _generate_streaming(
+        self,
+        prompt: str,
+        on_token: Callable[[str], None],
+        system: Optional[str] = None
+    ) -> GenerationResult:
+        """
+        Stream a completion, stopping as soon as the message is complete
+
+        Args:
+            prompt: Formatted prompt
+            on_token: Callback receiving the text generated so far
+            system: System prompt
+
+        Returns:
+            Generated text, with context and stats if the stream ran to the end
+        """
+        text = ""
+        final_chunk = {}
+        stream = self.client.generate_stream(
+            prompt=prompt,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            system=system
+        )
+
+        try:
+            for chunk in stream:
+                if chunk.get("done"):
+                    final_chunk = chunk
+
+                token = chunk.get("response", "")
+                if not token:
+                    continue
+
+                text += token
+                end = self._find_message_end(text)
+                if end is not None:
+                    text = text[:end]
+                    on_token(text)
+                    logger.info("Commit message complete, stopping generation early")
+                    break
+
+                on_token(text)
+        finally:
+            # Closes the HTTP response so the server stops generating
+            stream.close()
+
+        return GenerationResult(
+            text=text.strip(),
+            context=final_chunk.get("context"),
+            stats=GenerationStats.from_response(final_chunk)
+        )
+
+    @staticmethod
+    def _find_message_end(text: str) -> Optional[int]:
+        """
+        Find where a complete commit message ends in a partial response
+
+        A message is complete once it has a `type(scope): subject` line
+        followed by a body paragraph terminated by a blank line.
+
+        Args:
+            text: Text generated so far
+
+        Returns:
+            Index just past the body, or None if the message is not complete yet
+        """
+        start = len(text) - len(text.lstrip())
+        newline = text.find('\n', start)
+        if newline == -1 or not COMPLETE_SUBJECT_PATTERN.match(text[start:newline].strip()):
+            return None
+
+        body_start = newline + 1
+        while body_start < len(text) and text[body_start] in '\r\n':
+            body_start += 1
+
+        terminator = text.find('\n\n', body_start)
+        if body_start >= len(text) or terminator == -1:
+            return None
+
+        return terminator
+
+    def _system_prompt(self) -> str:
+        """System prompt of commit message requests"""
+        return SYSTEM_PROMPTS[self.language]
+
+    def _summary_system_prompt(self) -> str:
+        """System prompt of summary requests"""
+        return SUMMARY_SYSTEM_PROMPTS[self.language]
+
+    def _build_prompt(self, diff: str, analysis: ParsedDiff) -> str:
         """
         Build prompt for Qwen3:4B
 
+        Only the part that changes per commit; the instructions are sent
+        separately as the system prompt.
+
         Args:
             diff: Git diff string
             analysis: Diff analysis result
@@ -112,27 +1072,14 @@ class CommitMessageGenerator:
         else:
             return self._build_english_prompt(diff, analysis)
 
-    def _build_indonesian_prompt(self, diff: str, analysis: DiffAnalysis) -> str:
+    def _build_indonesian_prompt(self, diff: str, analysis: ParsedDiff) -> str:
         """Build prompt in Indonesian"""
-        prompt = f"""Buat pesan commit dalam format Conventional Commits untuk perubahan kode berikut:
-
-FORMAT WAJIB:
-type(scope): subject
-
-subject harus deskriptif dan singkat.
-
-Type yang boleh dipakai:
-- feat: fitur baru
-- fix: perbaikan bug
-- docs: perubahan dokumentasi
-- refactor: refactoring kode
-- test: menambah/mengubah test
-- chore: maintenance, update dependency, dll
+        prompt = f"""Buat pesan commit untuk perubahan kode berikut:
 
 Statistik:
 - File berubah: {analysis.stats.files_changed}
 - Insertions: +{analysis.stats.insertions}
-- Deletions: -{analysis.stats.deletions}
+- Deletions: -{analysis.stats.deletions}{self._excluded_section(analysis)}
 
 Diff:
 {diff}
@@ -141,27 +1088,14 @@ PESAN COMMIT (hanya output, tanpa penjelasan):"""
 
         return prompt
 
-    def _build_english_prompt(self, diff: str, analysis: DiffAnalysis) -> str:
+    def _build_english_prompt(self, diff: str, analysis: ParsedDiff) -> str:
         """Build prompt in English"""
-        prompt = f"""Create a Conventional Commits message for the following code changes:
-
-REQUIRED FORMAT:
-type(scope): subject
-
-Subject must be descriptive and concise.
-
-Allowed types:
-- feat: new feature
-- fix: bug fix
-- docs: documentation changes
-- refactor: code refactoring
-- test: adding/updating tests
-- chore: maintenance, dependency updates, etc.
+        prompt = f"""Create a commit message for the following code changes:
 
 Statistics:
 - Files changed: {analysis.stats.files_changed}
 - Insertions: +{analysis.stats.insertions}
-- Deletions: -{analysis.stats.deletions}
+- Deletions: -{analysis.stats.deletions}{self._excluded_section(analysis)}
 
 Diff:
 {diff}
@@ -170,7 +1104,136 @@ COMMIT MESSAGE (output only, no explanation):"""
 
         return prompt
 
-    def _parse_response(self, response: str, analysis: DiffAnalysis) -> CommitMessage:
+    def _excluded_section(self, analysis: ParsedDiff) -> str:
+        """
+        Prompt lines listing the files whose patch was left out, with their line counts
+
+        Args:
+            analysis: Diff analysis result
+
+        Returns:
+            Section to append to the statistics, or "" if no file was left out
+        """
+        if not analysis.excluded:
+            return ""
+        lines = [
+            f"- {file.path}"
+            + (" (binary)" if file.binary else f" (+{file.insertions} -{file.deletions})")
+            for file in analysis.excluded[:MAX_EXCLUDED_LISTED]
+        ]
+        if len(analysis.excluded) > MAX_EXCLUDED_LISTED:
+            lines.append(f"- ... (+{len(analysis.excluded) - MAX_EXCLUDED_LISTED})")
+        if self.language == Language.INDONESIAN:
+            heading = "File lock, generated dan vendored (diff tidak ditampilkan):"
+        else:
+            heading = "Lock, generated and vendored files (diff not shown):"
+        return "\n\n" + heading + "\n" + "\n".join(lines)
+
+    def _build_summary_prompt(self, diff: str, paths: List[str]) -> str:
+        """
+        Build prompt summarizing one part of a large diff (map stage)
+
+        Args:
+            diff: Part of the git diff
+            paths: Files in this part
+
+        Returns:
+            Formatted prompt
+        """
+        if self.language == Language.INDONESIAN:
+            return f"""File: {', '.join(paths)}
+
+Diff:
+{diff}
+
+RINGKASAN (hanya output, tanpa penjelasan):"""
+
+        return f"""Files: {', '.join(paths)}
+
+Diff:
+{diff}
+
+SUMMARY (output only, no explanation):"""
+
+    def _build_reduce_prompt(
+        self,
+        summaries: List[str],
+        omitted: List[str],
+        analysis: ParsedDiff
+    ) -> str:
+        """
+        Build commit message prompt from per-part summaries (reduce stage)
+
+        Args:
+            summaries: Summary line per diff part
+            omitted: Changed files that were not summarized
+            analysis: Diff analysis result
+
+        Returns:
+            Formatted prompt
+        """
+        summary_text = '\n'.join(summaries)
+        if omitted:
+            shown = ', '.join(omitted[:50])
+            more = f" (+{len(omitted) - 50})" if len(omitted) > 50 else ""
+            if self.language == Language.INDONESIAN:
+                summary_text += f"\n- File lain yang berubah: {shown}{more}"
+            else:
+                summary_text += f"\n- Other changed files: {shown}{more}"
+
+        if self.language == Language.INDONESIAN:
+            return f"""Buat pesan commit untuk perubahan kode berikut.
+Diff terlalu besar, jadi berikut ringkasan per bagian; subject harus mencakup perubahan utama.
+
+Statistik:
+- File berubah: {analysis.stats.files_changed}
+- Insertions: +{analysis.stats.insertions}
+- Deletions: -{analysis.stats.deletions}{self._excluded_section(analysis)}
+
+Ringkasan perubahan:
+{summary_text}
+
+PESAN COMMIT (hanya output, tanpa penjelasan):"""
+
+        return f"""Create a commit message for the following code changes.
+The diff is too large to show, so here are summaries of each part; the subject should cover the main change.
+
+Statistics:
+- Files changed: {analysis.stats.files_changed}
+- Insertions: +{analysis.stats.insertions}
+- Deletions: -{analysis.stats.deletions}{self._excluded_section(analysis)}
+
+Change summaries:
+{summary_text}
+
+COMMIT MESSAGE (output only, no explanation):"""
+
+    def _build_refine_prompt(self, instruction: Optional[str]) -> str:
+        """
+        Build follow-up prompt asking for another message (see refine())
+
+        Args:
+            instruction: What to change (optional)
+
+        Returns:
+            Formatted prompt
+        """
+        if self.language == Language.INDONESIAN:
+            request = "Tulis pesan commit lain untuk perubahan yang sama."
+            if instruction:
+                request += f" {instruction}"
+            return f"""{request}
+
+PESAN COMMIT (hanya output, tanpa penjelasan):"""
+
+        request = "Write a different commit message for the same changes."
+        if instruction:
+            request += f" {instruction}"
+        return f"""{request}
+
+COMMIT MESSAGE (output only, no explanation):"""
+
+    def _parse_response(self, response: str, analysis: ParsedDiff) -> CommitMessage:
         """
         Parse Qwen3:4B response into CommitMessage
 
@@ -232,7 +1295,7 @@ COMMIT MESSAGE (output only, no explanation):"""
         self.language = language
         logger.info(f"Language set to {language.value}")
 
-    def _create_fallback_message(self, analysis: DiffAnalysis) -> CommitMessage:
+    def _create_fallback_message(self, analysis: ParsedDiff) -> CommitMessage:
         """
         Create fallback commit message based on diff analysis
 
@@ -283,5 +1346,6 @@ COMMIT MESSAGE (output only, no explanation):"""
             type=commit_type,
             scope=scope,
             subject=subject,
-            body=body
+            body=body,
+            heuristic=True
         )
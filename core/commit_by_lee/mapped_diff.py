@@ -0,0 +1,187 @@
+"""Diffs spilled to a temporary file and memory-mapped"""
+
+import hashlib
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bytes copied from git's output to the spill file at a time
+SPILL_CHUNK_SIZE = 1024 * 1024
+
+# Bytes searched, counted or hashed per step, so no step copies more than this
+WINDOW_SIZE = 1024 * 1024
+
+# Bytes read through the mapping after which its pages are dropped from this
+# process (they stay in the page cache and fault back in if needed again)
+RESIDENT_LIMIT = 32 * 1024 * 1024
+
+
+class MappedDiff:
+    """
+    Read-only diff text backed by a memory-mapped temporary file
+
+    Stands in for the diff string where the whole diff would otherwise have
+    to live in memory: it supports the few str operations the parser and
+    the packer use (len, find, count, startswith and slicing), with offsets
+    in bytes. Only slices are decoded (UTF-8, invalid bytes replaced), so
+    the Python heap stays flat however large the diff is. Long scans run in
+    windows, and pages read through the mapping are released every
+    RESIDENT_LIMIT bytes, so they do not pile up in the resident set either.
+
+    The temporary file is unlinked as soon as it is created. The mapping is
+    released by close() or when the object is garbage collected.
+    """
+
+    def __init__(self, file: BinaryIO):
+        """
+        Map a file
+
+        Args:
+            file: Binary file opened for reading; owned by the MappedDiff from now on
+        """
+        self._file = file
+        self._size = os.fstat(file.fileno()).st_size
+        # Empty files cannot be mapped
+        self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else None
+        self._resident = 0
+
+    @classmethod
+    def from_stream(cls, stream: BinaryIO, directory: Optional[str] = None) -> "MappedDiff":
+        """
+        Copy a binary stream (e.g. git's stdout) to a temporary file and map it
+
+        Args:
+            stream: Stream to read to its end
+            directory: Directory for the temporary file (default: the system's)
+
+        Returns:
+            MappedDiff of the stream's contents
+        """
+        file = tempfile.TemporaryFile(prefix="commit-by-lee-", suffix=".diff", dir=directory)
+        try:
+            shutil.copyfileobj(stream, file, SPILL_CHUNK_SIZE)
+            file.flush()
+            diff = cls(file)
+        except BaseException:
+            file.close()
+            raise
+        logger.debug(f"Spilled {diff._size} bytes of diff to a temporary file")
+        return diff
+
+    @classmethod
+    def join(cls, parts: List["MappedDiff"], directory: Optional[str] = None) -> "MappedDiff":
+        """
+        Concatenate mapped diffs into a new temporary file and map it
+
+        Args:
+            parts: Diffs to copy, in order; they stay open
+            directory: Directory for the temporary file (default: the system's)
+
+        Returns:
+            MappedDiff of the concatenated contents (part offsets shift by
+            the sizes of the parts before them)
+        """
+        file = tempfile.TemporaryFile(prefix="commit-by-lee-", suffix=".diff", dir=directory)
+        try:
+            for part in parts:
+                if part._map is None:
+                    continue
+                view = memoryview(part._map)
+                try:
+                    for window in range(0, part._size, WINDOW_SIZE):
+                        file.write(view[window : window + WINDOW_SIZE])
+                        part._read(WINDOW_SIZE)
+                finally:
+                    view.release()
+            file.flush()
+            return cls(file)
+        except BaseException:
+            file.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: slice) -> str:
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("MappedDiff only supports contiguous slices")
+        start, stop, _ = key.indices(self._size)
+        if self._map is None or start >= stop:
+            return ""
+        self._read(stop - start)
+        return self._map[start:stop].decode("utf-8", errors="replace")
+
+    def __str__(self) -> str:
+        """The whole diff, decoded; only for the serialization boundary"""
+        return self[:]
+
+    def find(self, sub: str, start: int = 0, end: Optional[int] = None) -> int:
+        if self._map is None:
+            return -1
+        needle = sub.encode("utf-8")
+        end = self._size if end is None else min(end, self._size)
+        for window in range(start, end, WINDOW_SIZE):
+            # Matches may run past the window, not past end
+            stop = min(window + WINDOW_SIZE + len(needle) - 1, end)
+            found = self._map.find(needle, window, stop)
+            self._read(stop - window)
+            if found != -1:
+                return found
+        return -1
+
+    def count(self, sub: str, start: int = 0, end: Optional[int] = None) -> int:
+        if self._map is None:
+            return 0
+        needle = sub.encode("utf-8")
+        end = self._size if end is None else min(end, self._size)
+        total = 0
+        for window in range(start, end, WINDOW_SIZE):
+            stop = min(window + WINDOW_SIZE, end)
+            # Matches are counted in the window they start in
+            total += self._map[window : min(stop + len(needle) - 1, end)].count(needle)
+            self._read(stop - window)
+        return total
+
+    def startswith(self, prefix: str, start: int = 0) -> bool:
+        if self._map is None:
+            return not prefix
+        data = prefix.encode("utf-8")
+        return self._map[start : start + len(data)] == data
+
+    def _read(self, size: int):
+        """Account for bytes read through the mapping, releasing its pages past RESIDENT_LIMIT"""
+        self._resident += size
+        if self._resident > RESIDENT_LIMIT and hasattr(mmap, "MADV_DONTNEED"):
+            self._map.madvise(mmap.MADV_DONTNEED)
+            self._resident = 0
+
+    def fingerprint(self) -> str:
+        """SHA-256 hex digest of the contents, computed without copying them"""
+        digest = hashlib.sha256()
+        if self._map is not None:
+            view = memoryview(self._map)
+            try:
+                for window in range(0, self._size, WINDOW_SIZE):
+                    digest.update(view[window : window + WINDOW_SIZE])
+                    self._read(WINDOW_SIZE)
+            finally:
+                view.release()
+        return digest.hexdigest()
+
+    def close(self):
+        """Release the mapping and the temporary file"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> "MappedDiff":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,9 +1,11 @@
 """Data models for Commit by Lee"""
 
 from .schemas import CommitMessage, DiffAnalysis, ConfigModel
+from .parsed import ParsedDiff
 
 __all__ = [
     "CommitMessage",
     "DiffAnalysis",
     "ConfigModel",
+    "ParsedDiff",
 ]
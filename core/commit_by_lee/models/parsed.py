@@ -0,0 +1,242 @@
+"""
+Compact internal model of analyzed diffs
+
+The parser, analyzer, packer and generator pass these slotted dataclasses
+around instead of the pydantic schemas: nothing is validated or copied on
+the way, and all text stays in the one diff string (the buffer) that files
+and hunks only hold offsets into. Hunk headers, for instance, are sliced
+from the buffer when needed rather than stored. For a large diff this
+roughly halves the memory of the parse results.
+
+The pydantic models in schemas.py remain the serialization format;
+to_model() builds them at the boundary, and from_model() accepts them from
+callers that construct analyses themselves.
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+from ..mapped_diff import MappedDiff
+from .schemas import CommitType, DiffAnalysis, DiffHunk, DiffStats, FileDiff, FileStatus
+
+
+@dataclass(slots=True)
+class Hunk:
+    """Single @@ hunk of a file diff, as offsets into the buffer"""
+
+    start: int  # Offset of the @@ line
+    end: int
+    old_start: int
+    old_lines: int
+    new_start: int
+    new_lines: int
+    insertions: int
+    deletions: int
+
+    def header(self, buffer: str) -> str:
+        """The @@ line of this hunk"""
+        line_end = buffer.find("\n", self.start, self.end)
+        return buffer[self.start : line_end if line_end != -1 else self.end].rstrip("\r")
+
+    def to_model(self, buffer: str) -> DiffHunk:
+        return DiffHunk(
+            self.header(buffer),
+            self.old_start,
+            self.old_lines,
+            self.new_start,
+            self.new_lines,
+            self.insertions,
+            self.deletions,
+            self.start,
+            self.end,
+        )
+
+
+@dataclass(slots=True)
+class ParsedFile:
+    """Per-file section of a diff, as offsets into the buffer"""
+
+    path: str
+    old_path: Optional[str] = None
+    status: FileStatus = FileStatus.MODIFIED
+    binary: bool = False
+    insertions: int = 0
+    deletions: int = 0
+    hunks: List[Hunk] = field(default_factory=list)
+    start: int = 0  # Offset of the "diff --git" line
+    end: int = 0
+    # Staged modes and blob hashes ("<old mode> <new mode> <old blob> <new blob>"
+    # from git diff --raw); identifies the file's change for incremental reuse
+    blob_id: Optional[str] = None
+
+    def shifted(self, offset: int) -> "ParsedFile":
+        """Copy with all offsets moved by offset characters"""
+        return replace(
+            self,
+            start=self.start + offset,
+            end=self.end + offset,
+            hunks=[
+                replace(hunk, start=hunk.start + offset, end=hunk.end + offset)
+                for hunk in self.hunks
+            ],
+        )
+
+    def remapped(self, offsets: Dict[int, int]) -> "ParsedFile":
+        """Copy with every offset replaced by its value in offsets"""
+        return replace(
+            self,
+            start=offsets[self.start],
+            end=offsets[self.end],
+            hunks=[
+                replace(hunk, start=offsets[hunk.start], end=offsets[hunk.end])
+                for hunk in self.hunks
+            ],
+        )
+
+    def to_model(self, buffer: str) -> FileDiff:
+        return FileDiff(
+            path=self.path,
+            old_path=self.old_path,
+            status=self.status,
+            binary=self.binary,
+            insertions=self.insertions,
+            deletions=self.deletions,
+            hunks=[hunk.to_model(buffer) for hunk in self.hunks],
+            start=self.start,
+            end=self.end,
+            blob_id=self.blob_id,
+        )
+
+    @classmethod
+    def from_model(cls, file: FileDiff) -> "ParsedFile":
+        return cls(
+            path=file.path,
+            old_path=file.old_path,
+            status=file.status,
+            binary=file.binary,
+            insertions=file.insertions,
+            deletions=file.deletions,
+            hunks=[
+                Hunk(
+                    hunk.start,
+                    hunk.end,
+                    hunk.old_start,
+                    hunk.old_lines,
+                    hunk.new_start,
+                    hunk.new_lines,
+                    hunk.insertions,
+                    hunk.deletions,
+                )
+                for hunk in file.hunks
+            ],
+            start=file.start,
+            end=file.end,
+            blob_id=file.blob_id,
+        )
+
+
+@dataclass(slots=True)
+class ParsedStats:
+    """Diff statistics"""
+
+    files_changed: int = 0
+    insertions: int = 0
+    deletions: int = 0
+    files: List[str] = field(default_factory=list)
+
+    def to_model(self) -> DiffStats:
+        return DiffStats(
+            files_changed=self.files_changed,
+            insertions=self.insertions,
+            deletions=self.deletions,
+            files=self.files,
+        )
+
+    @classmethod
+    def from_model(cls, stats: DiffStats) -> "ParsedStats":
+        return cls(stats.files_changed, stats.insertions, stats.deletions, list(stats.files))
+
+
+@dataclass(slots=True)
+class ParsedDiff:
+    """Git diff analysis result; raw_diff is the buffer the offsets point into"""
+
+    raw_diff: str  # Or a MappedDiff, with offsets in bytes
+    stats: ParsedStats
+    files: List[ParsedFile] = field(default_factory=list)
+    truncated: bool = False  # raw_diff holds only the first part of the diff
+    excluded: List[ParsedFile] = field(default_factory=list)  # Counted in stats, patch left out
+    file_types: List[str] = field(default_factory=list)
+    suggested_scope: Optional[str] = None
+    suggested_type: Optional[CommitType] = None
+
+    def to_model(self) -> DiffAnalysis:
+        """The analysis as the pydantic DiffAnalysis schema"""
+        buffer, files, excluded = self.raw_diff, self.files, self.excluded
+        if isinstance(buffer, MappedDiff):
+            # The model's offsets index the decoded string, not the bytes
+            buffer, offsets = _decode(buffer, files + excluded)
+            files = [file.remapped(offsets) for file in files]
+            excluded = [file.remapped(offsets) for file in excluded]
+        return DiffAnalysis(
+            raw_diff=buffer,
+            stats=self.stats.to_model(),
+            files=[file.to_model(buffer) for file in files],
+            truncated=self.truncated,
+            excluded=[file.to_model(buffer) for file in excluded],
+            file_types=self.file_types,
+            suggested_scope=self.suggested_scope,
+            suggested_type=self.suggested_type,
+        )
+
+    @classmethod
+    def from_model(cls, analysis: DiffAnalysis) -> "ParsedDiff":
+        return cls(
+            raw_diff=analysis.raw_diff,
+            stats=ParsedStats.from_model(analysis.stats),
+            files=[ParsedFile.from_model(file) for file in analysis.files],
+            truncated=analysis.truncated,
+            excluded=[ParsedFile.from_model(file) for file in analysis.excluded],
+            file_types=list(analysis.file_types),
+            suggested_scope=analysis.suggested_scope,
+            suggested_type=analysis.suggested_type,
+        )
+
+
+def _decode(buffer: MappedDiff, files: List[ParsedFile]) -> Tuple[str, Dict[int, int]]:
+    """
+    Decode a mapped buffer and find the character offset of each byte offset of files
+
+    The buffer is decoded in pieces split at those offsets; they are all at
+    line starts, so no character is split between two pieces.
+
+    Returns:
+        Tuple of (decoded buffer, character offset by byte offset)
+    """
+    points = {0}
+    for file in files:
+        points.update((file.start, file.end))
+        for hunk in file.hunks:
+            points.update((hunk.start, hunk.end))
+
+    pieces = []
+    offsets = {}
+    previous = 0
+    length = 0
+    for point in sorted(points):
+        piece = buffer[previous:point]
+        pieces.append(piece)
+        length += len(piece)
+        offsets[point] = length
+        previous = point
+    pieces.append(buffer[previous:])
+    return "".join(pieces), offsets
+
+
+@dataclass(slots=True)
+class CommitDiff:
+    """Existing commit read from git log, with its analyzed patch"""
+
+    sha: str
+    subject: str
+    analysis: ParsedDiff
@@ -1,7 +1,7 @@
 """Pydantic models for data validation"""
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, NamedTuple, Union
 from enum import Enum
 
 
@@ -32,6 +32,43 @@ class CommitStyle(str, Enum):
     SIMPLE = "simple"
 
 
+class GenerationStats(BaseModel):
+    """Token counts and timings Ollama reports for a request (durations in nanoseconds)"""
+    prompt_eval_count: Optional[int] = None  # Prompt tokens evaluated, cached prefix excluded
+    prompt_eval_duration: Optional[int] = None
+    eval_count: Optional[int] = None  # Tokens generated
+    eval_duration: Optional[int] = None
+    load_duration: Optional[int] = None  # Time spent loading the model
+    total_duration: Optional[int] = None
+
+    @classmethod
+    def from_response(cls, response: dict) -> "GenerationStats":
+        """Pick the stats fields out of an /api/generate response"""
+        return cls(**{name: response.get(name) for name in cls.model_fields})
+
+    def describe(self) -> str:
+        """One-line summary of prompt and output token counts and timings"""
+        def seconds(duration: Optional[int]) -> str:
+            return f"{duration / 1e9:.2f}s" if duration is not None else "?"
+
+        summary = (
+            f"prompt {self.prompt_eval_count if self.prompt_eval_count is not None else '?'} tok"
+            f" in {seconds(self.prompt_eval_duration)}, "
+            f"output {self.eval_count if self.eval_count is not None else '?'} tok"
+            f" in {seconds(self.eval_duration)}"
+        )
+        if self.load_duration and self.load_duration > 1e8:
+            summary += f", model load {seconds(self.load_duration)}"
+        return summary
+
+
+class GenerationResult(BaseModel):
+    """Generated text with the metadata of the request"""
+    text: str
+    context: Optional[List[int]] = None  # Conversation state for follow-up requests
+    stats: GenerationStats = Field(default_factory=GenerationStats)
+
+
 class CommitMessage(BaseModel):
     """Commit message model"""
     type: CommitType
@@ -40,6 +77,11 @@ class CommitMessage(BaseModel):
     body: Optional[str] = None
     footer: Optional[str] = None
     breaking_change: bool = False
+    # Request metadata, not part of the message itself (and never cached)
+    stats: Optional[GenerationStats] = Field(default=None, exclude=True)
+    context: Optional[List[int]] = Field(default=None, exclude=True, repr=False)
+    # Built from the diff analysis, not the model
+    heuristic: bool = Field(default=False, exclude=True)
 
     def format_conventional(self) -> str:
         """Format as conventional commit"""
@@ -88,6 +130,49 @@ class CommitMessage(BaseModel):
         return self.subject
 
 
+class FileStatus(str, Enum):
+    """Change status of a file in a diff"""
+    ADDED = "added"
+    MODIFIED = "modified"
+    DELETED = "deleted"
+    RENAMED = "renamed"
+    COPIED = "copied"
+
+
+class DiffHunk(NamedTuple):
+    """
+    Single @@ hunk of a file diff
+
+    A plain tuple rather than a model: large diffs have hundreds of
+    thousands of hunks and validating each one dominated parse time.
+    """
+    header: str
+    old_start: int
+    old_lines: int
+    new_start: int
+    new_lines: int
+    insertions: int
+    deletions: int
+    start: int  # Offset of the @@ line in the raw diff
+    end: int
+
+
+class FileDiff(BaseModel):
+    """Per-file section of a git diff"""
+    path: str
+    old_path: Optional[str] = None
+    status: FileStatus = FileStatus.MODIFIED
+    binary: bool = False
+    insertions: int = 0
+    deletions: int = 0
+    hunks: List[DiffHunk] = Field(default_factory=list)
+    start: int = 0  # Offset of the "diff --git" line in the raw diff
+    end: int = 0
+    # Staged modes and blob hashes ("<old mode> <new mode> <old blob> <new blob>"
+    # from git diff --raw); identifies the file's change for incremental reuse
+    blob_id: Optional[str] = None
+
+
 class DiffStats(BaseModel):
     """Diff statistics"""
     files_changed: int = 0
@@ -100,6 +185,9 @@ class DiffAnalysis(BaseModel):
     """Git diff analysis result"""
     raw_diff: str
     stats: DiffStats
+    files: List[FileDiff] = Field(default_factory=list)
+    truncated: bool = False  # raw_diff holds only the first part of the diff
+    excluded: List[FileDiff] = Field(default_factory=list)  # Counted in stats, patch left out
     file_types: List[str] = Field(default_factory=list)
     suggested_scope: Optional[str] = None
     suggested_type: Optional[CommitType] = None
@@ -113,13 +201,57 @@ class ConfigModel(BaseModel):
     ollama_timeout: int = 30
     ollama_temperature: float = 0.7
     ollama_max_tokens: int = 200
+    ollama_num_ctx: int = 4096  # Context window; the diff is packed to fit
+    ollama_pool_size: int = 4
+    ollama_pool_idle_timeout: float = 60.0
+    # How long the server keeps the model loaded
+    ollama_keep_alive: Optional[Union[str, int]] = "30m"
+    # Several servers to balance across (replaces ollama_host)
+    ollama_hosts: List[str] = Field(default_factory=list)
+    ollama_failure_threshold: int = 3  # Consecutive failures that take a server out of rotation
+    ollama_circuit_reset: float = 30.0  # Seconds before a failed server is tried again
+    ollama_health_interval: float = 60.0  # Seconds between health checks of the servers
+    ollama_retries: int = 2  # Retries after a request failed on every server
+    ollama_retry_backoff: float = 0.5  # First retry delay bound in seconds (doubles, jittered)
+    ollama_retry_backoff_max: float = 8.0
+    ollama_hedge: bool = False  # Send a second request when the first is slow to answer
+    ollama_hedge_percentile: float = 95.0  # Slow: later than this percentile of recent requests
+    ollama_hedge_delay: float = 5.0  # Slow, until enough requests were timed
 
     # App settings
     language: Language = Language.INDONESIAN
     style: CommitStyle = CommitStyle.CONVENTIONAL
     auto_commit: bool = False
+    # Seconds to wait for the model before using the heuristic message
+    deadline: Optional[float] = None
+
+    # Large diff summarization (map-reduce)
+    summarize_large_diffs: bool = True
+    summary_concurrency: int = 4
+    summary_chunk_chars: int = 4000
+    summary_max_chunks: int = 16
+    summary_max_tokens: int = 120
+
+    # Secret redaction before anything is sent to the model
+    redaction_rules: Optional[List[str]] = None  # Built-in rules to apply (default: all)
+    redaction_patterns: dict = Field(default_factory=dict)  # Extra rules: name -> regex
+    redaction_min_entropy: float = 3.5  # Bits per character for high_entropy strings
+
+    # Cache settings
+    cache_enabled: bool = True
+    cache_dir: Optional[str] = None
+    cache_max_entries: int = 500
+    cache_max_size_mb: float = 20.0
 
     # Git settings
+    diff_read_limit: int = 20000  # Characters of staged patch text read for the prompt
+    diff_spill: bool = False  # Memory-map the whole staged patch instead (for huge changes)
+    # Concurrent git diff calls extracting a large staged patch (default: one per CPU)
+    diff_workers: Optional[int] = None
+    # Leave out the patch of lockfiles, generated and vendored files
+    diff_exclude_generated: bool = True
+    # More glob patterns of files to leave out
+    diff_exclude: List[str] = Field(default_factory=list)
     scope_mappings: dict = Field(default_factory=lambda: {
         "src/auth/": "auth",
         "src/ui/": "ui",
@@ -1,24 +1,152 @@
 """Ollama API client for Qwen3:4B integration"""
 
+import json
+import queue
+import socket
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, Iterator, List, Union
 import logging
+import threading
+import time
+
+from .host_pool import Backend, HostPool
+from .models.schemas import ConfigModel, GenerationResult, GenerationStats
+from .profiling import in_context, record, timed
+from .retry import LatencyWindow, backoff_delay
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a connection when another server could take the request
+CONNECT_TIMEOUT = 5.0
+
+# Timeout of the /api/tags and /api/ps health probes
+HEALTH_TIMEOUT = 2.0
+
+# Lower bound of the hedging delay, however fast recent requests were
+MIN_HEDGE_DELAY = 0.05
+
+# Marks the end of a hedged attempt's chunks
+_STREAM_END = object()
+
+# Server-side stages Ollama reports durations for, in the order it runs them
+_SERVER_STAGES = (
+    ("ollama.load", "load_duration", None),
+    ("ollama.prompt_eval", "prompt_eval_duration", "prompt_eval_count"),
+    ("ollama.eval", "eval_duration", "eval_count"),
+)
+
+
+class _StreamAttempt:
+    """
+    One attempt of a hedged stream, which the other attempt can abandon
+
+    The thread running the attempt registers the server and the response it
+    is waiting on; abandon() hands the server back to the pool and closes the
+    response from the other thread, so the attempt does not hold either while
+    its server is still working on an answer nobody reads.
+    """
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self._backend: Optional[Backend] = None
+        self._response: Optional[requests.Response] = None
+        self._lock = threading.Lock()
+
+    def start(self, backend: Backend) -> bool:
+        """Register the server of a request; False if the attempt was abandoned"""
+        with self._lock:
+            if self.cancelled.is_set():
+                return False
+            self._backend = backend
+            return True
+
+    def attach(self, response: requests.Response) -> bool:
+        """Register the response being read; False if the attempt was abandoned"""
+        with self._lock:
+            if self.cancelled.is_set():
+                return False
+            self._response = response
+            return True
+
+    def finish(self, backend: Backend) -> bool:
+        """Unregister a request; False if abandon() already released its server"""
+        with self._lock:
+            owned = self._backend is backend
+            self._backend = None
+            self._response = None
+            return owned
+
+    def abandon(self, pool: HostPool):
+        """Stop the attempt: release its server without an outcome and close its connection"""
+        with self._lock:
+            self.cancelled.set()
+            backend, response = self._backend, self._response
+            self._backend = None
+            self._response = None
+        if backend is not None:
+            pool.discard(backend)
+        if response is not None:
+            _close_response(response)
+
+
+def _close_response(response: requests.Response):
+    """Close a streamed response from another thread, waking up the thread reading it"""
+    try:
+        # Closing alone does not interrupt a blocked read; shutting the socket down does
+        sock = getattr(getattr(response.raw, "_connection", None), "sock", None)
+        if sock is not None:
+            sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    response.close()
+
+
+def _keep_alive_value(keep_alive: Optional[Union[str, int]]) -> Optional[Union[str, int]]:
+    """keep_alive as Ollama expects it: durations as strings, plain numbers as seconds"""
+    if keep_alive is None or keep_alive == "":
+        return None
+    try:
+        return int(keep_alive)
+    except ValueError:
+        return keep_alive
+
 
 class OllamaClient:
     """
     Ollama API Client for Qwen3:4B model
 
-    Handles communication with remote Ollama server
+    Handles communication with remote Ollama server. All requests go through
+    a pooled keep-alive session, so repeated calls reuse the same TCP/TLS
+    connection instead of paying the handshake every time.
+
+    Given several hosts, each request goes to the least busy healthy one
+    (see HostPool) and fails over to the next when a server cannot be
+    reached, times out or answers with a server error. When every host
+    failed, the request is retried after a jittered exponential backoff.
+    With hedging, a request that has not started answering after the usual
+    (p95) time is sent a second time and the first to answer wins.
     """
 
     def __init__(
         self,
         host: str = "https://ollama.iotech.my.id",
         model: str = "qwen3:4b",
-        timeout: int = 30
+        timeout: int = 30,
+        pool_size: int = 4,
+        pool_idle_timeout: float = 60.0,
+        num_ctx: int = 4096,
+        keep_alive: Optional[Union[str, int]] = "30m",
+        hosts: Optional[List[str]] = None,
+        failure_threshold: int = 3,
+        circuit_reset: float = 30.0,
+        health_interval: float = 60.0,
+        retries: int = 2,
+        retry_backoff: float = 0.5,
+        retry_backoff_max: float = 8.0,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_delay: float = 5.0
     ):
         """
         Initialize Ollama client
@@ -27,17 +155,163 @@ class OllamaClient:
             host: Ollama server URL
             model: Model name (default: qwen3:4b)
             timeout: Request timeout in seconds
+            pool_size: Maximum number of keep-alive connections to the host
+            pool_idle_timeout: Seconds a pooled connection may stay idle before
+                the pool is recycled (0 disables recycling)
+            num_ctx: Context window in tokens, prompt and response included
+            keep_alive: How long the server keeps the model loaded after a
+                request ("30m", seconds, or -1 for forever; None uses the
+                server default of 5 minutes)
+            hosts: Several Ollama server URLs to balance across (replaces host)
+            failure_threshold: Consecutive failures that take a server out of rotation
+            circuit_reset: Seconds before a server out of rotation is tried again
+            health_interval: Seconds between health checks of the servers
+            retries: Retries after a request failed on every host
+            retry_backoff: Upper bound of the first retry delay in seconds
+                (doubles with every retry, jittered)
+            retry_backoff_max: Upper bound of any retry delay in seconds
+            hedge: Send a second request when the first is slow to answer
+            hedge_percentile: Percentile of recent time-to-first-token after
+                which a request counts as slow
+            hedge_delay: Seconds after which a request counts as slow until
+                enough requests were timed to derive the percentile
         """
-        self.host = host.rstrip("/")
+        self.pool = HostPool(
+            hosts or [host],
+            failure_threshold=failure_threshold,
+            reset_timeout=circuit_reset,
+            health_interval=health_interval
+        )
+        self.hosts = [backend.host for backend in self.pool.backends]
+        self.host = self.hosts[0]
         self.model = model
         self.timeout = timeout
         self.api_base = f"{self.host}/api"
+        self.pool_size = max(1, pool_size)
+        self.pool_idle_timeout = pool_idle_timeout
+        self.num_ctx = num_ctx
+        self.keep_alive = keep_alive
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay = hedge_delay
+        self.first_token_latency = LatencyWindow()
+
+        self._session: Optional[requests.Session] = None
+        self._last_used = 0.0
+        self._session_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: ConfigModel) -> "OllamaClient":
+        """
+        Create client from configuration
+
+        Args:
+            config: ConfigModel object
+
+        Returns:
+            OllamaClient instance
+        """
+        return cls(
+            host=config.ollama_host,
+            model=config.ollama_model,
+            timeout=config.ollama_timeout,
+            pool_size=config.ollama_pool_size,
+            pool_idle_timeout=config.ollama_pool_idle_timeout,
+            num_ctx=config.ollama_num_ctx,
+            keep_alive=config.ollama_keep_alive,
+            hosts=config.ollama_hosts or None,
+            failure_threshold=config.ollama_failure_threshold,
+            circuit_reset=config.ollama_circuit_reset,
+            health_interval=config.ollama_health_interval,
+            retries=config.ollama_retries,
+            retry_backoff=config.ollama_retry_backoff,
+            retry_backoff_max=config.ollama_retry_backoff_max,
+            hedge=config.ollama_hedge,
+            hedge_percentile=config.ollama_hedge_percentile,
+            hedge_delay=config.ollama_hedge_delay
+        )
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Pooled HTTP session shared by all requests of this client
+
+        The session is recreated when it has been idle for longer than
+        pool_idle_timeout, since servers and proxies drop idle keep-alive
+        connections and a stale socket would fail the next request.
+        """
+        with self._session_lock:
+            now = time.monotonic()
+            if (
+                self._session is not None
+                and self.pool_idle_timeout > 0
+                and now - self._last_used > self.pool_idle_timeout
+            ):
+                logger.debug(f"Connection pool idle for {now - self._last_used:.1f}s, recycling")
+                self._session.close()
+                self._session = None
+
+            if self._session is None:
+                self._session = self._create_session()
+
+            self._last_used = now
+            return self._session
+
+    def _create_session(self) -> requests.Session:
+        """Create a keep-alive session with a bounded connection pool"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=len(self.pool),
+            pool_maxsize=self.pool_size,
+            pool_block=False
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @property
+    def request_timeout(self) -> Union[float, tuple]:
+        """
+        Timeout of generate requests
+
+        With several hosts, connecting gets a shorter timeout of its own so
+        an unreachable server fails over quickly.
+        """
+        if len(self.pool) > 1:
+            return (min(CONNECT_TIMEOUT, self.timeout), self.timeout)
+        return self.timeout
+
+    @property
+    def hedge_delay(self) -> float:
+        """Seconds without a first token after which a request is hedged"""
+        delay = self.first_token_latency.percentile(self.hedge_percentile)
+        if delay is None:
+            return self.initial_hedge_delay
+        return max(MIN_HEDGE_DELAY, delay)
+
+    def close(self):
+        """Close pooled connections"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self) -> "OllamaClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def generate(
         self,
         prompt: str,
         temperature: float = 0.7,
         max_tokens: int = 500,
+        system: Optional[str] = None,
+        context: Optional[List[int]] = None,
         **kwargs
     ) -> str:
         """
@@ -47,6 +321,8 @@ class OllamaClient:
             prompt: Input prompt with git diff
             temperature: Sampling temperature (0.0 - 1.0)
             max_tokens: Maximum tokens to generate
+            system: System prompt (fixed instructions sent ahead of the prompt)
+            context: Context returned by a previous request, to continue it
             **kwargs: Additional parameters
 
         Returns:
@@ -55,35 +331,46 @@ class OllamaClient:
         Raises:
             requests.RequestException: If API request fails
         """
-        url = f"{self.api_base}/generate"
+        return self.generate_result(prompt, temperature, max_tokens, system, context).text
 
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-                "num_predict": max_tokens,
-                "num_ctx": 4096,  # Context window
-                "top_k": 20,
-                "top_p": 0.9,
-                "repeat_penalty": 1.1,
-            }
-        }
+    def generate_result(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        system: Optional[str] = None,
+        context: Optional[List[int]] = None,
+        seed: Optional[int] = None
+    ) -> GenerationResult:
+        """
+        Generate text and return it with the context and stats of the request
+
+        Args:
+            prompt: Input prompt with git diff
+            temperature: Sampling temperature (0.0 - 1.0)
+            max_tokens: Maximum tokens to generate
+            system: System prompt (fixed instructions sent ahead of the prompt)
+            context: Context returned by a previous request, to continue it
+            seed: Sampling seed, e.g. to get different completions of one prompt
+
+        Returns:
+            GenerationResult object
+
+        Raises:
+            requests.RequestException: If API request fails
+        """
+        # Hedging needs the first token to tell a slow request, so it streams
+        payload = self._build_payload(prompt, temperature, max_tokens, stream=self.hedge,
+                                      system=system, context=context, seed=seed)
 
         try:
-            logger.info(f"Sending request to {url} with model {self.model}")
             logger.debug(f"Prompt length: {len(prompt)} characters")
             logger.debug(f"Prompt preview (first 200 chars): {prompt[:200]}...")
 
-            response = requests.post(
-                url,
-                json=payload,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-
-            result = response.json()
+            if self.hedge:
+                result = self._collect(self._hedged_stream(payload))
+            else:
+                result = self._post_generate(payload)
             generated_text = result.get("response", "")
 
             # If response is empty but thinking exists, try to extract from thinking
@@ -96,7 +383,9 @@ class OllamaClient:
                 # For now, return empty and let the generator handle fallback
                 pass
 
+            stats = GenerationStats.from_response(result)
             logger.info(f"Generated {len(generated_text)} characters")
+            logger.debug(f"Stats: {stats.describe()}")
 
             if not generated_text:
                 logger.warning("Empty response from Ollama")
@@ -105,7 +394,11 @@ class OllamaClient:
                 logger.debug(f"Done: {result.get('done')}")
                 logger.debug(f"Done reason: {result.get('done_reason')}")
 
-            return generated_text.strip()
+            return GenerationResult(
+                text=generated_text.strip(),
+                context=result.get("context"),
+                stats=stats
+            )
 
         except requests.exceptions.Timeout:
             logger.error(f"Request timeout after {self.timeout}s")
@@ -117,6 +410,533 @@ class OllamaClient:
             logger.error(f"Unexpected error: {e}")
             raise
 
+    def generate_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        system: Optional[str] = None,
+        context: Optional[List[int]] = None,
+        **kwargs
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Generate with streaming, yielding NDJSON chunks as they arrive
+
+        Each chunk is the decoded JSON object sent by Ollama; the generated
+        text is in its "response" field and the last chunk has "done" set
+        and carries the context and stats of the request.
+        Closing the iterator early closes the HTTP response, which makes the
+        server stop generating.
+
+        Args:
+            prompt: Input prompt with git diff
+            temperature: Sampling temperature (0.0 - 1.0)
+            max_tokens: Maximum tokens to generate
+            system: System prompt (fixed instructions sent ahead of the prompt)
+            context: Context returned by a previous request, to continue it
+            **kwargs: Additional parameters
+
+        Yields:
+            Response chunks
+
+        Raises:
+            requests.RequestException: If API request fails
+        """
+        payload = self._build_payload(prompt, temperature, max_tokens, stream=True,
+                                      system=system, context=context)
+
+        logger.debug(f"Prompt length: {len(prompt)} characters")
+        try:
+            if self.hedge:
+                yield from self._hedged_stream(payload)
+            else:
+                yield from self._stream_chunks(payload)
+
+        except requests.exceptions.Timeout:
+            logger.error(f"Request timeout after {self.timeout}s")
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request failed: {e}")
+            raise
+
+    def _post_generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a non-streaming /api/generate request
+
+        Fails over between hosts, and retries with backoff once every host
+        failed.
+
+        Args:
+            payload: Request payload
+
+        Returns:
+            Decoded response
+
+        Raises:
+            requests.RequestException: If the request failed on every attempt
+        """
+        self._refresh_health()
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._wait_before_retry(attempt, last_error)
+
+            tried: List[Backend] = []
+            while True:
+                backend = self._acquire(tried)
+                url = f"{backend.api_base}/generate"
+                logger.info(f"Sending request to {url} with model {self.model}")
+
+                start = time.perf_counter()
+                started_at = time.time_ns()
+                try:
+                    response = self.session.post(
+                        url,
+                        json=payload,
+                        timeout=self.request_timeout
+                    )
+                    response.raise_for_status()
+                    result = response.json()
+                except requests.exceptions.RequestException as e:
+                    self._record_request("ollama.generate", backend, started_at, error=e)
+                    failed = self._is_server_failure(e)
+                    self.pool.release(backend, ok=not failed)
+                    if not failed:
+                        raise
+                    last_error = e
+                    if not self._can_fail_over(tried):
+                        break
+                    logger.warning(f"{backend.host} failed ({e}), trying another server")
+                    continue
+
+                self.pool.release(backend, ok=True, latency=time.perf_counter() - start)
+                self._record_request("ollama.generate", backend, started_at, result)
+                return result
+
+        raise last_error
+
+    def _stream_chunks(
+        self,
+        payload: Dict[str, Any],
+        attempt: Optional[_StreamAttempt] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        POST a streaming /api/generate request and yield its chunks
+
+        Fails over between hosts and retries with backoff like
+        _post_generate, but only until the first chunk: after that,
+        switching servers would repeat text already yielded.
+
+        Args:
+            payload: Request payload
+            attempt: Hedged attempt this stream belongs to; once it is
+                abandoned, no more requests are made and the server and
+                response are left to the abandoning thread
+
+        Yields:
+            Response chunks
+
+        Raises:
+            requests.RequestException: If the request failed on every attempt
+        """
+        self._refresh_health()
+
+        cancelled = attempt.cancelled if attempt is not None else None
+        last_error = None
+        for retry in range(self.retries + 1):
+            if retry and not self._wait_before_retry(retry, last_error, cancelled):
+                return
+
+            tried: List[Backend] = []
+            while True:
+                backend = self._acquire(tried)
+                if attempt is not None and not attempt.start(backend):
+                    self.pool.discard(backend)
+                    return
+                url = f"{backend.api_base}/generate"
+                logger.info(f"Streaming request to {url} with model {self.model}")
+
+                streamed = False
+                failed = False
+                final = None
+                error = None
+                start = time.perf_counter()
+                started_at = time.time_ns()
+                try:
+                    with self.session.post(
+                        url,
+                        json=payload,
+                        timeout=self.request_timeout,
+                        stream=True
+                    ) as response:
+                        if attempt is not None and not attempt.attach(response):
+                            return
+                        response.raise_for_status()
+
+                        for line in response.iter_lines():
+                            if not line:
+                                continue
+
+                            chunk = json.loads(line)
+                            if chunk.get("error"):
+                                raise requests.RequestException(chunk["error"])
+
+                            streamed = True
+                            yield chunk
+
+                            if chunk.get("done"):
+                                final = chunk
+                                logger.debug(f"Done reason: {chunk.get('done_reason')}")
+                                stats = GenerationStats.from_response(chunk)
+                                logger.debug(f"Stats: {stats.describe()}")
+                                break
+                    return
+
+                except requests.exceptions.RequestException as e:
+                    if cancelled is not None and cancelled.is_set():
+                        # Connection closed by abandon()
+                        return
+                    error = e
+                    failed = self._is_server_failure(e)
+                    if not failed or streamed:
+                        raise
+                    last_error = e
+                    if not self._can_fail_over(tried):
+                        break
+                    logger.warning(f"{backend.host} failed ({e}), trying another server")
+
+                finally:
+                    if attempt is None or attempt.finish(backend):
+                        self.pool.release(
+                            backend,
+                            ok=not failed,
+                            latency=time.perf_counter() - start if not failed else None
+                        )
+                        self._record_request("ollama.stream", backend, started_at, final, error)
+
+        raise last_error
+
+    def _hedged_stream(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a request, sending it a second time if it is slow to answer
+
+        If no chunk arrived within hedge_delay, the same request goes out
+        again (to another host if there is one, since the pool prefers the
+        least busy). The attempt whose first chunk arrives first is
+        streamed; the other one is abandoned right away: its server slot is
+        handed back to the pool without counting as a success or a failure,
+        and its connection is closed if the server already started to
+        answer, which makes the server stop generating. (A request still
+        waiting for response headers cannot be interrupted; its thread ends
+        at the request timeout.) Each attempt runs in its own thread with
+        the usual failover and retries.
+
+        Args:
+            payload: Streaming request payload
+
+        Yields:
+            Response chunks of the winning attempt
+
+        Raises:
+            requests.RequestException: If every attempt failed
+        """
+        chunks: "queue.Queue" = queue.Queue()
+        attempts: List[_StreamAttempt] = []
+
+        def run(index: int, attempt: _StreamAttempt):
+            stream = self._stream_chunks(payload, attempt)
+            try:
+                for chunk in stream:
+                    if attempt.cancelled.is_set():
+                        break
+                    chunks.put((index, chunk))
+                chunks.put((index, _STREAM_END))
+            except Exception as e:
+                chunks.put((index, e))
+            finally:
+                stream.close()
+
+        def launch():
+            attempt = _StreamAttempt()
+            attempts.append(attempt)
+            threading.Thread(
+                target=in_context(run), args=(len(attempts) - 1, attempt), daemon=True
+            ).start()
+
+        delay = self.hedge_delay
+        start = time.perf_counter()
+        launch()
+
+        winner = None
+        completed = False
+        ended = 0
+        error = None
+        try:
+            while True:
+                wait = None
+                if winner is None and len(attempts) == 1:
+                    wait = max(0.0, start + delay - time.perf_counter())
+                try:
+                    index, item = chunks.get(timeout=wait)
+                except queue.Empty:
+                    logger.info(f"No answer after {delay:.2f}s, sending a hedged request")
+                    launch()
+                    continue
+
+                if winner is None:
+                    if item is _STREAM_END or isinstance(item, Exception):
+                        # An attempt gave up before answering; wait for the other
+                        ended += 1
+                        error = item if isinstance(item, Exception) else error
+                        if ended == len(attempts):
+                            if error is not None:
+                                raise error
+                            return
+                        continue
+
+                    winner = index
+                    # Time until the caller got an answer, hedging included
+                    self.first_token_latency.add(time.perf_counter() - start)
+                    for other, attempt in enumerate(attempts):
+                        if other != winner:
+                            attempt.abandon(self.pool)
+                    if winner:
+                        logger.info("Hedged request answered first")
+
+                if index != winner:
+                    continue
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                if item.get("done"):
+                    # The winner finishes (and reports its outcome) on its own
+                    completed = True
+                yield item
+
+        finally:
+            for index, attempt in enumerate(attempts):
+                if not (index == winner and completed):
+                    attempt.abandon(self.pool)
+
+    @staticmethod
+    def _collect(chunks: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge streamed chunks into the response of a non-streaming request"""
+        text = []
+        thinking = []
+        final: Dict[str, Any] = {}
+        for chunk in chunks:
+            text.append(chunk.get("response", ""))
+            thinking.append(chunk.get("thinking") or "")
+            if chunk.get("done"):
+                final = chunk
+                break
+        return dict(final, response="".join(text), thinking="".join(thinking) or None)
+
+    @timed("ollama.backoff")
+    def _wait_before_retry(
+        self,
+        attempt: int,
+        error: Exception,
+        cancelled: Optional[threading.Event] = None
+    ) -> bool:
+        """
+        Sleep the backoff delay before a retry
+
+        Args:
+            attempt: Retry number, starting at 1
+            error: Error of the previous attempt
+            cancelled: Ends the wait early when set
+
+        Returns:
+            False if cancelled while waiting
+        """
+        delay = backoff_delay(attempt, self.retry_backoff, self.retry_backoff_max)
+        logger.warning(
+            f"Request failed ({error}), retrying in {delay:.1f}s ({attempt}/{self.retries})"
+        )
+        if cancelled is not None:
+            return not cancelled.wait(delay)
+        time.sleep(delay)
+        return True
+
+    def _record_request(
+        self,
+        name: str,
+        backend: Backend,
+        started_at: int,
+        response: Optional[Dict[str, Any]] = None,
+        error: Optional[Exception] = None
+    ):
+        """
+        Add a profiling span for one request to a server
+
+        The load, prompt evaluation and generation times Ollama reports in
+        its final response become child spans, laid out back to back up to
+        the end of the request; the rest of the request is network and
+        queueing.
+
+        Args:
+            name: Span name
+            backend: Server the request went to
+            started_at: Start time (time.time_ns())
+            response: Decoded response or final stream chunk, if there was one
+            error: Exception the request failed with
+        """
+        end = time.time_ns()
+        attributes = {"host": backend.host, "model": self.model}
+        if error is not None:
+            attributes["error"] = type(error).__name__
+        if response and response.get("total_duration"):
+            attributes["server_duration"] = response["total_duration"] / 1e9
+
+        span_id = record(name, started_at, end, **attributes)
+        if span_id is None or not response:
+            return
+
+        durations = [
+            (stage, response.get(field) or 0, response.get(count))
+            for stage, field, count in _SERVER_STAGES
+        ]
+        start = max(started_at, end - sum(duration for _, duration, _ in durations))
+        for stage, duration, count in durations:
+            if not duration:
+                continue
+            stage_end = min(start + duration, end)
+            if count is not None:
+                record(stage, start, stage_end, parent_id=span_id, tokens=count)
+            else:
+                record(stage, start, stage_end, parent_id=span_id)
+            start = stage_end
+
+    def _acquire(self, tried: List[Backend]) -> Backend:
+        """Pick a server not tried yet for this request and add it to tried"""
+        backend = self.pool.acquire(exclude=tried)
+        tried.append(backend)
+        return backend
+
+    def _can_fail_over(self, tried: List[Backend]) -> bool:
+        """Whether a host not tried yet is left for this request"""
+        return len(tried) < len(self.pool)
+
+    @staticmethod
+    def _is_server_failure(error: requests.exceptions.RequestException) -> bool:
+        """
+        Whether a failed request says something about the server
+
+        Connection errors, timeouts, server errors and a missing model (404)
+        count against the server and are worth trying elsewhere; other
+        errors (e.g. a rejected request) would fail on any server.
+        """
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        response = getattr(error, "response", None)
+        if isinstance(error, requests.exceptions.HTTPError) and response is not None:
+            return response.status_code >= 500 or response.status_code == 404
+        return False
+
+    def _refresh_health(self):
+        """
+        Health-check the hosts when due (only with several hosts)
+
+        The first check runs before the first request, so it can be routed
+        by it; later ones run in the background.
+        """
+        if len(self.pool) < 2:
+            return
+        if not self.pool.health_check_due():
+            if self.pool.checked_at is None:
+                # Another request is running the first check
+                self.pool.wait_for_health_check(HEALTH_TIMEOUT * 2)
+            return
+        if self.pool.checked_at is None:
+            self.pool.check_health(self._probe)
+        else:
+            threading.Thread(
+                target=self.pool.check_health, args=(self._probe,), daemon=True
+            ).start()
+
+    def _probe(self, backend: Backend) -> Dict[str, bool]:
+        """
+        Health of one host: reachable (/api/tags), has the model, and has
+        it loaded in memory (/api/ps, so requests avoid a cold start)
+        """
+        response = self.session.get(f"{backend.api_base}/tags", timeout=HEALTH_TIMEOUT)
+        response.raise_for_status()
+        names = [model.get("name", "") for model in response.json().get("models", [])]
+
+        loaded = []
+        try:
+            response = self.session.get(f"{backend.api_base}/ps", timeout=HEALTH_TIMEOUT)
+            response.raise_for_status()
+            loaded = [model.get("name", "") for model in response.json().get("models", [])]
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.debug(f"Cannot list loaded models of {backend.host}: {e}")
+
+        return {
+            "healthy": True,
+            "has_model": self._has_model(names),
+            "model_loaded": self._has_model(loaded),
+        }
+
+    def _has_model(self, names: List[str]) -> bool:
+        """Whether the configured model is among names ("latest" tag implied)"""
+        model = self.model if ":" in self.model else f"{self.model}:latest"
+        return model in names or self.model in names
+
+    def check_hosts(self) -> List[Dict[str, Any]]:
+        """
+        Health-check every host now
+
+        Returns:
+            State of each host (see Backend.snapshot)
+        """
+        self.pool.check_health(self._probe)
+        return self.pool.snapshot()
+
+    def _build_payload(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        stream: bool,
+        system: Optional[str] = None,
+        context: Optional[List[int]] = None,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Build /api/generate request payload
+
+        The system prompt is rendered ahead of the prompt by the model's
+        template. Keeping it identical across requests (and the model loaded
+        via keep_alive) lets the server reuse the evaluated prefix instead of
+        processing the instructions again for every commit.
+        """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+                "num_ctx": self.num_ctx,  # Context window
+                "top_k": 20,
+                "top_p": 0.9,
+                "repeat_penalty": 1.1,
+            }
+        }
+        if system:
+            payload["system"] = system
+        if context:
+            payload["context"] = context
+        if seed is not None:
+            payload["options"]["seed"] = seed
+        keep_alive = _keep_alive_value(self.keep_alive)
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        return payload
+
     def check_connection(self) -> bool:
         """
         Test connection to Ollama server and verify Qwen3:4B availability
@@ -128,7 +948,7 @@ class OllamaClient:
             url = f"{self.api_base}/tags"
             logger.info(f"Checking connection to {url}")
 
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
 
             data = response.json()
@@ -161,7 +981,7 @@ class OllamaClient:
         """
         try:
             url = f"{self.api_base}/tags"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
 
             data = response.json()
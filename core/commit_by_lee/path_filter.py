@@ -0,0 +1,122 @@
+"""Staged files whose patch is left out of the analysis"""
+
+import logging
+from typing import Iterable, List
+
+from .models.schemas import ConfigModel
+
+logger = logging.getLogger(__name__)
+
+# Lockfiles, minified bundles, snapshots, generated code and vendored
+# directories: large diffs that say little about the intent of a commit.
+# Same syntax as user patterns (see PathFilter)
+DEFAULT_PATTERNS = (
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "poetry.lock",
+    "Pipfile.lock",
+    "uv.lock",
+    "Cargo.lock",
+    "composer.lock",
+    "Gemfile.lock",
+    "go.sum",
+    "*.min.js",
+    "*.min.css",
+    "*.js.map",
+    "*.css.map",
+    "*.snap",
+    "__snapshots__/",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "node_modules/",
+    "vendor/",
+    "third_party/",
+)
+
+# .gitattributes marking generated or vendored files (GitHub Linguist) or
+# files without a textual diff; matched by git itself
+DEFAULT_ATTRIBUTES = (
+    "linguist-generated",
+    "linguist-generated=true",
+    "linguist-vendored",
+    "linguist-vendored=true",
+    "-diff",
+)
+
+
+class PathFilter:
+    """
+    Rules for staged files whose patch is never fetched
+
+    Patterns are git glob pathspecs relative to the repository root, with
+    the conveniences of .gitignore entries: a pattern without "/" (other
+    than a trailing one) matches at any depth, and a pattern ending in "/"
+    matches everything below a directory of that name. Attributes are git
+    attribute pathspecs ("name", "name=value" or "-name" for unset).
+
+    The rules are turned into pathspecs, so git does all the matching: the
+    same rules select the excluded files and leave them out of the patch.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[str] = DEFAULT_PATTERNS,
+        attributes: Iterable[str] = DEFAULT_ATTRIBUTES,
+    ):
+        """
+        Initialize filter
+
+        Args:
+            patterns: Glob patterns of paths to leave out
+            attributes: Git attributes of paths to leave out
+        """
+        self.patterns = tuple(patterns)
+        self.attributes = tuple(attributes)
+
+    @classmethod
+    def from_config(cls, config: ConfigModel) -> "PathFilter":
+        """
+        Create filter from configuration
+
+        Args:
+            config: ConfigModel object
+
+        Returns:
+            PathFilter instance (empty when nothing is to be excluded)
+        """
+        patterns = list(DEFAULT_PATTERNS) if config.diff_exclude_generated else []
+        attributes = list(DEFAULT_ATTRIBUTES) if config.diff_exclude_generated else []
+        patterns += [pattern for pattern in config.diff_exclude if pattern.strip()]
+        return cls(patterns, attributes)
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns or self.attributes)
+
+    def pathspecs(self, exclude: bool = False) -> List[str]:
+        """
+        Git pathspecs matching the files to leave out
+
+        Args:
+            exclude: Build exclude pathspecs, which match every other file instead
+
+        Returns:
+            Pathspecs with "top" magic, so they work from any subdirectory
+        """
+        magic = "top,exclude" if exclude else "top"
+        pathspecs = [f":({magic},glob){self._glob(pattern)}" for pattern in self.patterns]
+        pathspecs += [f":({magic},attr:{attribute})" for attribute in self.attributes]
+        return pathspecs
+
+    @staticmethod
+    def _glob(pattern: str) -> str:
+        """Glob pathspec of a pattern"""
+        pattern = pattern.strip()
+        # A leading or inner "/" anchors the pattern at the root, as in .gitignore
+        anchored = "/" in pattern.rstrip("/")
+        pattern = pattern.lstrip("/")
+        if pattern.endswith("/"):
+            pattern += "**"
+        return pattern if anchored else "**/" + pattern
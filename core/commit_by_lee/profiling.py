@@ -0,0 +1,349 @@
+"""
+Lightweight span timing for `generate --profile`
+
+Code marks the stages it runs with span(); the spans are only recorded
+while a Profiler is active in the current context, otherwise span() costs
+one context variable lookup. The active profiler and the enclosing span
+live in context variables, so concurrent daemon requests keep their spans
+apart, and in_context() carries them into worker threads.
+
+Spans can be exported as plain JSON (Profiler.to_dict) or in the
+OpenTelemetry OTLP/JSON trace format (to_otlp), which collectors and
+trace viewers such as Jaeger import directly.
+"""
+
+import contextvars
+import functools
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+_profiler: contextvars.ContextVar[Optional["Profiler"]] = contextvars.ContextVar(
+    "profiler", default=None
+)
+_parent: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "profiler_parent", default=None
+)
+
+
+class Span(NamedTuple):
+    """A timed stage; times are Unix epoch nanoseconds"""
+
+    span_id: int
+    parent_id: Optional[int]
+    name: str
+    start: int
+    end: int
+    attributes: Dict[str, Any]
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds"""
+        return (self.end - self.start) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class ProfileRow(NamedTuple):
+    """Spans with the same path of names, added up"""
+
+    depth: int
+    name: str
+    calls: int
+    total: float  # Seconds, summed over calls (parallel calls overlap)
+
+
+class Profiler:
+    """
+    Collects the spans recorded while it is active
+
+    Usage:
+        with Profiler() as profiler:
+            generator.generate(diff)
+        rows = summarize(profiler.to_dict()["spans"])
+    """
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._tokens: List[contextvars.Token] = []
+
+    def __enter__(self) -> "Profiler":
+        self._tokens.append(_profiler.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _profiler.reset(self._tokens.pop())
+
+    def add(
+        self,
+        name: str,
+        start: int,
+        end: int,
+        parent_id: Optional[int],
+        attributes: Optional[Dict[str, Any]] = None,
+        span_id: Optional[int] = None,
+    ) -> int:
+        """Store a finished span and return its id"""
+        with self._lock:
+            if span_id is None:
+                span_id = next(self._ids)
+            self.spans.append(Span(span_id, parent_id, name, start, end, attributes or {}))
+        return span_id
+
+    def new_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def merge(self, profile: Dict[str, Any]):
+        """Add the spans of an exported profile (e.g. from the daemon), adopting its trace id"""
+        with self._lock:
+            self.trace_id = profile["trace_id"]
+            self.spans.extend(Span(**entry) for entry in profile["spans"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Trace id and spans (in start order) as a JSON-serializable dict"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        return {"trace_id": self.trace_id, "spans": [span.to_dict() for span in spans]}
+
+
+class _Timer:
+    """Context manager recording one span"""
+
+    __slots__ = (
+        "profiler",
+        "name",
+        "attributes",
+        "span_id",
+        "parent_id",
+        "start",
+        "wall_start",
+        "token",
+    )
+
+    def __init__(self, profiler: Profiler, name: str, attributes: Dict[str, Any]):
+        self.profiler = profiler
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Dict[str, Any]:
+        self.span_id = self.profiler.new_id()
+        self.parent_id = _parent.get()
+        self.token = _parent.set(self.span_id)
+        self.wall_start = time.time_ns()
+        self.start = time.perf_counter_ns()
+        return self.attributes
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = self.wall_start + time.perf_counter_ns() - self.start
+        _parent.reset(self.token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.profiler.add(
+            self.name, self.wall_start, end, self.parent_id, self.attributes, self.span_id
+        )
+
+
+class _NoTimer:
+    """Stand-in for _Timer when nothing is being profiled"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> Dict[str, Any]:
+        # Callers may add attributes; they go nowhere
+        return {}
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NO_TIMER = _NoTimer()
+
+
+def span(name: str, **attributes):
+    """
+    Time the enclosed block as a span named name
+
+    Spans opened inside it (in this context) become its children.
+
+    Args:
+        name: Stage name, dotted by component (e.g. "git.diff")
+        **attributes: Details recorded with the span
+
+    Returns:
+        Context manager yielding the span's attribute dict, which can be
+        extended until the block ends
+    """
+    profiler = _profiler.get()
+    if profiler is None:
+        return _NO_TIMER
+    return _Timer(profiler, name, attributes)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator timing every call of a function as a span named name
+
+    Args:
+        name: Stage name
+
+    Returns:
+        Decorator
+    """
+
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def record(
+    name: str, start: int, end: int, parent_id: Optional[int] = None, **attributes
+) -> Optional[int]:
+    """
+    Record a span whose times are already known
+
+    For stages that cannot be wrapped in a block, such as a stream consumed
+    by the caller, or durations reported by the server.
+
+    Args:
+        name: Stage name
+        start: Start time (time.time_ns())
+        end: End time (time.time_ns())
+        parent_id: Enclosing span (default: the current one)
+        **attributes: Details recorded with the span
+
+    Returns:
+        Span id, or None when nothing is being profiled
+    """
+    profiler = _profiler.get()
+    if profiler is None:
+        return None
+    if parent_id is None:
+        parent_id = _parent.get()
+    return profiler.add(name, start, end, parent_id, attributes)
+
+
+def enabled() -> bool:
+    """Whether spans are being recorded in this context"""
+    return _profiler.get() is not None
+
+
+def in_context(function: Callable) -> Callable:
+    """
+    Wrap function to run with the caller's profiler and current span
+
+    Threads start with an empty context; wrapping the target (or the
+    function handed to an executor) keeps their spans in the caller's trace.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # Each call gets its own copy, so the wrapper can run in several threads at once
+        return context.copy().run(function, *args, **kwargs)
+
+    return run
+
+
+def summarize(spans: List[Dict[str, Any]]) -> List[ProfileRow]:
+    """
+    Add up spans that have the same path of names, as an indented tree
+
+    Args:
+        spans: Span dicts (the "spans" of Profiler.to_dict)
+
+    Returns:
+        Rows in the order their first span started, children after parents
+    """
+    by_id = {entry["span_id"]: entry for entry in spans}
+    children: Dict[Optional[int], List[Dict[str, Any]]] = {}
+    for entry in sorted(spans, key=lambda entry: entry["start"]):
+        parent = entry["parent_id"] if entry["parent_id"] in by_id else None
+        children.setdefault(parent, []).append(entry)
+
+    rows: List[ProfileRow] = []
+
+    def walk(parent_ids: List[Optional[int]], depth: int):
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for parent_id in parent_ids:
+            for entry in children.get(parent_id, []):
+                groups.setdefault(entry["name"], []).append(entry)
+        for name, group in groups.items():
+            total = sum(entry["end"] - entry["start"] for entry in group) / 1e9
+            rows.append(ProfileRow(depth, name, len(group), total))
+            walk([entry["span_id"] for entry in group], depth + 1)
+
+    walk([None], 0)
+    return rows
+
+
+def to_otlp(profile: Dict[str, Any], service_name: str = "commit-by-lee") -> Dict[str, Any]:
+    """
+    Convert a profile to an OTLP/JSON trace export
+
+    Args:
+        profile: Profiler.to_dict output
+        service_name: Reported as the service.name resource attribute
+
+    Returns:
+        ExportTraceServiceRequest as a JSON-serializable dict
+    """
+    from . import __version__
+
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "commit_by_lee", "version": __version__},
+                        "spans": [
+                            {
+                                "traceId": profile["trace_id"],
+                                "spanId": f"{entry['span_id']:016x}",
+                                "parentSpanId": (
+                                    f"{entry['parent_id']:016x}" if entry["parent_id"] else ""
+                                ),
+                                "name": entry["name"],
+                                "kind": 1,  # SPAN_KIND_INTERNAL
+                                "startTimeUnixNano": str(entry["start"]),
+                                "endTimeUnixNano": str(entry["end"]),
+                                "attributes": _otlp_attributes(entry["attributes"]),
+                                # STATUS_CODE_ERROR or STATUS_CODE_UNSET
+                                "status": {"code": 2} if "error" in entry["attributes"] else {},
+                            }
+                            for entry in profile["spans"]
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Attributes as OTLP key/value pairs"""
+    pairs = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            # int64 values are strings in OTLP/JSON
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        pairs.append({"key": key, "value": typed})
+    return pairs
@@ -0,0 +1,291 @@
+"""Secret redaction for diffs sent to the model"""
+
+import logging
+import math
+import re
+from collections import Counter
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .models.schemas import ConfigModel
+
+logger = logging.getLogger(__name__)
+
+REDACTED = "[REDACTED]"
+
+# Shannon entropy (bits per character) from which a quoted token counts as a secret
+DEFAULT_MIN_ENTROPY = 3.5
+
+
+class RedactionRule(NamedTuple):
+    """
+    One kind of secret
+
+    A match is one of the literal prefixes followed by the pattern. The
+    pattern may capture the secret itself in a group named "secret" (e.g.
+    the value of `password = ...`); otherwise the whole match is redacted.
+    With no prefixes the pattern stands alone. Rules with word_boundary
+    only match prefixes not preceded by a letter, digit or "_"; rules with
+    min_entropy only redact secrets at least that random, which keeps
+    ordinary words and identifiers readable.
+    """
+
+    name: str
+    pattern: str
+    prefixes: Tuple[str, ...] = ()
+    ignore_case: bool = False
+    word_boundary: bool = False
+    min_entropy: Optional[float] = None
+
+
+# Built-in rules, in priority order (earlier rules win at the same position)
+DEFAULT_RULES = (
+    # PEM header plus the base64 body lines that follow it (diff prefixed or
+    # not), so a key is covered even when the diff was cut before its footer
+    RedactionRule(
+        "private_key",
+        r"[A-Z0-9 ]*PRIVATE KEY( BLOCK)?-----"
+        r"(?:\n[+\- ]?(?:(?:[A-Za-z0-9+/=]{8,}|[A-Za-z-]+: [^\n]*)(?=\n|\Z)|(?=\n)))*"
+        r"(?:\n[+\- ]?-----END[A-Z0-9 ]*PRIVATE KEY( BLOCK)?-----)?",
+        prefixes=("-----BEGIN",),
+    ),
+    RedactionRule(
+        "aws_access_key_id",
+        r"[0-9A-Z]{16}\b",
+        prefixes=("AKIA", "ASIA", "ABIA", "ACCA"),
+        word_boundary=True,
+    ),
+    RedactionRule(
+        "aws_secret_access_key",
+        r"_?secret_?(?:access_?)?key[\"']?\s*[:=]\s*[\"']?(?P<secret>[a-z0-9/+=]{40})",
+        prefixes=("aws",),
+        ignore_case=True,
+    ),
+    RedactionRule(
+        "jwt",
+        r"[A-Za-z0-9_-]{8,}\.eyJ[A-Za-z0-9_-]{8,}(?:\.[A-Za-z0-9_-]*)?",
+        prefixes=("eyJ",),
+        word_boundary=True,
+    ),
+    RedactionRule(
+        "github_token",
+        r"(?:[pousr]_[A-Za-z0-9]{36,}|ithub_pat_[A-Za-z0-9_]{40,})",
+        prefixes=("gh",),
+        word_boundary=True,
+    ),
+    RedactionRule(
+        "slack_token", r"[abposr]-[A-Za-z0-9-]{10,}", prefixes=("xox",), word_boundary=True
+    ),
+    RedactionRule("google_api_key", r"[0-9A-Za-z_-]{35}", prefixes=("AIza",), word_boundary=True),
+    RedactionRule("url_password", r"[^/\s:@\"']+:(?P<secret>[^@\s/\"']+)@", prefixes=("://",)),
+    RedactionRule(
+        "assignment",
+        r"[\"']?\s*[:=](?!=)\s*[\"']?(?P<secret>[^\"'\s]+)",
+        prefixes=("password", "passwd", "api_key", "apikey", "access_key", "secret", "token"),
+        ignore_case=True,
+    ),
+    # Quoted random-looking tokens; snake- or kebab-case words and numbers
+    # (identifiers, migration names) are left alone however varied
+    RedactionRule(
+        "high_entropy",
+        r"(?!(?:[a-z]+|[0-9]+)(?:[_-](?:[a-z]+|[0-9]+))+[\"'])"
+        r"(?P<secret>(?=[A-Za-z+/=_-]*[0-9])(?=[0-9+/=_-]*[A-Za-z])[A-Za-z0-9+/=_-]{20,})[\"']",
+        prefixes=('"', "'"),
+        min_entropy=DEFAULT_MIN_ENTROPY,
+    ),
+)
+
+
+def shannon_entropy(text: str) -> float:
+    """
+    Shannon entropy of text in bits per character
+
+    Args:
+        text: Any text
+
+    Returns:
+        Entropy (0 for empty text)
+    """
+    if not text:
+        return 0.0
+    length = len(text)
+    return -sum(count / length * math.log2(count / length) for count in Counter(text).values())
+
+
+class _Scanner(NamedTuple):
+    """Compiled search for one prefix of a rule"""
+
+    rule_index: int
+    prefix: str  # Literal that must occur in the text ("" for none)
+    regex: re.Pattern
+    lowered: bool  # Runs on the lowercased text
+
+
+class Redactor:
+    """
+    Replace secrets in text with [REDACTED]
+
+    Each rule is compiled into one regex per literal prefix. A regex that
+    starts with a literal is searched for with the regex engine's fast
+    literal scan instead of being tried at every position (an alternation
+    of all rules would be, which is several times slower than scanning
+    once per prefix), and a prefix that does not occur in the text at all
+    skips its regex entirely. Case-insensitive rules run on one lowercased
+    copy of the text. The matches of all rules are merged and the output is
+    assembled in a single copy.
+    """
+
+    def __init__(self, rules: Iterable[RedactionRule] = DEFAULT_RULES):
+        """
+        Initialize redactor
+
+        Args:
+            rules: Rules to apply
+
+        Raises:
+            ValueError: If a rule's pattern is not a valid regular expression
+        """
+        self.rules: List[RedactionRule] = list(rules)
+        self._scanners: List[_Scanner] = []
+        self._fallback_scanners: List[_Scanner] = []
+
+        for index, rule in enumerate(self.rules):
+            try:
+                for prefix in rule.prefixes or ("",):
+                    if rule.ignore_case:
+                        prefix = prefix.lower()
+                    regex = re.escape(prefix)
+                    if rule.word_boundary and prefix:
+                        # Checked behind the prefix so the regex still starts with it
+                        regex += f"(?<![A-Za-z0-9_]{re.escape(prefix)})"
+                    regex += rule.pattern
+
+                    self._scanners.append(
+                        _Scanner(index, prefix, re.compile(regex), rule.ignore_case)
+                    )
+                    if rule.ignore_case:
+                        # For text whose lowercase form has a different length
+                        self._fallback_scanners.append(
+                            _Scanner(index, "", re.compile(regex, re.IGNORECASE), False)
+                        )
+            except re.error as e:
+                raise ValueError(f"Invalid redaction rule {rule.name!r}: {e}") from e
+
+    @classmethod
+    def from_config(cls, config: ConfigModel) -> "Redactor":
+        """
+        Create redactor from configuration
+
+        Args:
+            config: ConfigModel object
+
+        Returns:
+            Redactor instance
+
+        Raises:
+            ValueError: If a rule name is unknown or a pattern is invalid
+        """
+        rules = list(DEFAULT_RULES)
+        if config.redaction_rules is not None:
+            known = {rule.name for rule in DEFAULT_RULES}
+            unknown = set(config.redaction_rules) - known
+            if unknown:
+                raise ValueError(
+                    f"Unknown redaction rule(s): {', '.join(sorted(unknown))} "
+                    f"(available: {', '.join(sorted(known))})"
+                )
+            rules = [rule for rule in rules if rule.name in config.redaction_rules]
+
+        rules = [
+            (
+                rule._replace(min_entropy=config.redaction_min_entropy)
+                if rule.min_entropy is not None
+                else rule
+            )
+            for rule in rules
+        ]
+        rules.extend(
+            RedactionRule(name, pattern) for name, pattern in config.redaction_patterns.items()
+        )
+        return cls(rules)
+
+    def redact(self, text: str) -> str:
+        """
+        Replace the secrets in text
+
+        Args:
+            text: Diff or any other text
+
+        Returns:
+            Redacted text
+        """
+        if not text or not self._scanners:
+            return text
+
+        lowered = None
+        use_fallback = False
+        spans = []
+        for scanner in self._scanners:
+            target = text
+            if scanner.lowered:
+                if lowered is None:
+                    lowered = text.lower()
+                    # A few characters lowercase to two; offsets would not line up
+                    use_fallback = len(lowered) != len(text)
+                if use_fallback:
+                    continue
+                target = lowered
+
+            if scanner.prefix and scanner.prefix not in target:
+                continue
+            spans.extend(self._find(scanner, target))
+
+        if use_fallback:
+            for scanner in self._fallback_scanners:
+                spans.extend(self._find(scanner, text))
+
+        if not spans:
+            return text
+
+        # Leftmost match wins, then rule priority; overlapping matches are dropped
+        spans.sort()
+        parts = []
+        position = 0
+        for start, _, secret_start, secret_end in spans:
+            if start < position:
+                continue
+            parts.append(text[position:secret_start])
+            parts.append(REDACTED)
+            position = secret_end
+        parts.append(text[position:])
+        return "".join(parts)
+
+    def _find(self, scanner: _Scanner, target: str) -> Iterator[Tuple[int, int, int, int]]:
+        """(match start, rule index, secret start, secret end) of every secret found"""
+        rule = self.rules[scanner.rule_index]
+        has_secret_group = "secret" in scanner.regex.groupindex
+
+        for match in scanner.regex.finditer(target):
+            if has_secret_group and match.group("secret") is not None:
+                secret_start, secret_end = match.span("secret")
+            else:
+                secret_start, secret_end = match.span()
+
+            if (
+                rule.min_entropy is not None
+                and shannon_entropy(target[secret_start:secret_end]) < rule.min_entropy
+            ):
+                continue
+
+            logger.debug(f"Redacted {rule.name} ({secret_end - secret_start} characters)")
+            yield match.start(), scanner.rule_index, secret_start, secret_end
+
+
+_default_redactor: Optional[Redactor] = None
+
+
+def default_redactor() -> Redactor:
+    """Redactor with the built-in rules, compiled on first use"""
+    global _default_redactor
+    if _default_redactor is None:
+        _default_redactor = Redactor()
+    return _default_redactor
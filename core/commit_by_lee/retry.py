@@ -0,0 +1,72 @@
+"""Retry backoff and latency tracking for requests to Ollama"""
+
+import random
+import threading
+from collections import deque
+from typing import Optional
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Seconds to wait before a retry: exponential backoff with full jitter
+
+    The delay is drawn uniformly between 0 and base * 2^(attempt - 1),
+    capped at cap. The randomness keeps clients that failed together (a
+    server restart) from retrying in lockstep.
+
+    Args:
+        attempt: Retry number, starting at 1
+        base: Upper bound of the first delay
+        cap: Upper bound of any delay
+
+    Returns:
+        Delay in seconds
+    """
+    if base <= 0:
+        return 0.0
+    return random.uniform(0, min(cap, base * 2 ** max(attempt - 1, 0)))
+
+
+class LatencyWindow:
+    """
+    Recent latency samples, to derive percentiles from
+
+    Thread-safe; keeps the last size samples.
+    """
+
+    def __init__(self, size: int = 100, min_samples: int = 10):
+        """
+        Initialize window
+
+        Args:
+            size: Samples kept
+            min_samples: Samples needed before percentiles are reported
+        """
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float):
+        """Record a sample"""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Latency below which percent of the samples fall
+
+        Args:
+            percent: Percentile (0 - 100)
+
+        Returns:
+            Seconds, or None while there are fewer than min_samples samples
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+        return ordered[index]
@@ -1,53 +1,234 @@
 """Utility functions"""
 
 import re
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
+from .models.parsed import ParsedFile
+from .profiling import timed
+from .redaction import Redactor, default_redactor
 
-def clean_diff(diff: str, max_length: int = 5000) -> str:
+# Characters of diff that fit in a single commit message prompt
+MAX_DIFF_LENGTH = 5000
+
+
+# Average characters per token, for sizing read budgets from token budgets
+CHARS_PER_TOKEN = 4
+
+# Beyond any realistic text; hunks longer than this per budget token cannot fit
+MAX_CHARS_PER_TOKEN = 16
+
+# Rough model of BPE tokenizers: short letter runs, single digits,
+# punctuation, newlines and indentation runs are one token each; a single
+# space merges into the next token
+_TOKEN_PATTERN = re.compile(r'[A-Za-z]{1,6}|\d|[^\sA-Za-z\d]|\n|[ \t]{2,}')
+
+# Files whose changes say little about the intent of a commit
+_LOW_VALUE_FILE_PATTERN = re.compile(
+    r'(?:^|/)(?:package-lock\.json|npm-shrinkwrap\.json|yarn\.lock|pnpm-lock\.yaml|'
+    r'poetry\.lock|Pipfile\.lock|Cargo\.lock|composer\.lock|Gemfile\.lock|go\.sum)$|'
+    r'\.(?:lock|min\.js|min\.css|map|svg|snap)$'
+)
+_DOC_FILE_PATTERN = re.compile(
+    r'\.(?:md|rst|txt|adoc)$|(?:^|/)(?:docs?|LICENSE)(?:/|$)', re.IGNORECASE
+)
+
+# Changed lines that define or import something
+_SIGNATURE_PATTERN = re.compile(
+    r'^[+-]\s*(?:(?:export|public|private|protected|static|async|pub|abstract)\s+)*'
+    r'(?:def|class|function|func|fn|interface|struct|enum|trait|impl|type|import|from|module)\b',
+    re.MULTILINE
+)
+
+
+@timed("redact")
+def redact_sensitive(diff: str, redactor: Optional[Redactor] = None) -> str:
+    """
+    Replace API keys, passwords, tokens and other secrets with [REDACTED]
+
+    Args:
+        diff: Raw diff string
+        redactor: Redaction rules to apply (default: the built-in rules)
+
+    Returns:
+        Redacted diff
+    """
+    return (redactor or default_redactor()).redact(diff)
+
+
+def _truncate_at_line(text: str, max_length: int) -> str:
+    """Longest prefix of text that ends at a line boundary and fits max_length"""
+    if len(text) <= max_length:
+        return text
+    cut = text.rfind('\n', 0, max_length + 1)
+    return text[:cut] if cut != -1 else ""
+
+
+@timed("clean_diff")
+def clean_diff(
+    diff: str,
+    max_length: int = MAX_DIFF_LENGTH,
+    redactor: Optional[Redactor] = None
+) -> str:
     """
     Clean and truncate diff if necessary
 
+    The diff is truncated before redacting, so text that is thrown away is
+    never scanned.
+
     Args:
         diff: Raw diff string
         max_length: Maximum length (reduced to 5000 for better model performance)
+        redactor: Redaction rules to apply (default: the built-in rules)
 
     Returns:
         Cleaned diff
     """
-    # Remove sensitive data patterns (basic)
-    # Remove API keys, passwords, tokens
-    sensitive_patterns = [
-        r'password["\']?\s*[:=]\s*["\']?[^"\'\s]+',
-        r'api_key["\']?\s*[:=]\s*["\']?[^"\'\s]+',
-        r'token["\']?\s*[:=]\s*["\']?[^"\'\s]+',
-        r'secret["\']?\s*[:=]\s*["\']?[^"\'\s]+',
-    ]
-
-    cleaned = diff
-    for pattern in sensitive_patterns:
-        cleaned = re.sub(pattern, '[REDACTED]', cleaned, flags=re.IGNORECASE)
+    # Truncate at a line boundary
+    truncated = len(diff) > max_length
+    cleaned = redact_sensitive(_truncate_at_line(diff, max_length), redactor)
 
-    # Truncate if too long
+    # Short secrets grow when replaced with [REDACTED]
     if len(cleaned) > max_length:
-        # Try to truncate at a file boundary
-        lines = cleaned.split('\n')
-        result = []
-        current_length = 0
+        cleaned = _truncate_at_line(cleaned, max_length)
+        truncated = True
 
-        for line in lines:
-            if current_length + len(line) > max_length:
-                break
-            result.append(line)
-            current_length += len(line) + 1  # +1 for newline
-
-        cleaned = '\n'.join(result)
-        if len(cleaned) < max_length:
-            cleaned += "\n\n... (truncated for brevity)"
+    if truncated and len(cleaned) < max_length:
+        cleaned += "\n\n... (truncated for brevity)"
 
     return cleaned
 
 
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in text
+
+    A fast local approximation of BPE tokenizers that errs on the high side
+    for code, so prompts sized with it stay inside the context window.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Estimated token count
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _file_weight(path: str) -> float:
+    """Relative value of a file's changes for describing the commit"""
+    if _LOW_VALUE_FILE_PATTERN.search(path):
+        return 0.05
+    if _DOC_FILE_PATTERN.search(path):
+        return 0.5
+    return 1.0
+
+
+def _hunk_score(text: str) -> float:
+    """Information score of one hunk: changed lines, with signature changes counting extra"""
+    removed = []
+    added = []
+    for line in text.split('\n')[1:]:
+        if line.startswith('-'):
+            removed.append(line[1:])
+        elif line.startswith('+'):
+            added.append(line[1:])
+
+    score = len(removed) + len(added) + 4 * len(_SIGNATURE_PATTERN.findall(text))
+
+    # Whitespace-only changes (reindenting, trailing spaces) carry almost nothing
+    squeezed_removed = sorted(''.join(line.split()) for line in removed)
+    if squeezed_removed == sorted(''.join(line.split()) for line in added):
+        score *= 0.1
+
+    return score + 1
+
+
+@timed("pack_diff")
+def pack_diff(diff: str, files: List[ParsedFile], budget_tokens: int) -> Tuple[str, List[str]]:
+    """
+    Pack the most informative hunks of a diff into a token budget
+
+    Hunks are ranked by information density (score per token, with
+    lockfiles and generated files weighted down and definition changes
+    weighted up) and picked greedily until the budget is full. A file's
+    header is charged with its first picked hunk; files with no picked hunk
+    are listed by their "diff --git" line only (budget for listing all files
+    is reserved up front when it is small). The result keeps the original
+    file and hunk order.
+
+    Args:
+        diff: Raw diff string
+        files: Parsed files with offsets into diff
+        budget_tokens: Maximum estimated tokens of the packed diff
+
+    Returns:
+        Tuple of (packed diff, paths of files left out entirely)
+    """
+    headers = []
+    header_lines = []
+    candidates = []
+    for file_index, file in enumerate(files):
+        header_end = file.hunks[0].start if file.hunks else file.end
+        line_end = diff.find('\n', file.start, header_end)
+        line_end = line_end + 1 if line_end != -1 else header_end
+        headers.append(estimate_tokens(diff[file.start:header_end]))
+        header_lines.append(estimate_tokens(diff[file.start:line_end]))
+        weight = _file_weight(file.path)
+
+        if not file.hunks:
+            # Binary files, renames and mode changes: the header is the change
+            candidates.append((weight / max(headers[-1], 1), file_index, -1, 0))
+            continue
+
+        for hunk_index, hunk in enumerate(file.hunks):
+            if hunk.end - hunk.start > budget_tokens * MAX_CHARS_PER_TOKEN:
+                # Not worth decoding (e.g. from a memory-mapped diff) just to find out
+                continue
+            text = diff[hunk.start:hunk.end]
+            tokens = estimate_tokens(text)
+            score = weight * _hunk_score(text) / max(tokens, 1)
+            candidates.append((score, file_index, hunk_index, tokens))
+
+    candidates.sort(key=lambda candidate: (-candidate[0], candidate[1], candidate[2]))
+
+    # Listing every changed file is worth a quarter of the budget at most
+    list_all = sum(header_lines) <= budget_tokens // 4
+    used = sum(header_lines) if list_all else 0
+
+    selected = {}
+    for _, file_index, hunk_index, tokens in candidates:
+        cost = tokens
+        if file_index not in selected:
+            cost += headers[file_index] - (header_lines[file_index] if list_all else 0)
+        if used + cost > budget_tokens:
+            continue
+        used += cost
+        hunks = selected.setdefault(file_index, [])
+        if hunk_index >= 0:
+            hunks.append(hunk_index)
+
+    parts = []
+    omitted = []
+    for file_index, file in enumerate(files):
+        if file_index in selected:
+            header_end = file.hunks[0].start if file.hunks else file.end
+            parts.append(diff[file.start:header_end])
+            for hunk_index in sorted(selected[file_index]):
+                hunk = file.hunks[hunk_index]
+                parts.append(diff[hunk.start:hunk.end])
+            continue
+
+        if list_all or used + header_lines[file_index] <= budget_tokens:
+            if not list_all:
+                used += header_lines[file_index]
+            line_end = diff.find('\n', file.start, file.end)
+            parts.append(diff[file.start:line_end + 1 if line_end != -1 else file.end])
+        else:
+            omitted.append(file.path)
+
+    return ''.join(parts), omitted
+
+
 def chunk_diff_by_files(diff: str, max_files: int = 5) -> str:
     """
     Chunk diff to include only first N files for better model performance
@@ -72,6 +253,88 @@ def chunk_diff_by_files(diff: str, max_files: int = 5) -> str:
     return diff
 
 
+def group_diff_by_files(
+    diff: str,
+    files: List[ParsedFile],
+    max_chars: int = 4000,
+    max_groups: int = 16
+) -> Tuple[List[Tuple[List[str], str]], List[str]]:
+    """
+    Split diff into groups of whole files (or hunks of large files) for summarization
+
+    Small files are packed together until a group reaches max_chars; files
+    larger than that are split at hunk boundaries, repeating the file header
+    in every piece. Sizes come from the offsets, and text that could not fit
+    in a group anyway (past max_chars of a file or hunk) is never sliced, so
+    a huge file in a memory-mapped diff is not decoded as a whole.
+
+    Args:
+        diff: Raw diff string
+        files: Parsed files with offsets into diff
+        max_chars: Target size of a group
+        max_groups: Maximum number of groups
+
+    Returns:
+        Tuple of (groups as (paths, diff text), paths of files left out)
+    """
+    groups: List[Tuple[List[str], str]] = []
+    paths: List[str] = []
+    parts: List[str] = []
+    size = 0
+    remaining: List[ParsedFile] = []
+
+    def flush():
+        nonlocal paths, parts, size
+        if parts:
+            groups.append((paths, ''.join(parts)))
+        paths, parts, size = [], [], 0
+
+    for index, file in enumerate(files):
+        # One group past the limit is enough to know what gets left out
+        if len(groups) > max_groups:
+            remaining = files[index:]
+            break
+
+        length = file.end - file.start
+        if size and size + length > max_chars:
+            flush()
+
+        if length <= max_chars or len(file.hunks) < 2:
+            paths.append(file.path)
+            # One character past the limit keeps the group marked as truncated
+            parts.append(diff[file.start:min(file.end, file.start + max_chars + 1)])
+            size += length
+            continue
+
+        # Large file: one group per run of hunks, each with the file header
+        header = diff[file.start:file.hunks[0].start]
+        piece: List[str] = []
+        piece_size = len(header)
+        for hunk in file.hunks:
+            hunk_length = hunk.end - hunk.start
+            if piece and piece_size + hunk_length > max_chars:
+                groups.append(([file.path], header + ''.join(piece)))
+                piece, piece_size = [], len(header)
+                if len(groups) > max_groups:
+                    break
+            piece.append(diff[hunk.start:min(hunk.end, hunk.start + max_chars + 1)])
+            piece_size += hunk_length
+        groups.append(([file.path], header + ''.join(piece)))
+    else:
+        flush()
+
+    kept = groups[:max_groups]
+    kept_paths = {path for group_paths, _ in kept for path in group_paths}
+    omitted = []
+    dropped = [path for group_paths, _ in groups[max_groups:] for path in group_paths]
+    # Files still waiting for their group when the limit was hit are left out too
+    for path in dropped + paths + [f.path for f in remaining]:
+        if path not in kept_paths and path not in omitted:
+            omitted.append(path)
+
+    return kept, omitted
+
+
 def validate_commit_message(message: str) -> bool:
     """
     Validate commit message format
@@ -29,6 +29,9 @@ setup(
         "gitpython>=3.1.0",
     ],
     extras_require={
+        "async": [
+            "httpx>=0.25.0",
+        ],
         "dev": [
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
@@ -0,0 +1,74 @@
+"""Tests for the diff analysis result and its pydantic model"""
+
+import subprocess
+
+from commit_by_lee.diff_analyzer import DiffAnalyzer
+from commit_by_lee.mapped_diff import MappedDiff
+from commit_by_lee.models.parsed import ParsedDiff
+from commit_by_lee.models.schemas import CommitType, DiffAnalysis
+
+DIFF = (
+    "diff --git a/src/api/users.py b/src/api/users.py\n"
+    "index 587be6b..0f7bc76 100644\n"
+    "--- a/src/api/users.py\n"
+    "+++ b/src/api/users.py\n"
+    "@@ -1,2 +1,3 @@\n"
+    " def list_users():\n"
+    "-    return User.query\n"
+    "+    # Fix: avoid loading every user\n"
+    "+    return paginate(User.query)\n"
+    "diff --git a/src/api/teams.py b/src/api/teams.py\n"
+    "new file mode 100644\n"
+    "index 0000000..e69de29\n"
+    "--- /dev/null\n"
+    "+++ b/src/api/teams.py\n"
+    "@@ -0,0 +1 @@\n"
+    "+TEAMS = []\n"
+)
+
+
+def test_analyze_diff_returns_the_pydantic_model():
+    analysis = DiffAnalyzer().analyze_diff(DIFF)
+    assert isinstance(analysis, DiffAnalysis)
+    assert analysis.raw_diff == DIFF
+    assert (analysis.stats.files_changed, analysis.stats.insertions) == (2, 3)
+    assert analysis.stats.deletions == 1
+    assert [file.path for file in analysis.files] == ["src/api/users.py", "src/api/teams.py"]
+    assert analysis.suggested_scope == "api"
+    assert analysis.suggested_type == CommitType.FIX
+
+    parsed = DiffAnalyzer()._analyze_diff(DIFF)
+    assert isinstance(parsed, ParsedDiff)
+    assert parsed.to_model() == analysis
+
+
+def test_analyze_diff_of_empty_diff():
+    analysis = DiffAnalyzer().analyze_diff("")
+    assert isinstance(analysis, DiffAnalysis)
+    assert analysis.files == []
+    assert analysis.stats.files_changed == 0
+
+
+def test_model_round_trip():
+    analysis = DiffAnalyzer().analyze_diff(DIFF)
+    assert ParsedDiff.from_model(analysis).to_model() == analysis
+
+
+def test_mapped_diff_offsets_become_character_offsets(tmp_path):
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / "café.txt").write_text("naïve résumé\n" * 3)
+    (tmp_path / "日本.md").write_text("# 見出し\n本文\n")
+    (tmp_path / "plain.py").write_text("x = 1\n")
+    subprocess.run(["git", "add", "-A"], cwd=tmp_path, check=True)
+
+    analyzer = DiffAnalyzer(str(tmp_path))
+    spilled = analyzer.analyze_staged(spill=True)
+    assert isinstance(spilled.raw_diff, MappedDiff)
+    model = spilled.to_model()
+
+    assert model == analyzer.analyze_staged().to_model()
+    for file in model.files:
+        assert model.raw_diff[file.start : file.end].startswith("diff --git ")
+        for hunk in file.hunks:
+            assert model.raw_diff[hunk.start : hunk.end].startswith(hunk.header + "\n")
+    assert model.files[-1].end == len(model.raw_diff)
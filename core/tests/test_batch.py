@@ -0,0 +1,213 @@
+"""Tests for generating messages for a range of commits"""
+
+import io
+import json
+import random
+import subprocess
+import threading
+import time
+
+import pytest
+
+from commit_by_lee.batch import (
+    BatchResult,
+    MsgFilterScriptWriter,
+    format_jsonl,
+    generate_for_commits,
+)
+from commit_by_lee.diff_analyzer import DiffAnalyzer
+from commit_by_lee.models.parsed import CommitDiff, ParsedDiff, ParsedStats
+from commit_by_lee.models.schemas import CommitMessage, CommitType
+
+
+def _git(repo, *args) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def _commit(repo, message: str, files):
+    for path, text in files.items():
+        (repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (repo / path).write_text(text)
+        _git(repo, "add", path)
+    _git(repo, "commit", "-q", "--allow-empty", "-m", message)
+    return _git(repo, "rev-parse", "HEAD").strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _commit(tmp_path, "initial", {"README.md": "readme\n", "日.txt": "one\n"})
+    return tmp_path
+
+
+def _commit_diff(sha: str, raw_diff: str = "diff --git a/a b/a\n") -> CommitDiff:
+    return CommitDiff(sha, f"subject of {sha}", ParsedDiff(raw_diff, ParsedStats(1, 2, 3)))
+
+
+class _FakeGenerator:
+    """Answers after a random delay and records how many calls overlap"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.random = random.Random(0)
+
+    def generate(self, diff, analysis, style):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            delay = self.random.uniform(0, 0.01)
+        time.sleep(delay)
+        with self.lock:
+            self.running -= 1
+        return CommitMessage(type=CommitType.FEAT, subject=f"reword {diff.strip()}")
+
+
+def test_iter_commits_newest_first(repo):
+    first = _commit(repo, "add app", {"src/app.py": "a = 1\nb = 2\n"})
+    second = _commit(repo, "change app", {"src/app.py": "a = 1\nb = 3\nc = 4\n"})
+
+    commits = list(DiffAnalyzer(str(repo)).iter_commits("HEAD~2.."))
+    assert [(commit.sha, commit.subject) for commit in commits] == [
+        (second, "change app"),
+        (first, "add app"),
+    ]
+    stats = commits[0].analysis.stats
+    assert (stats.files_changed, stats.insertions, stats.deletions) == (1, 2, 1)
+    assert stats.files == ["src/app.py"]
+    assert [file.path for file in commits[0].analysis.files] == ["src/app.py"]
+
+
+def test_iter_commits_skips_merges(repo):
+    _git(repo, "checkout", "-q", "-b", "side")
+    side = _commit(repo, "side", {"side.txt": "side\n"})
+    _git(repo, "checkout", "-q", "main")
+    main = _commit(repo, "main", {"main.txt": "main\n"})
+    _git(repo, "merge", "-q", "--no-edit", "side")
+
+    shas = [commit.sha for commit in DiffAnalyzer(str(repo)).iter_commits("HEAD~1..HEAD")]
+    assert shas == [side]
+    shas = {commit.sha for commit in DiffAnalyzer(str(repo)).iter_commits("HEAD~2..HEAD")}
+    assert shas == {side, main}
+
+
+def test_iter_commits_cut_patch_keeps_exact_stats(repo):
+    _commit(repo, "big", {f"file{index}.txt": "line\n" * 50 for index in range(5)})
+    (commit,) = DiffAnalyzer(str(repo)).iter_commits("HEAD~1..", max_chars=500)
+
+    assert commit.analysis.truncated
+    assert len(commit.analysis.raw_diff) <= 500
+    stats = commit.analysis.stats
+    assert (stats.files_changed, stats.insertions) == (5, 250)
+    assert len(stats.files) == 5
+
+
+def test_iter_commits_unquotes_paths(repo):
+    _git(repo, "mv", "日.txt", "月.txt")
+    (repo / "sp ace.txt").write_text("x\n")
+    (repo / "dir").mkdir()
+    (repo / "dir" / "café.txt").write_text("y\n")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "rename")
+
+    # Paths of a cut patch come from git's numstat lines
+    for max_chars in (100, 10_000):
+        (commit,) = DiffAnalyzer(str(repo)).iter_commits("HEAD~1..", max_chars=max_chars)
+        assert commit.analysis.truncated == (max_chars == 100)
+        assert sorted(commit.analysis.stats.files) == ["dir/café.txt", "sp ace.txt", "月.txt"]
+
+
+@pytest.mark.parametrize("jobs", [1, 3, 8])
+def test_results_keep_input_order(jobs):
+    commits = [
+        _commit_diff(f"{index:040x}", raw_diff=f"diff --git a/{index} b/{index}\n")
+        for index in range(40)
+    ]
+    generator = _FakeGenerator()
+    results = list(generate_for_commits(generator, commits, jobs=jobs))
+
+    assert [result.commit for result in results] == commits
+    # Each message is the one generated for its commit
+    for result in results:
+        assert result.message.subject == f"reword {result.commit.analysis.raw_diff.strip()}"
+    assert generator.max_running <= jobs
+
+
+def test_input_is_pulled_lazily():
+    pulled = []
+
+    def commits():
+        for index in range(100):
+            pulled.append(index)
+            yield _commit_diff(f"{index:040x}")
+
+    results = generate_for_commits(_FakeGenerator(), commits(), jobs=2)
+    next(results)
+    # The oldest result is waited on once 2 * jobs commits are in flight
+    assert len(pulled) <= 4
+    results.close()
+
+
+def test_empty_commit_is_skipped():
+    generator = _FakeGenerator()
+    (result,) = generate_for_commits(generator, [_commit_diff("0" * 40, raw_diff="")])
+    assert result.message is None
+    assert generator.max_running == 0
+
+
+def test_format_jsonl():
+    commit = _commit_diff("a" * 40)
+    message = CommitMessage(type=CommitType.FIX, scope="ui", subject="naïve fix")
+    record = json.loads(format_jsonl(BatchResult(commit, message)))
+    assert record == {
+        "commit": "a" * 40,
+        "original_subject": f"subject of {'a' * 40}",
+        "message": "fix(ui): naïve fix",
+        "files_changed": 1,
+        "insertions": 2,
+        "deletions": 3,
+        "truncated": False,
+    }
+    assert "naïve" in format_jsonl(BatchResult(commit, message))
+    assert json.loads(format_jsonl(BatchResult(commit, None)))["message"] is None
+
+
+def _run_script(script: str, sha: str, old_message: str) -> str:
+    return subprocess.run(
+        ["sh", "-c", script],
+        input=old_message,
+        env={"GIT_COMMIT": sha, "PATH": "/usr/bin:/bin"},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def test_msg_filter_script():
+    reworded = _commit_diff("a" * 40)
+    skipped = _commit_diff("b" * 40)
+    message = CommitMessage(
+        type=CommitType.FEAT,
+        subject="quote 'it' and $HOME `id`",
+        body="Ends with the delimiter name\nCOMMIT_BY_LEE_MESSAGE\n",
+    )
+
+    stream = io.StringIO()
+    with MsgFilterScriptWriter(stream, "main..feature") as writer:
+        writer.write(BatchResult(reworded, message))
+        writer.write(BatchResult(skipped, None))
+    script = stream.getvalue()
+
+    assert script.startswith("#!/bin/sh\n")
+    assert "-- main..feature" in script
+    assert _run_script(script, "a" * 40, "old\n") == message.format_conventional() + "\n"
+    # Commits without a new message keep the old one
+    assert _run_script(script, "b" * 40, "old message\n") == "old message\n"
+    assert _run_script(script, "c" * 40, "other\n") == "other\n"
@@ -0,0 +1,148 @@
+"""Tests for the on-disk message cache"""
+
+import itertools
+
+import pytest
+
+from commit_by_lee import cache as cache_module
+from commit_by_lee.cache import MessageCache
+from commit_by_lee.models.schemas import CommitMessage, CommitType
+
+KEY_ARGS = dict(
+    cleaned_diff="diff --git a/a.py b/a.py\n+x\n",
+    model="qwen3:4b",
+    language="en",
+    style="conventional",
+    temperature=0.3,
+    template_version=1,
+)
+
+
+class _Clock:
+    """Stand-in for the time module whose clock advances on every call"""
+
+    def __init__(self):
+        self._ticks = itertools.count(1000)
+
+    def time(self) -> float:
+        return float(next(self._ticks))
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    # Entries written in the same instant would tie in LRU order
+    monkeypatch.setattr(cache_module, "time", _Clock())
+
+
+def _message(subject: str) -> CommitMessage:
+    return CommitMessage(type=CommitType.FEAT, subject=subject)
+
+
+def test_key_is_stable():
+    assert MessageCache.make_key(**KEY_ARGS) == MessageCache.make_key(**KEY_ARGS)
+    assert len(MessageCache.make_key(**KEY_ARGS)) == 64
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"cleaned_diff": KEY_ARGS["cleaned_diff"] + "+y\n"},
+        {"model": "llama3"},
+        {"language": "id"},
+        {"style": "simple"},
+        {"temperature": 0.7},
+        {"template_version": 2},
+        {"mode": "map-reduce"},
+    ],
+)
+def test_key_covers_every_setting(change):
+    assert MessageCache.make_key(**{**KEY_ARGS, **change}) != MessageCache.make_key(**KEY_ARGS)
+
+
+def test_key_normalizes_temperature():
+    assert MessageCache.make_key(**{**KEY_ARGS, "temperature": 1}) == MessageCache.make_key(
+        **{**KEY_ARGS, "temperature": 1.0}
+    )
+
+
+def test_key_parts_are_separated():
+    # Moving characters between two settings gives a different key
+    first = MessageCache.make_key(**{**KEY_ARGS, "model": "ab", "language": "c"})
+    second = MessageCache.make_key(**{**KEY_ARGS, "model": "a", "language": "bc"})
+    assert first != second
+
+
+def test_round_trip(tmp_path):
+    cache = MessageCache(cache_dir=tmp_path)
+    assert cache.get("key") is None
+
+    message = CommitMessage(
+        type=CommitType.FIX, scope="cli", subject="handle empty diffs", body="Details"
+    )
+    cache.put("key", message)
+    assert cache.get("key") == message
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"]) == (1, 1)
+
+
+def test_request_metadata_is_not_cached(tmp_path):
+    cache = MessageCache(cache_dir=tmp_path)
+    cache.put(
+        "key", _message("add cache").model_copy(update={"context": [1, 2], "heuristic": True})
+    )
+    cached = cache.get("key")
+    assert cached.context is None
+    assert not cached.heuristic
+
+
+def test_evicts_least_recently_used_entry(tmp_path):
+    cache = MessageCache(cache_dir=tmp_path, max_entries=2)
+    cache.put("a", _message("a"))
+    cache.put("b", _message("b"))
+    # Reading a makes b the least recently used entry
+    assert cache.get("a") is not None
+    cache.put("c", _message("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["entries"] == 2
+
+
+def test_evicts_to_size_limit(tmp_path):
+    entry_size = len(_message("x" * 100).model_dump_json())
+    cache = MessageCache(cache_dir=tmp_path, max_size_mb=2.5 * entry_size / (1024 * 1024))
+    for name in "abcd":
+        cache.put(name, _message(name * 100))
+
+    assert [cache.get(name) is not None for name in "abcd"] == [False, False, True, True]
+    assert cache.stats()["size_bytes"] <= cache.max_size_bytes
+
+
+def test_clear(tmp_path):
+    cache = MessageCache(cache_dir=tmp_path)
+    cache.put("a", _message("a"))
+    cache.put("b", _message("b"))
+    assert cache.clear() == 2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_unusable_cache_dir_is_a_miss(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    cache = MessageCache(cache_dir=blocker / "sub")
+
+    assert cache.get("key") is None
+    cache.put("key", _message("a"))
+    assert cache.get("key") is None
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = MessageCache(cache_dir=tmp_path)
+    cache.put("key", _message("a"))
+    with cache._connect() as conn:
+        conn.execute("UPDATE messages SET message = 'not json'")
+    conn.close()
+    assert cache.get("key") is None
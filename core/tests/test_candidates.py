@@ -0,0 +1,89 @@
+"""Tests for generating and ranking alternative commit messages"""
+
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.llm_generator import CommitMessageGenerator, rank_candidates
+from commit_by_lee.models.parsed import ParsedDiff, ParsedStats
+from commit_by_lee.models.schemas import CommitMessage, CommitType, Language
+from commit_by_lee.ollama_client import OllamaClient
+
+DIFF = (
+    "diff --git a/src/api/users.py b/src/api/users.py\n"
+    "index 587be6b..0f7bc76 100644\n"
+    "--- a/src/api/users.py\n"
+    "+++ b/src/api/users.py\n"
+    "@@ -1,1 +1,2 @@\n"
+    " def list_users():\n"
+    "+    return paginate(User.query)\n"
+)
+
+
+def _analysis(suggested_type=None, suggested_scope=None) -> ParsedDiff:
+    return ParsedDiff(
+        "",
+        ParsedStats(1, 1, 0),
+        suggested_type=suggested_type,
+        suggested_scope=suggested_scope,
+    )
+
+
+def _candidate(type: CommitType, subject: str, scope=None, response=None):
+    message = CommitMessage(type=type, scope=scope, subject=subject)
+    return (response or message.format_conventional(), message)
+
+
+def test_valid_raw_response_ranks_first():
+    parsed = _candidate(CommitType.FEAT, "add pagination to user list", response="Here you go")
+    valid = _candidate(CommitType.FEAT, "paginate the user list endpoint")
+    assert rank_candidates([parsed, valid], _analysis()) == [valid[1], parsed[1]]
+
+
+def test_short_and_overlong_subjects_rank_lower():
+    short = _candidate(CommitType.FIX, "fix it")
+    long = _candidate(CommitType.FIX, "handle " + "a very long explanation " * 5)
+    fine = _candidate(CommitType.FIX, "handle empty user lists")
+    assert rank_candidates([long, short, fine], _analysis()) == [fine[1], short[1], long[1]]
+
+
+def test_agreeing_with_the_analysis_ranks_higher():
+    analysis = _analysis(CommitType.FEAT, "API")
+    other = _candidate(CommitType.REFACTOR, "paginate the user list")
+    typed = _candidate(CommitType.FEAT, "paginate the user list")
+    scoped = _candidate(CommitType.FEAT, "paginate the user list", scope="api")
+    assert rank_candidates([other, typed, scoped], analysis) == [scoped[1], typed[1], other[1]]
+
+
+def test_ties_keep_their_order():
+    first = _candidate(CommitType.FEAT, "paginate the user list")
+    second = _candidate(CommitType.FEAT, "add paging to user listing")
+    assert rank_candidates([first, second], _analysis()) == [first[1], second[1]]
+    assert rank_candidates([second, first], _analysis()) == [second[1], first[1]]
+
+
+def test_duplicates_are_dropped():
+    best = _candidate(CommitType.FEAT, "Paginate the user list", scope="API")
+    duplicate = _candidate(
+        CommitType.FEAT, "paginate  the user list.", scope="api", response="noise"
+    )
+    other_type = _candidate(CommitType.FIX, "paginate the user list", scope="api")
+    ranked = rank_candidates([duplicate, best, other_type], _analysis())
+    assert ranked == [best[1], other_type[1]]
+
+
+def test_generate_candidates_requests_count_completions():
+    with MockOllamaServer() as server:
+        with OllamaClient(host=server.url) as client:
+            generator = CommitMessageGenerator(client, language=Language.ENGLISH)
+            candidates = generator.generate_candidates(DIFF, count=4)
+        assert server.requests == 4
+    # The mock answers every seed alike
+    assert len(candidates) == 1
+    assert not candidates[0].heuristic
+
+
+def test_generate_candidates_falls_back_when_every_request_fails():
+    with MockOllamaServer(error_status=400) as server:
+        with OllamaClient(host=server.url) as client:
+            generator = CommitMessageGenerator(client, language=Language.ENGLISH)
+            (candidate,) = generator.generate_candidates(DIFF, count=3)
+        assert server.requests == 3
+    assert candidate.subject
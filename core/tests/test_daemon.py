@@ -0,0 +1,178 @@
+"""Tests for the daemon protocol"""
+
+import json
+import socket
+import subprocess
+import threading
+import time
+
+import pytest
+
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.config import Config
+from commit_by_lee.daemon import CommitDaemon
+from commit_by_lee.daemon_client import (
+    MAX_REQUEST_BYTES,
+    PROTOCOL_VERSION,
+    DaemonError,
+    DaemonUnavailable,
+    ping,
+    send_request,
+)
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    _git(path, "init", "-q")
+    (path / "app.py").write_text("def main():\n    return 0\n")
+    _git(path, "add", "app.py")
+    return path
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockOllamaServer() as server:
+        yield server
+
+
+def _start(path, server):
+    """Daemon serving from a background thread, talking to the mock server"""
+    config_path = path / "config.yaml"
+    config_path.write_text(f"ollama_host: {server.url}\ncache_enabled: false\nlanguage: en\n")
+    daemon = CommitDaemon(socket_path=path / "daemon.sock", config=Config(config_path))
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if ping(daemon.socket_path) is not None:
+            break
+        time.sleep(0.02)
+    return daemon, thread
+
+
+@pytest.fixture(scope="module")
+def daemon(tmp_path_factory, server):
+    daemon, thread = _start(tmp_path_factory.mktemp("daemon"), server)
+    yield daemon
+    daemon.shutdown()
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def requests(server):
+    """Number of requests the mock server gets during the test"""
+    start = server.requests
+    return lambda: server.requests - start
+
+
+def _raw(daemon, line: bytes):
+    """Send one raw request line and return the decoded reply lines"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(str(daemon.socket_path))
+        sock.sendall(line)
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    return [json.loads(reply) for reply in data.splitlines()]
+
+
+def test_ping(daemon):
+    reply = ping(daemon.socket_path)
+    assert reply["ok"]
+    assert reply["requests"] >= 1
+
+
+def test_generate(daemon, repo, requests):
+    reply = send_request({"action": "generate", "repo": str(repo)}, daemon.socket_path)
+    assert reply["ok"]
+    assert reply["text"]
+    assert reply["message"]["subject"]
+    assert reply["stats"] == {"files_changed": 1, "insertions": 2, "deletions": 0, "excluded": 0}
+    assert requests() == 1
+
+
+def test_generate_streams_tokens(daemon, repo):
+    tokens = []
+    reply = send_request(
+        {"action": "generate", "repo": str(repo), "stream": True},
+        daemon.socket_path,
+        on_token=tokens.append,
+    )
+    assert reply["ok"]
+    assert tokens
+    assert reply["text"].split("\n")[0] in tokens[-1]
+
+
+def test_generate_candidates(daemon, repo, requests):
+    reply = send_request(
+        {"action": "generate", "repo": str(repo), "candidates": 3}, daemon.socket_path
+    )
+    assert reply["ok"]
+    # The mock answers every seed alike, so duplicates are dropped
+    assert [candidate["text"] for candidate in reply["candidates"]] == [reply["text"]]
+    assert requests() == 3
+
+
+@pytest.mark.parametrize("count", [0.5, 11, -1, "3", True])
+def test_generate_rejects_candidates_out_of_range(daemon, repo, requests, count):
+    with pytest.raises(DaemonError, match="candidates must be between 1 and 10"):
+        send_request(
+            {"action": "generate", "repo": str(repo), "candidates": count}, daemon.socket_path
+        )
+    assert requests() == 0
+
+
+def test_nothing_staged(daemon, tmp_path):
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    _git(empty, "init", "-q")
+    reply = send_request({"action": "generate", "repo": str(empty)}, daemon.socket_path)
+    assert reply == {"ok": True, "message": None}
+
+
+def test_missing_repo(daemon, tmp_path):
+    with pytest.raises(DaemonError, match="Not a directory"):
+        send_request({"action": "generate", "repo": str(tmp_path / "missing")}, daemon.socket_path)
+
+
+def test_unknown_action(daemon):
+    with pytest.raises(DaemonError, match="Unknown action: dance"):
+        send_request({"action": "dance"}, daemon.socket_path)
+
+
+def test_unsupported_version(daemon):
+    request = {"action": "ping", "version": PROTOCOL_VERSION + 1}
+    assert _raw(daemon, json.dumps(request).encode() + b"\n") == [
+        {"ok": False, "error": f"Unsupported protocol version {PROTOCOL_VERSION + 1}"}
+    ]
+
+
+@pytest.mark.parametrize(
+    "line, error",
+    [
+        (b"not json\n", "Expecting value"),
+        (b"[1, 2]\n", "Request must be a JSON object"),
+        (b" " * (MAX_REQUEST_BYTES + 1) + b"\n", "Request too large"),
+    ],
+)
+def test_malformed_request(daemon, line, error):
+    (reply,) = _raw(daemon, line)
+    assert not reply["ok"]
+    assert error in reply["error"]
+
+
+def test_shutdown(tmp_path, server):
+    daemon, thread = _start(tmp_path, server)
+    assert send_request({"action": "shutdown"}, daemon.socket_path) == {"ok": True}
+    thread.join(timeout=5)
+    assert not daemon.socket_path.exists()
+    with pytest.raises(DaemonUnavailable):
+        send_request({"action": "ping"}, daemon.socket_path)
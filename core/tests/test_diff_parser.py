@@ -0,0 +1,276 @@
+"""Tests for the single-pass diff parser"""
+
+from commit_by_lee.diff_parser import DiffParser, parse_diff
+from commit_by_lee.models.schemas import FileStatus
+
+MODIFIED = (
+    "diff --git a/src/app.py b/src/app.py\n"
+    "index 587be6b..0f7bc76 100644\n"
+    "--- a/src/app.py\n"
+    "+++ b/src/app.py\n"
+    "@@ -1,3 +1,4 @@\n"
+    " import os\n"
+    "-import sys\n"
+    "+import re\n"
+    "+import sys\n"
+    " \n"
+    "@@ -10 +11,2 @@ def main():\n"
+    "-    return 1\n"
+    "+    run()\n"
+    "+    return 0\n"
+)
+
+ADDED = (
+    "diff --git a/docs/new.md b/docs/new.md\n"
+    "new file mode 100644\n"
+    "index 0000000..e69de29\n"
+    "--- /dev/null\n"
+    "+++ b/docs/new.md\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+# New\n"
+    "+text\n"
+)
+
+DELETED = (
+    "diff --git a/old.txt b/old.txt\n"
+    "deleted file mode 100644\n"
+    "index e69de29..0000000\n"
+    "--- a/old.txt\n"
+    "+++ /dev/null\n"
+    "@@ -1,2 +0,0 @@\n"
+    "-one\n"
+    "-two\n"
+)
+
+RENAMED = (
+    "diff --git a/lib/util.py b/lib/helpers.py\n"
+    "similarity index 90%\n"
+    "rename from lib/util.py\n"
+    "rename to lib/helpers.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/lib/util.py\n"
+    "+++ b/lib/helpers.py\n"
+    "@@ -1 +1 @@\n"
+    "-def util(): pass\n"
+    "+def helper(): pass\n"
+)
+
+PURE_RENAME = (
+    "diff --git a/a.txt b/b.txt\n"
+    "similarity index 100%\n"
+    "rename from a.txt\n"
+    "rename to b.txt\n"
+)
+
+BINARY = (
+    "diff --git a/logo.png b/logo.png\n"
+    "index bdc955b..8835708 100644\n"
+    "Binary files a/logo.png and b/logo.png differ\n"
+)
+
+# As git prints them with core.quotePath (the default)
+QUOTED_RENAME = (
+    'diff --git "a/caf\\303\\251.txt" "b/na\\303\\257ve.txt"\n'
+    "similarity index 100%\n"
+    'rename from "caf\\303\\251.txt"\n'
+    'rename to "na\\303\\257ve.txt"\n'
+)
+
+QUOTED_MODIFIED = (
+    'diff --git "a/r\\303\\251sum\\303\\251.md" "b/r\\303\\251sum\\303\\251.md"\n'
+    "index 587be6b..0f7bc76 100644\n"
+    '--- "a/r\\303\\251sum\\303\\251.md"\n'
+    '+++ "b/r\\303\\251sum\\303\\251.md"\n'
+    "@@ -1 +1 @@\n"
+    "-x\n"
+    "+y\n"
+)
+
+SPACED = (
+    "diff --git a/with space.txt b/with space.txt\n"
+    "index 587be6b..0f7bc76 100644\n"
+    "--- a/with space.txt\t\n"
+    "+++ b/with space.txt\t\n"
+    "@@ -1 +1,2 @@\n"
+    "-x\n"
+    "+a\n"
+    "+c\n"
+)
+
+# With core.quotePath=false, non-ASCII paths are printed as they are
+UNQUOTED_UNICODE = (
+    "diff --git a/données/été.csv b/données/été.csv\n"
+    "new file mode 100644\n"
+    "index 0000000..e69de29\n"
+    "--- /dev/null\n"
+    "+++ b/données/été.csv\n"
+    "@@ -0,0 +1 @@\n"
+    "+a,b\n"
+)
+
+
+def _only(diff: str):
+    files = parse_diff(diff).files
+    assert len(files) == 1
+    return files[0]
+
+
+def test_modified_file_counts_and_hunks():
+    file = _only(MODIFIED)
+    assert file.path == "src/app.py"
+    assert file.old_path is None
+    assert file.status == FileStatus.MODIFIED
+    assert not file.binary
+    assert (file.insertions, file.deletions) == (4, 2)
+
+    first, second = file.hunks
+    assert (first.old_start, first.old_lines, first.new_start, first.new_lines) == (1, 3, 1, 4)
+    assert (first.insertions, first.deletions) == (2, 1)
+    # Omitted line counts default to 1
+    assert (second.old_start, second.old_lines, second.new_start, second.new_lines) == (
+        10,
+        1,
+        11,
+        2,
+    )
+    assert (second.insertions, second.deletions) == (2, 1)
+
+
+def test_added_and_deleted_files():
+    added, deleted = parse_diff(ADDED + DELETED).files
+    assert added.path == "docs/new.md"
+    assert added.old_path is None
+    assert added.status == FileStatus.ADDED
+    assert (added.insertions, added.deletions) == (2, 0)
+
+    assert deleted.path == "old.txt"
+    assert deleted.status == FileStatus.DELETED
+    assert (deleted.insertions, deleted.deletions) == (0, 2)
+
+
+def test_renamed_file():
+    file = _only(RENAMED)
+    assert file.path == "lib/helpers.py"
+    assert file.old_path == "lib/util.py"
+    assert file.status == FileStatus.RENAMED
+    assert (file.insertions, file.deletions) == (1, 1)
+
+
+def test_pure_rename_has_no_hunks():
+    file = _only(PURE_RENAME)
+    assert (file.path, file.old_path, file.status) == ("b.txt", "a.txt", FileStatus.RENAMED)
+    assert file.hunks == []
+    assert (file.insertions, file.deletions) == (0, 0)
+
+
+def test_copied_file():
+    file = _only(
+        "diff --git a/a.py b/b.py\n" "similarity index 100%\n" "copy from a.py\n" "copy to b.py\n"
+    )
+    assert (file.path, file.old_path, file.status) == ("b.py", "a.py", FileStatus.COPIED)
+
+
+def test_binary_file():
+    file = _only(BINARY)
+    assert file.path == "logo.png"
+    assert file.binary
+    assert file.hunks == []
+    assert (file.insertions, file.deletions) == (0, 0)
+
+
+def test_git_binary_patch():
+    file = _only(
+        "diff --git a/font.woff b/font.woff\n"
+        "new file mode 100644\n"
+        "index 0000000..8835708\n"
+        "GIT binary patch\n"
+        "literal 2\n"
+        "Jc${NkU;qFB0RR91\n"
+        "\n"
+        "literal 0\n"
+        "HcmV?d00001\n"
+    )
+    assert file.path == "font.woff"
+    assert file.status == FileStatus.ADDED
+    assert file.binary
+
+
+def test_quoted_unicode_rename():
+    file = _only(QUOTED_RENAME)
+    assert file.path == "naïve.txt"
+    assert file.old_path == "café.txt"
+    assert file.status == FileStatus.RENAMED
+
+
+def test_quoted_unicode_path():
+    file = _only(QUOTED_MODIFIED)
+    assert file.path == "résumé.md"
+    assert file.old_path is None
+    assert (file.insertions, file.deletions) == (1, 1)
+
+
+def test_path_with_spaces():
+    file = _only(SPACED)
+    assert file.path == "with space.txt"
+    assert file.old_path is None
+    assert (file.insertions, file.deletions) == (2, 1)
+
+
+def test_unquoted_unicode_path():
+    file = _only(UNQUOTED_UNICODE)
+    assert file.path == "données/été.csv"
+    assert file.status == FileStatus.ADDED
+
+
+def test_file_and_hunk_offsets():
+    diff = MODIFIED + BINARY + RENAMED
+    modified, binary, renamed = parse_diff(diff).files
+
+    assert (modified.start, modified.end) == (0, len(MODIFIED))
+    assert (binary.start, binary.end) == (len(MODIFIED), len(MODIFIED) + len(BINARY))
+    assert (renamed.start, renamed.end) == (len(MODIFIED) + len(BINARY), len(diff))
+    for file in (modified, binary, renamed):
+        assert diff.startswith("diff --git ", file.start)
+
+    first, second = modified.hunks
+    assert first.start == diff.index("@@ -1,3")
+    assert first.end == second.start == diff.index("@@ -10")
+    assert second.end == modified.end
+    assert first.header(diff) == "@@ -1,3 +1,4 @@"
+    assert second.header(diff) == "@@ -10 +11,2 @@ def main():"
+    assert renamed.hunks[0].start == diff.index("@@ -1 +1 @@", renamed.start)
+
+
+def test_offsets_with_non_ascii_content():
+    diff = UNQUOTED_UNICODE + MODIFIED
+    _, modified = parse_diff(diff).files
+    assert modified.start == len(UNQUOTED_UNICODE)
+    assert diff[modified.hunks[0].start :].startswith("@@ -1,3 +1,4 @@")
+
+
+def test_crlf_lines():
+    file = _only(MODIFIED.replace("\n", "\r\n"))
+    assert file.path == "src/app.py"
+    assert (file.insertions, file.deletions) == (4, 2)
+    assert file.hunks[1].header(MODIFIED.replace("\n", "\r\n")) == "@@ -10 +11,2 @@ def main():"
+
+
+def test_empty_diff():
+    assert parse_diff("").files == []
+
+
+def test_incremental_feed_matches_single_pass():
+    diff = MODIFIED + ADDED + QUOTED_RENAME + BINARY + DELETED + SPACED
+    expected = parse_diff(diff).files
+
+    lines = diff.splitlines(keepends=True)
+    for size in (1, 2, 5):
+        parser = DiffParser()
+        for index in range(0, len(lines), size):
+            parser.feed("".join(lines[index : index + size]))
+        assert parser.finish() == expected
+
+
+def test_keywords():
+    parser = parse_diff(MODIFIED + RENAMED, keywords={"fix": ("bug",), "imports": ("import re",)})
+    assert parser.matched_keywords == {"imports"}
@@ -0,0 +1,227 @@
+"""Tests for routing and circuit breaking across Ollama servers"""
+
+import socket
+
+import pytest
+
+from commit_by_lee import host_pool
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.host_pool import HostPool
+from commit_by_lee.ollama_client import OllamaClient
+
+
+class _Clock:
+    """Stand-in for the time module with a clock moved by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(host_pool, "time", clock)
+    return clock
+
+
+def _unused_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def _fail(pool: HostPool, backend, times: int):
+    for _ in range(times):
+        assert pool.acquire(exclude=[b for b in pool.backends if b is not backend]) is backend
+        pool.release(backend, ok=False)
+
+
+def test_requires_a_host():
+    with pytest.raises(ValueError):
+        HostPool([])
+
+
+def test_duplicate_hosts_are_merged():
+    pool = HostPool(["http://a/", "http://a/", "http://b"])
+    assert [backend.host for backend in pool.backends] == ["http://a", "http://b"]
+    assert pool.backends[1].api_base == "http://b/api"
+
+
+def test_least_outstanding_then_loaded_then_fastest():
+    pool = HostPool(["http://a", "http://b", "http://c"])
+    a, b, c = pool.backends
+
+    # Ties go to the first host
+    assert pool.acquire() is a
+    assert pool.acquire() is b
+    assert pool.acquire() is c
+    for backend in (a, b, c):
+        pool.release(backend, ok=True)
+
+    c.model_loaded = True
+    assert pool.acquire() is c
+    pool.release(c, ok=True)
+
+    a.latency, b.latency, c.latency = 0.5, 0.1, 0.2
+    c.model_loaded = False
+    assert pool.acquire() is b
+
+
+def test_exclude_skips_tried_hosts():
+    pool = HostPool(["http://a", "http://b"])
+    a, b = pool.backends
+    assert pool.acquire(exclude=[a]) is b
+    assert pool.acquire(exclude=[a, b]) is None
+
+
+def test_latency_is_a_moving_average():
+    pool = HostPool(["http://a"])
+    (a,) = pool.backends
+    pool.release(pool.acquire(), ok=True, latency=1.0)
+    assert a.latency == 1.0
+    pool.release(pool.acquire(), ok=True, latency=2.0)
+    assert a.latency == pytest.approx(1.0 + host_pool.LATENCY_SMOOTHING)
+    # Failed requests do not count
+    pool.release(pool.acquire(), ok=False, latency=10.0)
+    assert a.latency == pytest.approx(1.0 + host_pool.LATENCY_SMOOTHING)
+
+
+def test_circuit_opens_after_threshold(clock):
+    pool = HostPool(["http://a", "http://b"], failure_threshold=3, reset_timeout=30)
+    a, b = pool.backends
+
+    _fail(pool, a, 2)
+    assert a.state == "closed"
+    # A success resets the count
+    pool.release(pool.acquire(exclude=[b]), ok=True)
+    _fail(pool, a, 2)
+    assert a.state == "closed"
+    _fail(pool, a, 1)
+    assert a.state == "open"
+
+    assert pool.acquire() is b
+    assert pool.acquire() is b
+
+
+def test_half_open_allows_one_trial(clock):
+    pool = HostPool(["http://a", "http://b"], failure_threshold=1, reset_timeout=30)
+    a, b = pool.backends
+    _fail(pool, a, 1)
+
+    clock.now += 29
+    assert pool.acquire() is b
+    pool.release(b, ok=True)
+
+    clock.now += 1
+    assert pool.acquire() is a
+    assert a.state == "half-open"
+    # Only one trial at a time
+    assert pool.acquire() is b
+    pool.release(b, ok=True)
+
+    pool.release(a, ok=True)
+    assert a.state == "closed"
+    assert a.failures == 0
+
+
+def test_failed_trial_reopens_for_another_timeout(clock):
+    pool = HostPool(["http://a", "http://b"], failure_threshold=3, reset_timeout=30)
+    a, b = pool.backends
+    _fail(pool, a, 3)
+
+    clock.now += 30
+    assert pool.acquire() is a
+    pool.release(a, ok=False)
+    assert a.state == "open"
+
+    clock.now += 29
+    assert pool.acquire() is b
+    pool.release(b, ok=True)
+    clock.now += 1
+    assert pool.acquire() is a
+
+
+def test_all_open_probes_longest_resting(clock):
+    pool = HostPool(["http://a", "http://b"], failure_threshold=1, reset_timeout=30)
+    a, b = pool.backends
+    _fail(pool, b, 1)
+    clock.now += 5
+    _fail(pool, a, 1)
+
+    assert pool.acquire() is b
+    assert b.state == "half-open"
+
+
+def test_single_host_is_always_tried(clock):
+    pool = HostPool(["http://a"], failure_threshold=1)
+    (a,) = pool.backends
+    _fail(pool, a, 5)
+    assert pool.acquire() is a
+
+
+def test_discard_records_nothing(clock):
+    pool = HostPool(["http://a", "http://b"], failure_threshold=1)
+    a, _ = pool.backends
+    pool.discard(pool.acquire())
+    assert (a.outstanding, a.failures, a.latency, a.state) == (0, 0, None, "closed")
+
+
+def test_health_check(clock):
+    pool = HostPool(["http://a", "http://b", "http://c"], health_interval=60)
+    a, b, c = pool.backends
+    results = {
+        a.host: {"healthy": True, "has_model": True, "model_loaded": True},
+        b.host: {"healthy": True, "has_model": False},
+    }
+
+    def probe(backend):
+        if backend.host not in results:
+            raise OSError("connection refused")
+        return results[backend.host]
+
+    assert pool.health_check_due()
+    # Claimed until the check finishes
+    assert not pool.health_check_due()
+    pool.check_health(probe)
+    assert pool.wait_for_health_check(0)
+
+    assert (a.healthy, a.model_loaded, a.state) == (True, True, "closed")
+    assert (b.healthy, b.has_model) == (True, False)
+    # An unreachable server leaves rotation right away but keeps has_model
+    assert (c.healthy, c.has_model, c.state) == (False, True, "open")
+    assert pool.acquire() is a
+    assert pool.acquire() is a
+
+    assert not pool.health_check_due()
+    clock.now += 60
+    assert pool.health_check_due()
+
+
+def test_single_host_skips_health_checks():
+    assert not HostPool(["http://a"]).health_check_due()
+
+
+def test_client_fails_over_to_healthy_server():
+    with MockOllamaServer() as healthy, MockOllamaServer(error_status=503) as failing:
+        client = OllamaClient(
+            hosts=[_unused_url(), failing.url, healthy.url],
+            failure_threshold=1,
+            circuit_reset=60,
+            retries=0,
+        )
+        try:
+            for _ in range(3):
+                assert client.generate("prompt", max_tokens=8)
+        finally:
+            client.close()
+
+        assert healthy.requests == 3
+        # The failing server got a single request before its circuit opened
+        assert failing.requests <= 1
+        states = {backend["host"]: backend["state"] for backend in client.pool.snapshot()}
+        assert states[healthy.url] == "closed"
+        assert states[failing.url] == "open"
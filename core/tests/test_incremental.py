@@ -0,0 +1,141 @@
+"""Tests for reusing work on staged files whose blobs did not change"""
+
+import subprocess
+
+import pytest
+
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.cache import MessageCache
+from commit_by_lee.diff_analyzer import DiffAnalyzer, FileAnalysisCache
+from commit_by_lee.llm_generator import CommitMessageGenerator
+from commit_by_lee.models.schemas import Language
+from commit_by_lee.ollama_client import OllamaClient
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def _stage(repo, files):
+    for path, text in files.items():
+        (repo / path).write_text(text)
+    _git(repo, "add", *files)
+
+
+def _source(name: str, lines: int, version: int = 0) -> str:
+    return "".join(f"def {name}_{line}():\n    return {line + version}\n" for line in range(lines))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q")
+    _stage(tmp_path, {f"mod{index}.py": _source(f"mod{index}", 60) for index in range(6)})
+    return tmp_path
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Paths of the files whose patch text is requested from git, per read"""
+    reads = []
+    read_staged = DiffAnalyzer._read_staged
+
+    def spy(self, selected, *args, **kwargs):
+        reads.append(sorted(file.path for file in selected or []))
+        return read_staged(self, selected, *args, **kwargs)
+
+    monkeypatch.setattr(DiffAnalyzer, "_read_staged", spy)
+    return reads
+
+
+def _same(a, b):
+    assert a.raw_diff == b.raw_diff
+    assert [(f.path, f.start, f.end, f.blob_id) for f in a.files] == [
+        (f.path, f.start, f.end, f.blob_id) for f in b.files
+    ]
+    assert [[(h.start, h.end) for h in f.hunks] for f in a.files] == [
+        [(h.start, h.end) for h in f.hunks] for f in b.files
+    ]
+
+
+def test_unchanged_files_are_not_read_again(repo, reads):
+    cache = FileAnalysisCache()
+    analyzer = DiffAnalyzer(str(repo), file_cache=cache)
+
+    first = analyzer.analyze_staged()
+    assert len(reads[0]) == 6
+    assert len(cache) == 6
+
+    second = analyzer.analyze_staged()
+    assert len(reads) == 1
+    _same(second, first)
+
+    _stage(repo, {"mod2.py": _source("mod2", 60, version=1)})
+    third = analyzer.analyze_staged()
+    assert reads[1] == ["mod2.py"]
+    # Assembled from the cache, the result is the one a single read gives
+    _same(third, DiffAnalyzer(str(repo)).analyze_staged())
+
+
+def test_truncated_last_file_is_not_cached(repo):
+    cache = FileAnalysisCache()
+    analyzer = DiffAnalyzer(str(repo), file_cache=cache)
+    full = DiffAnalyzer(str(repo)).analyze_staged()
+    limit = full.files[2].start + 100
+
+    analysis = analyzer.analyze_staged(max_chars=limit)
+    assert analysis.truncated
+    # Cut after the last whole line
+    assert analysis.raw_diff == full.raw_diff[: full.raw_diff.rfind("\n", 0, limit) + 1]
+    assert len(cache) == 2
+
+    # A larger budget reads the rest, the cut file included
+    _same(analyzer.analyze_staged(), full)
+
+
+def test_file_cache_evicts_least_recently_used(repo):
+    full = DiffAnalyzer(str(repo)).analyze_staged()
+    size = max(file.end - file.start for file in full.files)
+    cache = FileAnalysisCache(max_chars=size * 3)
+    analyzer = DiffAnalyzer(str(repo), file_cache=cache)
+
+    analyzer.analyze_staged()
+    assert len(cache) == 3
+    keys = [FileAnalysisCache.key(file) for file in full.files]
+    assert [cache.get(key) is not None for key in keys] == [False] * 3 + [True] * 3
+
+
+def test_summaries_of_unchanged_files_are_reused(repo, tmp_path):
+    cache = MessageCache(cache_dir=tmp_path / "cache")
+    with MockOllamaServer() as server:
+        client = OllamaClient(host=server.url, num_ctx=2048)
+        generator = CommitMessageGenerator(
+            client,
+            language=Language.ENGLISH,
+            cache=cache,
+            summary_chunk_chars=20_000,
+        )
+
+        def generate():
+            start = server.requests
+            analysis = DiffAnalyzer(str(repo)).analyze_staged()
+            generator.generate(analysis.raw_diff, analysis)
+            return server.requests - start
+
+        # One summary per file, then the message
+        assert generate() == 7
+        # Same diff: the message itself is cached
+        assert generate() == 0
+
+        _stage(repo, {"mod4.py": _source("mod4", 60, version=1)})
+        # Only the changed file is summarized again
+        assert generate() == 2
+        client.close()
+
+
+def test_unusable_cache_dir_is_a_summary_miss(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    cache = MessageCache(cache_dir=blocker / "sub")
+
+    cache.put_summaries({"key": "summary"})
+    assert cache.get_summaries(["key"]) == {}
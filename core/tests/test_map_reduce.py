@@ -0,0 +1,118 @@
+"""Tests for splitting large diffs into summarized parts"""
+
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.bench.synthetic_diff import generate_diff
+from commit_by_lee.diff_parser import parse_diff
+from commit_by_lee.llm_generator import CommitMessageGenerator
+from commit_by_lee.models.schemas import Language
+from commit_by_lee.ollama_client import OllamaClient
+from commit_by_lee.utils import group_diff_by_files
+
+
+def _file(path: str, hunks: int, lines: int = 10) -> str:
+    """Diff of one file with hunks of lines added lines each"""
+    parts = [
+        f"diff --git a/{path} b/{path}\n"
+        "index 587be6b..0f7bc76 100644\n"
+        f"--- a/{path}\n"
+        f"+++ b/{path}\n"
+    ]
+    for index in range(hunks):
+        start = index * 100 + 1
+        parts.append(f"@@ -{start},0 +{start},{lines} @@\n")
+        parts.extend(f"+line {index}.{line} of {path}\n" for line in range(lines))
+    return "".join(parts)
+
+
+def _group(diff: str, max_chars: int, max_groups: int = 16):
+    return group_diff_by_files(diff, parse_diff(diff).files, max_chars, max_groups)
+
+
+def test_small_diff_is_one_group():
+    diff = _file("a.py", 1) + _file("b.py", 1)
+    groups, omitted = _group(diff, max_chars=len(diff))
+    assert groups == [(["a.py", "b.py"], diff)]
+    assert omitted == []
+
+
+def test_small_files_are_packed_in_order():
+    files = [_file(f"f{index}.py", 1) for index in range(6)]
+    diff = "".join(files)
+    groups, omitted = _group(diff, max_chars=len(files[0]) * 2)
+
+    assert [paths for paths, _ in groups] == [
+        ["f0.py", "f1.py"],
+        ["f2.py", "f3.py"],
+        ["f4.py", "f5.py"],
+    ]
+    assert "".join(text for _, text in groups) == diff
+    assert omitted == []
+
+
+def test_large_file_is_split_at_hunks():
+    large = _file("large.py", 6)
+    small = _file("small.py", 1)
+    diff = small + large
+    header_end = large.index("@@")
+    hunk_size = max(hunk.end - hunk.start for hunk in parse_diff(large).files[0].hunks)
+    groups, omitted = _group(diff, max_chars=header_end + hunk_size * 2)
+
+    assert [paths for paths, _ in groups] == [["small.py"]] + [["large.py"]] * 3
+    for _, text in groups[1:]:
+        # Every piece repeats the file header and holds two whole hunks
+        assert text.startswith(large[:header_end])
+        assert text.count("\n@@ ") == 2
+        assert len(text) <= header_end + hunk_size * 2
+    assert "".join(text[header_end:] for _, text in groups[1:]) == large[header_end:]
+    assert omitted == []
+
+
+def test_file_without_hunks_is_never_split():
+    binary = (
+        "diff --git a/logo.png b/logo.png\n"
+        "index bdc955b..8835708 100644\n"
+        "Binary files a/logo.png and b/logo.png differ\n"
+    )
+    groups, _ = _group(binary, max_chars=10)
+    assert groups == [(["logo.png"], binary[:11])]
+
+
+def test_group_limit_leaves_out_files():
+    files = [_file(f"f{index}.py", 1) for index in range(10)]
+    groups, omitted = _group("".join(files), max_chars=len(files[0]), max_groups=3)
+
+    assert [paths for paths, _ in groups] == [["f0.py"], ["f1.py"], ["f2.py"]]
+    assert omitted == [f"f{index}.py" for index in range(3, 10)]
+
+
+def test_group_limit_keeps_partly_summarized_file_out_of_omitted():
+    diff = _file("large.py", 8) + _file("after.py", 1)
+    header_end = diff.index("@@")
+    hunk_size = max(hunk.end - hunk.start for hunk in parse_diff(diff).files[0].hunks)
+    groups, omitted = _group(diff, max_chars=header_end + hunk_size, max_groups=3)
+
+    assert [paths for paths, _ in groups] == [["large.py"]] * 3
+    assert omitted == ["after.py"]
+
+
+def test_generate_summarizes_each_part():
+    diff = generate_diff(60_000, seed=1)
+    with MockOllamaServer() as server:
+        client = OllamaClient(host=server.url)
+        generator = CommitMessageGenerator(
+            client,
+            language=Language.ENGLISH,
+            summary_chunk_chars=8000,
+            summary_max_chunks=4,
+        )
+        message = generator.generate(diff)
+        client.close()
+
+        groups, omitted = _group(diff, max_chars=8000, max_groups=4)
+        assert len(groups) == 4 and omitted
+        # One request per part, then one for the message
+        assert server.requests == len(groups) + 1
+        assert f"Other changed files: {omitted[0]}" in server.httpd.last_prompt
+
+    assert message.subject
+    assert not message.heuristic
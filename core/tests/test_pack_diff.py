@@ -0,0 +1,115 @@
+"""Tests for packing the most informative hunks into a token budget"""
+
+import pytest
+
+from commit_by_lee.bench.synthetic_diff import generate_diff
+from commit_by_lee.diff_parser import parse_diff
+from commit_by_lee.utils import estimate_tokens, pack_diff
+
+
+def _file(path: str, hunks) -> str:
+    """Diff of one file; hunks are lists of changed lines ("+x" or "-x")"""
+    parts = [
+        f"diff --git a/{path} b/{path}\n"
+        "index 587be6b..0f7bc76 100644\n"
+        f"--- a/{path}\n"
+        f"+++ b/{path}\n"
+    ]
+    for index, lines in enumerate(hunks):
+        start = index * 100 + 1
+        parts.append(f"@@ -{start},1 +{start},1 @@\n")
+        parts.extend(f"{line}\n" for line in lines)
+    return "".join(parts)
+
+
+def _pack(diff: str, budget: int):
+    return pack_diff(diff, parse_diff(diff).files, budget)
+
+
+SOURCE = _file(
+    "src/app.py",
+    [
+        ["+def handle(request):", "+    return route(request)"],
+        ["-x = 1", "+x = 2"],
+    ],
+)
+LOCKFILE = _file(
+    "package-lock.json",
+    [[f'+    "dependency-{index}": "^1.{index}.0",' for index in range(20)]],
+)
+
+
+def test_everything_fits():
+    diff = SOURCE + LOCKFILE
+    assert _pack(diff, 10**6) == (diff, [])
+
+
+@pytest.mark.parametrize("budget", [50, 200, 1000, 4000])
+def test_packed_diff_stays_within_budget(budget):
+    diff = generate_diff(100_000, seed=2)
+    packed, omitted = _pack(diff, budget)
+    assert estimate_tokens(packed) <= budget
+    assert packed
+    # Every file is either shown (at least its first line) or reported
+    shown = [file.path for file in parse_diff(packed).files]
+    assert len(shown) + len(omitted) == len(parse_diff(diff).files)
+
+
+def test_original_order_is_kept():
+    diff = generate_diff(20_000, seed=3)
+    packed, _ = _pack(diff, 800)
+    position = 0
+    # index() raises if a line appears before the previous one in the diff
+    for line in packed.splitlines(keepends=True):
+        position = diff.index(line, position) + len(line)
+
+
+def test_lockfile_is_dropped_first():
+    diff = LOCKFILE + SOURCE
+    budget = estimate_tokens(SOURCE) + estimate_tokens(LOCKFILE.split("\n", 1)[0]) + 2
+    packed, omitted = _pack(diff, budget)
+
+    assert SOURCE in packed
+    assert "dependency-1" not in packed
+    # The lockfile is still listed by its "diff --git" line
+    assert packed.startswith("diff --git a/package-lock.json b/package-lock.json\n")
+    assert omitted == []
+
+
+def test_whitespace_only_hunk_ranks_last():
+    reindented = ["-    value = compute()", "+        value = compute()"]
+    renamed = ["-    value = compute()", "+    total = compute()"]
+    diff = _file("src/a.py", [reindented, renamed])
+    files = parse_diff(diff).files
+    header = diff[: files[0].hunks[0].start]
+    second = diff[files[0].hunks[1].start :]
+
+    packed, _ = _pack(diff, estimate_tokens(header + second) + 1)
+    assert packed == header + second
+
+
+def test_tiny_budget_reports_files_left_out():
+    diff = SOURCE + LOCKFILE
+    packed, omitted = _pack(diff, 1)
+    assert packed == ""
+    assert omitted == ["src/app.py", "package-lock.json"]
+
+
+def test_file_without_hunks_is_kept_whole():
+    binary = (
+        "diff --git a/logo.png b/logo.png\n"
+        "index bdc955b..8835708 100644\n"
+        "Binary files a/logo.png and b/logo.png differ\n"
+    )
+    packed, omitted = _pack(binary + SOURCE, 10**6)
+    assert packed == binary + SOURCE
+    assert omitted == []
+
+
+def test_hunk_too_large_for_budget_is_skipped():
+    huge = _file("src/huge.py", [[f"+line {index}" for index in range(2000)]])
+    diff = SOURCE + huge
+    packed, omitted = _pack(diff, 200)
+    assert SOURCE in packed
+    assert "line 1" not in packed
+    assert omitted == []
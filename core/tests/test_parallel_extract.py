@@ -0,0 +1,104 @@
+"""Tests for extracting the staged patch with concurrent git diff calls"""
+
+import os
+import subprocess
+
+import pytest
+
+from commit_by_lee import diff_analyzer
+from commit_by_lee.diff_analyzer import MAX_WORKERS, DiffAnalyzer, FileAnalysisCache
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture(scope="module")
+def repo(tmp_path_factory):
+    repo = tmp_path_factory.mktemp("repo")
+    _git(repo, "init", "-q")
+    for index in range(40):
+        path = repo / f"pkg{index // 10}" / f"mod{index}.py"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text("".join(f"value_{line} = {line}\n" for line in range(index + 5)))
+    (repo / "old name.txt").write_text("kept\n" * 20)
+    (repo / "gone.txt").write_text("bye\n")
+    _git(repo, "add", "-A")
+    _git(repo, "-c", "user.name=Test", "-c", "user.email=test@example.com", "commit", "-qm", "init")
+
+    for index in range(0, 40, 3):
+        path = repo / f"pkg{index // 10}" / f"mod{index}.py"
+        path.write_text(path.read_text().replace("= 1", "= -1") + "# naïve 変更\n")
+    (repo / "日本.txt").write_text("新しい\n")
+    (repo / "logo.png").write_bytes(bytes(range(256)))
+    _git(repo, "mv", "old name.txt", "new name.txt")
+    _git(repo, "rm", "-q", "gone.txt")
+    _git(repo, "add", "-A")
+    return repo
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    """Split even this small patch into several batches"""
+    monkeypatch.setattr(diff_analyzer, "BATCH_MAX_FILES", 3)
+    monkeypatch.setattr(diff_analyzer, "PARALLEL_MIN_CHARS", 0)
+
+
+def _signature(analysis):
+    """Everything about an analysis that must not depend on the worker count"""
+    return (
+        str(analysis.raw_diff),
+        [
+            (f.path, f.old_path, f.status, f.insertions, f.deletions, f.start, f.end, f.blob_id)
+            for f in analysis.files
+        ],
+        [[(h.start, h.end) for h in f.hunks] for f in analysis.files],
+        analysis.truncated,
+        analysis.suggested_type,
+        analysis.suggested_scope,
+    )
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"max_chars": 10**9}, {"max_chars": 3000}, {"spill": True}],
+    ids=["whole", "cut", "spill"],
+)
+def test_parallel_matches_serial(repo, small_batches, monkeypatch, options):
+    serial = DiffAnalyzer(str(repo), workers=1).analyze_staged(**options)
+
+    batches = []
+    split = DiffAnalyzer._batches
+
+    def spy(files):
+        batches.append(len(files))
+        return split(files)
+
+    monkeypatch.setattr(DiffAnalyzer, "_batches", staticmethod(spy))
+    for workers in (2, 4, 7):
+        parallel = DiffAnalyzer(str(repo), workers=workers).analyze_staged(**options)
+        assert _signature(parallel) == _signature(serial)
+    assert batches
+    # Reading file by file for the file cache cuts at the same place
+    cached = DiffAnalyzer(str(repo), file_cache=FileAnalysisCache())
+    assert _signature(cached.analyze_staged(**options)) == _signature(serial)
+
+    assert serial.stats.files_changed == 18
+    assert serial.truncated == (options.get("max_chars") == 3000)
+    if serial.truncated:
+        assert len(serial.raw_diff) <= 3000
+        assert serial.raw_diff.endswith("\n")
+    else:
+        assert len(serial.files) == 18
+
+
+@pytest.mark.parametrize(
+    "workers, expected",
+    [(1, 1), (0, 1), (-3, 1), (6, 6), (MAX_WORKERS + 1, MAX_WORKERS), (10**6, MAX_WORKERS)],
+)
+def test_configured_workers_are_honored_up_to_the_cap(workers, expected):
+    assert DiffAnalyzer(workers=workers).workers == expected
+
+
+def test_unset_workers_default_to_one_per_cpu():
+    assert DiffAnalyzer(workers=None).workers == min(os.cpu_count() or 1, MAX_WORKERS)
@@ -0,0 +1,104 @@
+"""Tests for retrying and hedging requests to Ollama"""
+
+import random
+import time
+
+import pytest
+import requests
+
+from commit_by_lee.bench.mock_ollama import MockOllamaServer
+from commit_by_lee.ollama_client import OllamaClient
+from commit_by_lee.retry import LatencyWindow, backoff_delay
+
+
+@pytest.mark.parametrize("attempt, bound", [(1, 0.5), (2, 1.0), (3, 2.0), (4, 4.0), (10, 8.0)])
+def test_backoff_delay_bounds(attempt, bound):
+    random.seed(0)
+    delays = [backoff_delay(attempt, base=0.5, cap=8.0) for _ in range(200)]
+    assert all(0 <= delay <= bound for delay in delays)
+    # Jittered over the whole range
+    assert max(delays) > bound * 0.8
+    assert min(delays) < bound * 0.2
+
+
+def test_backoff_delay_disabled():
+    assert backoff_delay(3, base=0, cap=8.0) == 0.0
+
+
+def test_latency_window_percentile():
+    window = LatencyWindow(size=100, min_samples=10)
+    for index in range(9):
+        window.add(float(index))
+    assert window.percentile(95) is None
+
+    for index in range(9, 200):
+        window.add(float(index))
+    assert len(window) == 100
+    assert window.percentile(50) == 149.0
+    assert window.percentile(95) == 194.0
+    assert window.percentile(100) == 199.0
+
+
+def _stream_text(client: OllamaClient) -> str:
+    chunks = client.generate_stream("prompt", max_tokens=8)
+    return "".join(chunk.get("response", "") for chunk in chunks)
+
+
+def test_transient_failures_are_retried():
+    with MockOllamaServer(error_rate=0.5, seed=1) as server:
+        with OllamaClient(host=server.url, retries=8, retry_backoff=0) as client:
+            for _ in range(5):
+                assert client.generate("prompt", max_tokens=8)
+        assert server.requests > 5
+
+
+def test_retries_give_up():
+    with MockOllamaServer(error_status=503) as server:
+        with OllamaClient(host=server.url, retries=2, retry_backoff=0) as client:
+            with pytest.raises(requests.HTTPError):
+                client.generate("prompt", max_tokens=8)
+        assert server.requests == 3
+
+
+def test_rejected_request_is_not_retried():
+    with MockOllamaServer(error_status=400) as server:
+        with OllamaClient(host=server.url, retries=2, retry_backoff=0) as client:
+            with pytest.raises(requests.HTTPError):
+                client.generate("prompt", max_tokens=8)
+        assert server.requests == 1
+
+
+def test_streaming_retries_before_first_chunk():
+    with MockOllamaServer(error_rate=0.5, seed=1) as server:
+        with OllamaClient(host=server.url, retries=8, retry_backoff=0) as client:
+            for _ in range(5):
+                assert _stream_text(client)
+        assert server.requests > 5
+
+
+def test_slow_request_is_hedged():
+    with (
+        MockOllamaServer(tail_latency=2.0, tail_fraction=1.0) as slow,
+        MockOllamaServer() as fast,
+    ):
+        with OllamaClient(hosts=[slow.url, fast.url], hedge=True, hedge_delay=0.1) as client:
+            start = time.perf_counter()
+            assert client.generate("prompt", max_tokens=8)
+            elapsed = time.perf_counter() - start
+
+            assert elapsed < 1.5
+            # The hedged request went to the other server and answered first
+            assert (slow.requests, fast.requests) == (1, 1)
+            assert len(client.first_token_latency) == 1
+            # The abandoned request counts neither way
+            states = {backend["host"]: backend for backend in client.pool.snapshot()}
+            assert states[slow.url]["state"] == "closed"
+
+
+def test_fast_request_is_not_hedged():
+    with MockOllamaServer() as server:
+        with OllamaClient(host=server.url, hedge=True, hedge_delay=1.0) as client:
+            for _ in range(3):
+                assert client.generate("prompt", max_tokens=8)
+                assert _stream_text(client)
+        assert server.requests == 6